@@ -1,16 +1,414 @@
-from pyspark.sql import SparkSession
-from pyspark.sql.functions import sum as _sum
+import os
+import sys
+import glob
+import shutil
+import argparse
+from pathlib import Path
 
-spark = SparkSession.builder \
-    .appName("Zoho Sheet Expenditure Analysis") \
-    .master("local[*]") \
-    .getOrCreate()
+import numpy as np
+import pandas as pd
 
-csvPath = r"C:\\myWork\\ExpenseTracker\\src\\resources\\monthly_data\\Expenditures_20250701-20260630.csv"
-df = spark.read.option("header", "true").option("inferSchema", "true").csv(csvPath)
+from spend_rollups import UNCATEGORIZED
 
-df.show()
+DEFAULT_CSV = Path(__file__).resolve().parents[1] / "resources" / "monthly_data" / "Expenditures_20250701-20260630.csv"
 
-resultDF = df.groupBy("Category").agg(_sum("Expenditure").alias("Total_Expenditure"))
-resultDF.show()
-spark.stop()
\ No newline at end of file
+# Inputs smaller than this are summarised in-process with pandas; starting the
+# JVM and a local Spark session costs seconds, far more than the query itself.
+SPARK_MIN_BYTES = int(os.environ.get('EXPENSE_TRACKER_SPARK_MIN_MB', '512')) * 1024 * 1024
+
+# Spark master; any local[N] master runs the job in-process, e.g. for tests
+SPARK_MASTER = os.environ.get('EXPENSE_TRACKER_SPARK_MASTER', 'local[*]')
+
+# Totals are money, rounded so both engines agree regardless of summation order
+DECIMALS = 2
+
+# Columns of the Zoho expenditure sheet export, in order
+SHEET_COLUMNS = ['Date', 'Item', 'Expenditure', 'Cumulative - Monthly', 'Cumulative - Yearly', 'Comments', 'Category']
+AMOUNT_COLUMNS = ['Expenditure', 'Cumulative - Monthly', 'Cumulative - Yearly']
+
+# The sheet mixes D-M-YYYY and D-M-YY; the shape of a date decides its format
+LONG_DATE = r'^\d{1,2}-\d{1,2}-\d{4}$'
+SHORT_DATE = r'^\d{1,2}-\d{1,2}-\d{2}$'
+
+def sheet_paths(patterns):
+    """
+    Expand sheet file names and globs, e.g. 'monthly_data/Expenditures_*.csv'.
+    Args:
+        patterns (str | list[str]): Files or glob patterns
+    Returns:
+        list[str]: Matching files, sorted and without repeats
+    Raises:
+        FileNotFoundError: When nothing matches
+    """
+    if isinstance(patterns, (str, Path)):
+        patterns = [patterns]
+    paths = sorted({path for pattern in patterns for path in glob.glob(str(pattern))})
+    if not paths:
+        raise FileNotFoundError(f"No expenditure sheets match {', '.join(map(str, patterns))}")
+    return paths
+
+def input_size(path):
+    """Total size in bytes of a file, of all files under a directory, or of a list of files."""
+    if isinstance(path, (list, tuple)):
+        return sum(input_size(p) for p in path)
+    path = Path(path)
+    if path.is_file():
+        return path.stat().st_size
+    return sum(p.stat().st_size for p in path.rglob('*') if p.is_file())
+
+def choose_engine(path, engine='auto', spark_min_bytes=SPARK_MIN_BYTES):
+    """
+    Pick the engine for an input.
+    Args:
+        path (str | list[str]): CSV files or ledger directory
+        engine (str): 'pandas', 'spark' or 'auto'
+        spark_min_bytes (int): Inputs at least this large use Spark in 'auto' mode
+    Returns:
+        str: 'pandas' or 'spark'
+    """
+    if engine != 'auto':
+        return engine
+    return 'spark' if input_size(path) >= spark_min_bytes else 'pandas'
+
+def _finish(result, keys):
+    """Put an aggregation result in a canonical order and precision."""
+    result = result.copy()
+    for column in result.columns:
+        if column.startswith('Total_'):
+            result[column] = result[column].astype('float64').round(DECIMALS)
+    return result.sort_values(keys, na_position='first', kind='stable').reset_index(drop=True)
+
+def sheet_category_totals(month_totals):
+    """Expenditure per category, from the category x month aggregates."""
+    result = month_totals.groupby('Category', sort=False).agg(
+        Total_Expenditure=('Total_Expenditure', 'sum'), Transactions=('Transactions', 'sum')).reset_index()
+    return _finish(result, ['Category'])
+
+def pandas_sheet_rows(paths):
+    """
+    Read expenditure sheets into one row per expense, with the cumulative
+    columns filled in. Dates are only entered on the first expense of a day,
+    so they are forward-filled within each sheet before parsing.
+    Args:
+        paths (list[str]): Sheet exports, see sheet_paths
+    Returns:
+        pandas.DataFrame: Date, Item, Expenditure, Comments, Category, year, month,
+            Cumulative - Monthly and Cumulative - Yearly, in date order
+    """
+    frames = []
+    for path in paths:
+        df = pd.read_csv(path, dtype=str, keep_default_na=False, na_values=[''])
+        df = df.reindex(columns=SHEET_COLUMNS)
+        df['source'] = str(Path(path).resolve())
+        df['line'] = np.arange(len(df))
+        frames.append(df)
+    df = pd.concat(frames, ignore_index=True)
+    dates = df.groupby('source', sort=False)['Date'].ffill().str.strip()
+    long_dates = pd.to_datetime(dates.where(dates.str.match(LONG_DATE, na=False)), format='%d-%m-%Y', errors='coerce')
+    short_dates = pd.to_datetime(dates.where(dates.str.match(SHORT_DATE, na=False)), format='%d-%m-%y', errors='coerce')
+    df['Date'] = long_dates.fillna(short_dates)
+    df['Expenditure'] = pd.to_numeric(df['Expenditure'], errors='coerce')
+    df = df[df['Expenditure'].notna() & df['Date'].notna()].copy()
+    df['Category'] = df['Category'].str.strip().fillna(UNCATEGORIZED)
+    df['year'] = df['Date'].dt.year
+    df['month'] = df['Date'].dt.month
+    df = df.sort_values(['Date', 'source', 'line'], kind='stable')
+    df['Cumulative - Monthly'] = df.groupby(['year', 'month'])['Expenditure'].cumsum().round(DECIMALS)
+    df['Cumulative - Yearly'] = df.groupby('year')['Expenditure'].cumsum().round(DECIMALS)
+    return df.drop(columns=['source', 'line']).reset_index(drop=True)
+
+def pandas_sheet_totals(paths, output=None):
+    """
+    Expenditure and expense count per category and month of the sheets, computed with pandas.
+    Args:
+        paths (list[str]): Sheet exports, see sheet_paths
+        output (str): Also write the rows with their cumulatives to this Parquet directory, by year and month
+    Returns:
+        pandas.DataFrame: year, month, Category, Total_Expenditure, Transactions
+    """
+    rows = pandas_sheet_rows(paths)
+    if output:
+        from parquet_ledger import PARTITION_COLS, _require_pyarrow
+        _require_pyarrow()
+        # Replace the previous output like Spark's overwrite mode
+        shutil.rmtree(output, ignore_errors=True)
+        rows.to_parquet(output, partition_cols=PARTITION_COLS, index=False)
+    result = rows.groupby(['year', 'month', 'Category'], sort=False).agg(
+        Total_Expenditure=('Expenditure', 'sum'), Transactions=('Expenditure', 'size')).reset_index()
+    return _finish(result, ['year', 'month', 'Category'])
+
+def pandas_month_totals(ledger_path, year=None, month=None):
+    """Withdrawals and deposits per month of the Parquet ledger, computed with pandas."""
+    from parquet_ledger import read_parquet_ledger
+    start = end = None
+    if year is not None:
+        start = pd.Timestamp(year, month or 1, 1)
+        end = start + (pd.offsets.MonthEnd(1) if month else pd.offsets.YearEnd(1))
+    df = read_parquet_ledger(ledger_path, start, end)
+    if month is not None:
+        df = df[df['month'] == month]
+    result = df.groupby(['year', 'month'], sort=False).agg(
+        Total_Expenditure=('Withdrawal', lambda s: s.sum(min_count=1)),
+        Total_Deposits=('Deposit', lambda s: s.sum(min_count=1)),
+    ).reset_index()
+    return _finish(result, ['year', 'month'])
+
+def start_spark(master=SPARK_MASTER):
+    """
+    Start the Spark session used for large inputs.
+    Args:
+        master (str): Spark master URL (default: EXPENSE_TRACKER_SPARK_MASTER or local[*])
+    """
+    from pyspark.sql import SparkSession
+    builder = SparkSession.builder \
+        .appName("Zoho Sheet Expenditure Analysis") \
+        .master(master)
+    if master.startswith('local'):
+        # The default of 200 shuffle partitions is meant for clusters; locally
+        # it only adds scheduling overhead to every aggregation
+        builder = builder.config("spark.sql.shuffle.partitions", str(os.cpu_count() or 1))
+    return builder.getOrCreate()
+
+def sheet_schema():
+    """Spark schema of the expenditure sheet; declared so reading needs no inference pass."""
+    from pyspark.sql.types import DoubleType, StringType, StructField, StructType
+    return StructType([StructField(name, DoubleType() if name in AMOUNT_COLUMNS else StringType())
+                       for name in SHEET_COLUMNS])
+
+def read_sheets(spark, paths):
+    """
+    Read expenditure sheets into one row per expense, dates parsed and
+    partitioned by month.
+    Args:
+        spark (SparkSession): Active session
+        paths (list[str]): Sheet exports, see sheet_paths
+    Returns:
+        pyspark.sql.DataFrame: Date, Item, Expenditure, Comments, Category, year,
+            month and the source file and line used to keep sheet order
+    """
+    from pyspark.sql import Window
+    from pyspark.sql.functions import (coalesce, col, input_file_name, last, lit, month,
+                                       monotonically_increasing_id, to_date, trim, when, year)
+    # multiLine keeps each file in one partition, so the generated ids follow
+    # the sheet's row order and the forward fill below sees the rows in order
+    df = spark.read.csv([str(Path(path).resolve()) for path in paths], header=True, schema=sheet_schema(),
+                        multiLine=True, escape='"') \
+        .withColumn('source', input_file_name()) \
+        .withColumn('line', monotonically_increasing_id())
+    sheet_order = Window.partitionBy('source').orderBy('line') \
+        .rowsBetween(Window.unboundedPreceding, Window.currentRow)
+    date_text = trim(last('Date', ignorenulls=True).over(sheet_order))
+    parsed = when(date_text.rlike(LONG_DATE), to_date(date_text, 'd-M-yyyy')) \
+        .when(date_text.rlike(SHORT_DATE), to_date(date_text, 'd-M-yy'))
+    return df.withColumn('Date', parsed) \
+        .filter(col('Expenditure').isNotNull() & col('Date').isNotNull()) \
+        .withColumn('Category', coalesce(trim(col('Category')), lit(UNCATEGORIZED))) \
+        .withColumn('year', year('Date')) \
+        .withColumn('month', month('Date')) \
+        .drop(*AMOUNT_COLUMNS[1:]) \
+        .repartition('year', 'month')
+
+def spark_sheet_totals(spark, paths, output=None):
+    """
+    Expenditure and expense count per category and month of the sheets, computed with Spark.
+    The parsed rows are cached: the aggregates are one scan over them, and the
+    cumulative columns reuse both the rows and the (small) month totals.
+    Args:
+        spark (SparkSession): Active session
+        paths (list[str]): Sheet exports, see sheet_paths
+        output (str): Also write the rows with their cumulatives to this Parquet directory, by year and month
+    Returns:
+        pandas.DataFrame: year, month, Category, Total_Expenditure, Transactions
+    """
+    from pyspark.sql import Window
+    from pyspark.sql.functions import broadcast, coalesce, col, count, lit, round as _round, sum as _sum
+    rows = read_sheets(spark, paths).cache()
+    try:
+        totals = rows.groupBy('year', 'month', 'Category').agg(
+            _sum('Expenditure').alias('Total_Expenditure'), count('Expenditure').alias('Transactions')).cache()
+        if output:
+            # Rows are partitioned by month, so the month window needs no shuffle;
+            # the year's earlier months come from the month totals
+            by_month = Window.partitionBy('year', 'month').orderBy('Date', 'source', 'line') \
+                .rowsBetween(Window.unboundedPreceding, Window.currentRow)
+            earlier = Window.partitionBy('year').orderBy('month') \
+                .rowsBetween(Window.unboundedPreceding, -1)
+            months = totals.groupBy('year', 'month').agg(_sum('Total_Expenditure').alias('month_total')) \
+                .withColumn('earlier_months', coalesce(_sum('month_total').over(earlier), lit(0.0))) \
+                .drop('month_total')
+            running = _sum('Expenditure').over(by_month)
+            rows.withColumn('running', running) \
+                .join(broadcast(months), ['year', 'month']) \
+                .withColumn('Cumulative - Monthly', _round('running', DECIMALS)) \
+                .withColumn('Cumulative - Yearly', _round(col('running') + col('earlier_months'), DECIMALS)) \
+                .drop('source', 'line', 'running', 'earlier_months') \
+                .write.mode('overwrite').partitionBy('year', 'month').parquet(str(output))
+        result = totals.toPandas().astype({'year': 'int64', 'month': 'int64'})
+        totals.unpersist()
+    finally:
+        rows.unpersist()
+    return _finish(result, ['year', 'month', 'Category'])
+
+def read_ledger(spark, ledger_path, year=None, month=None):
+    """
+    Read the Parquet ledger written by pdf_analyzer.py --parquet.
+    Filtering on the year/month partition columns lets Spark skip every other
+    month's files instead of scanning the whole history.
+    Args:
+        spark (SparkSession): Active session
+        ledger_path (str): Root directory of the ledger
+        year (int): Only read this year
+        month (int): Only read this month
+    Returns:
+        pyspark.sql.DataFrame: Transactions
+    """
+    from pyspark.sql.functions import col
+    df = spark.read.parquet(str(ledger_path))
+    if year is not None:
+        df = df.filter(col("year") == year)
+    if month is not None:
+        df = df.filter(col("month") == month)
+    return df
+
+def spark_month_totals(spark, ledger_path, year=None, month=None):
+    """Withdrawals and deposits per month of the Parquet ledger, computed with Spark."""
+    from pyspark.sql.functions import sum as _sum
+    df = read_ledger(spark, ledger_path, year, month)
+    resultDF = df.groupBy("year", "month").agg(
+        _sum("Withdrawal").alias("Total_Expenditure"),
+        _sum("Deposit").alias("Total_Deposits"),
+    )
+    result = resultDF.toPandas().astype({'year': 'int64', 'month': 'int64'})
+    return _finish(result, ['year', 'month'])
+
+def _sheet_summary(month_totals, year=None, month=None, by_month=False):
+    if year is not None:
+        month_totals = month_totals[month_totals['year'] == year]
+    if month is not None:
+        month_totals = month_totals[month_totals['month'] == month]
+    if by_month:
+        return month_totals.reset_index(drop=True)
+    return sheet_category_totals(month_totals)
+
+def summarise(path, ledger=False, year=None, month=None, engine='pandas', spark=None, by_month=False, output=None):
+    """
+    Run the summary for an input on one engine.
+    Args:
+        path (str | list[str]): Sheet exports (globs allowed), or ledger directory when ledger is True
+        ledger (bool): Summarise the Parquet ledger by month instead of the sheets by category
+        year (int): Only this year
+        month (int): Only this month
+        engine (str): 'pandas' or 'spark'
+        spark (SparkSession): Session to reuse for the Spark engine
+        by_month (bool): Sheet totals per category and month instead of per category
+        output (str): Write the sheet rows with their cumulative columns to this Parquet directory
+    Returns:
+        pandas.DataFrame: Totals in canonical order
+    """
+    if engine == 'pandas':
+        if ledger:
+            return pandas_month_totals(path, year, month)
+        return _sheet_summary(pandas_sheet_totals(sheet_paths(path), output), year, month, by_month)
+    own_session = spark is None
+    spark = spark or start_spark()
+    try:
+        if ledger:
+            return spark_month_totals(spark, path, year, month)
+        return _sheet_summary(spark_sheet_totals(spark, sheet_paths(path), output), year, month, by_month)
+    finally:
+        if own_session:
+            spark.stop()
+
+def check_parity(path, ledger=False, year=None, month=None, by_month=False, spark=None, master=SPARK_MASTER):
+    """
+    Run the summary on both engines and compare the results.
+    Args:
+        spark (SparkSession): Session to reuse (default: a new one on master, stopped afterwards)
+        master (str): Spark master for the new session
+    Returns:
+        bool: True when pandas and Spark give identical totals
+    """
+    own_session = spark is None
+    spark = spark or start_spark(master)
+    try:
+        expected = summarise(path, ledger, year, month, engine='spark', spark=spark, by_month=by_month)
+    finally:
+        if own_session:
+            spark.stop()
+    actual = summarise(path, ledger, year, month, engine='pandas', by_month=by_month)
+    try:
+        pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+    except AssertionError as e:
+        print(f"Engines disagree:\n{str(e)}")
+        return False
+    print("pandas and Spark results are identical")
+    return True
+
+def report_rollups(csv_paths, month=None):
+    """Sync sheets into the rollup store, then print totals read from the store."""
+    from spend_rollups import load_rollups, save_rollups, sync_sheet, category_totals, month_summary
+    store = load_rollups()
+    for csv_path in sheet_paths(csv_paths):
+        changed = sync_sheet(store, csv_path)
+        if changed:
+            save_rollups(store)
+        print(f"Rollups updated with {changed} changed month/category totals from {csv_path}")
+    totals = pd.DataFrame(list(category_totals(store).items()), columns=['Category', 'Total_Expenditure'])
+    print(totals.to_string(index=False))
+    month = month or max(store['months'], default=None)
+    if month is not None:
+        print(f"\nMonth {month}:")
+        print(month_summary(store, month).to_string(index=False))
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarise expenditure with pandas, or Spark for large inputs.")
+    parser.add_argument("csv_paths", nargs="*", default=[str(DEFAULT_CSV)],
+                        help="Expenditure sheet exports to summarise by category (globs allowed)")
+    parser.add_argument("--ledger", metavar="LEDGER_DIR",
+                        help="Summarise the Parquet ledger by month instead of the sheets")
+    parser.add_argument("--year", type=int, help="Only this year")
+    parser.add_argument("--month", type=int, help="Only this month")
+    parser.add_argument("--by-month", action="store_true",
+                        help="Sheet totals per category and month instead of per category")
+    parser.add_argument("--cumulative-output", metavar="DIR", default=None,
+                        help="Write the sheet rows with Cumulative - Monthly/Yearly filled in to this "
+                             "Parquet directory, partitioned by year and month")
+    parser.add_argument("--engine", choices=['auto', 'pandas', 'spark'], default='auto',
+                        help="Aggregation engine (default: Spark only for inputs above --spark-min-mb)")
+    parser.add_argument("--spark-min-mb", type=float, default=SPARK_MIN_BYTES / (1024 * 1024),
+                        help="Input size from which 'auto' switches to Spark")
+    parser.add_argument("--spark-master", default=SPARK_MASTER,
+                        help="Spark master URL (default: EXPENSE_TRACKER_SPARK_MASTER or %(default)s)")
+    parser.add_argument("--check-parity", action="store_true",
+                        help="Run both engines and verify they give identical results")
+    parser.add_argument("--rollups", action="store_true",
+                        help="Apply new or corrected sheet rows to the rollup store and report from it")
+    parser.add_argument("--summary-month", metavar="YYYY-MM",
+                        help="Month reported from the rollup store (default: latest)")
+    args = parser.parse_args()
+
+    if args.rollups:
+        report_rollups(args.csv_paths, args.summary_month)
+        return
+
+    ledger = args.ledger is not None
+    path = args.ledger if ledger else sheet_paths(args.csv_paths)
+    if args.check_parity:
+        sys.exit(0 if check_parity(path, ledger, args.year, args.month, args.by_month,
+                                    master=args.spark_master) else 1)
+
+    engine = choose_engine(path, args.engine, int(args.spark_min_mb * 1024 * 1024))
+    print(f"Summarising {path if ledger else ', '.join(path)} with {engine}")
+    spark = start_spark(args.spark_master) if engine == 'spark' else None
+    try:
+        result = summarise(path, ledger, args.year, args.month, engine=engine, spark=spark,
+                           by_month=args.by_month, output=args.cumulative_output)
+    finally:
+        if spark is not None:
+            spark.stop()
+    print(result.to_string(index=False))
+    if args.cumulative_output and not ledger:
+        print(f"\nRows with cumulative totals written to {args.cumulative_output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+import os
+import time
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from batch_analyzer import find_statements, load_passwords, password_for
+from pdf_analyzer import clean_statement, read_statement, save_transactions, warm_tabula
+
+# Three stages with bounded queues between them, so the next statement is
+# decrypted and read by tabula while the previous ones are cleaned and written:
+#   extract - decrypt and read the raw tables (or an export), warm-JVM processes
+#   clean   - tables to transactions, CPU-bound, its own process pool
+#   write   - CSV / Parquet / SQLite outputs, threads
+STAGES = ['extract', 'clean', 'write']
+
+def _extract(path, password, extract_options):
+    """Extract stage, in a worker process: the read half of extract_statement."""
+    return read_statement(path, password, **extract_options)
+
+def _clean(raw, categories):
+    """Clean stage, in a worker process: the clean half of extract_statement."""
+    return clean_statement(raw, categories)
+
+def _write(path, df, outputs):
+    """Write stage, in a thread: the outputs save_transactions writes for the CLI."""
+    return {'pdf': path, 'output': str(save_transactions(df, path, **outputs)), 'transactions': len(df)}
+
+def _new_stats(workers):
+    return {'workers': workers, 'items': 0, 'failed': 0, 'busy_seconds': 0.0, 'blocked_seconds': 0.0,
+            'queue_samples': 0, 'queue_total': 0, 'queue_max': 0}
+
+async def _run_stage(name, work, inbox, outbox, stats, results, next_workers):
+    """
+    Run a stage's workers until each has taken a None from inbox, then pass one
+    None per downstream worker on. Time spent waiting on a full outbox is
+    counted as blocked: the stage after this one is the slower of the two.
+    """
+    async def worker():
+        while True:
+            item = await inbox.get()
+            if item is None:
+                return
+            path, payload = item
+            start = time.perf_counter()
+            try:
+                result = await work(path, payload)
+            except Exception as e:
+                print(f"Error in the {name} stage for {path}: {str(e)}")
+                result = None
+            stats['busy_seconds'] += time.perf_counter() - start
+            stats['items'] += 1
+            if result is None:
+                stats['failed'] += 1
+                results[path] = {'pdf': path, 'output': None, 'transactions': 0}
+            elif outbox is None:
+                results[path] = result
+            else:
+                start = time.perf_counter()
+                await outbox.put((path, result))
+                stats['blocked_seconds'] += time.perf_counter() - start
+
+    await asyncio.gather(*(worker() for _ in range(stats['workers'])))
+    if outbox is not None:
+        for _ in range(next_workers):
+            await outbox.put(None)
+
+async def _sample_queues(queues, stats, interval):
+    """Record every stage's input queue depth until cancelled."""
+    while True:
+        for name, queue in queues.items():
+            depth = queue.qsize()
+            stats[name]['queue_samples'] += 1
+            stats[name]['queue_total'] += depth
+            stats[name]['queue_max'] = max(stats[name]['queue_max'], depth)
+        await asyncio.sleep(interval)
+
+async def _pipeline(paths, passwords, workers, queue_size, outputs, extract_options, sample_interval):
+    loop = asyncio.get_running_loop()
+    stats = {name: _new_stats(workers[name]) for name in STAGES}
+    queues = {name: asyncio.Queue(maxsize=queue_size) for name in STAGES}
+    results = {}
+    read_options = {key: value for key, value in extract_options.items() if key != 'categories'}
+    categories = extract_options.get('categories')
+    with ProcessPoolExecutor(max_workers=workers['extract'], initializer=warm_tabula) as extract_pool, \
+            ProcessPoolExecutor(max_workers=workers['clean']) as clean_pool, \
+            ThreadPoolExecutor(max_workers=workers['write']) as write_pool:
+        work = {
+            'extract': lambda path, _: loop.run_in_executor(extract_pool, _extract, path,
+                                                            password_for(path, passwords), read_options),
+            'clean': lambda path, extracted: loop.run_in_executor(clean_pool, _clean, extracted, categories),
+            'write': lambda path, df: loop.run_in_executor(write_pool, _write, path, df, outputs),
+        }
+        sampler = asyncio.create_task(_sample_queues(queues, stats, sample_interval))
+        start = time.perf_counter()
+        stages = [
+            asyncio.create_task(_run_stage(name, work[name], queues[name],
+                                           queues[STAGES[i + 1]] if i + 1 < len(STAGES) else None,
+                                           stats[name], results, workers[STAGES[i + 1]] if i + 1 < len(STAGES) else 0))
+            for i, name in enumerate(STAGES)
+        ]
+        # put() waits while the extract queue is full: files are only listed, never loaded, ahead of it
+        for path in paths:
+            await queues['extract'].put((path, None))
+        for _ in range(workers['extract']):
+            await queues['extract'].put(None)
+        await asyncio.gather(*stages)
+        sampler.cancel()
+        wall_seconds = time.perf_counter() - start
+    for entry in stats.values():
+        entry['busy_seconds'] = round(entry['busy_seconds'], 3)
+        entry['blocked_seconds'] = round(entry['blocked_seconds'], 3)
+        entry['queue_mean'] = round(entry['queue_total'] / max(entry['queue_samples'], 1), 2)
+        entry['utilisation'] = round(entry['busy_seconds'] / (wall_seconds * entry['workers']), 2) if wall_seconds else 0.0
+    return [results[path] for path in sorted(results)], {'stages': stats, 'wall_seconds': round(wall_seconds, 3)}
+
+def run_pipeline(source, password_spec, extract_workers=None, clean_workers=None, write_workers=2, queue_size=2,
+                 parquet_dir=None, ledger_db=None, account=None, sample_interval=0.1, **extract_options):
+    """
+    Process every statement matched by source through the extract -> clean ->
+    write pipeline, overlapping the stages across statements.
+    Args:
+        source (str): Directory or glob of statements, see batch_analyzer.find_statements
+        password_spec (str): JSON password map or a single password
+        extract_workers (int): Processes decrypting and reading statements (default: half the CPUs)
+        clean_workers (int): Processes cleaning extracted tables (default: half the CPUs)
+        write_workers (int): Threads writing outputs
+        queue_size (int): Statements waiting in front of each stage; a full queue
+            holds the stage before it back, which bounds memory
+        parquet_dir (str): Also append every statement to this Parquet ledger
+        ledger_db (str): Also upsert every statement into this SQLite ledger
+        account (str): Account name in the SQLite ledger (default: each statement's bank)
+        sample_interval (float): Seconds between queue depth samples
+        **extract_options: bank, use_cache, refresh, use_template, page_workers and categories
+    Returns:
+        tuple: (list[dict] one result per statement like run_batch,
+            dict 'stages' statistics and 'wall_seconds', see print_pipeline_stats)
+    """
+    paths = find_statements(source)
+    if not paths:
+        print(f"No statements found for {source}")
+        return [], None
+    half = max((os.cpu_count() or 2) // 2, 1)
+    workers = {'extract': min(extract_workers or half, len(paths)), 'clean': min(clean_workers or half, len(paths)),
+               'write': min(max(write_workers, 1), len(paths))}
+    outputs = {'parquet_dir': parquet_dir, 'ledger_db': ledger_db, 'account': account}
+    print(f"\nProcessing {len(paths)} statements: {workers['extract']} extract, {workers['clean']} clean and "
+          f"{workers['write']} write workers, queues of {queue_size}...")
+    results, stats = asyncio.run(_pipeline(paths, load_passwords(password_spec), workers, max(queue_size, 1),
+                                           outputs, extract_options, sample_interval))
+    print("\nPipeline summary:")
+    for r in results:
+        status = f"{r['transactions']} transactions -> {r['output']}" if r['output'] else "FAILED"
+        print(f"  {r['pdf']}: {status}")
+    print_pipeline_stats(stats)
+    return results, stats
+
+def print_pipeline_stats(stats):
+    """
+    Print per-stage throughput. The stage limiting throughput has high
+    utilisation and a full input queue; the stage before it spends time blocked.
+    """
+    print(f"\nStage timings ({stats['wall_seconds']} s wall):")
+    print(f"  {'stage':<8} {'workers':>7} {'items':>6} {'busy s':>8} {'util':>5} {'queue avg':>9} {'max':>4} {'blocked s':>9}")
+    for name, entry in stats['stages'].items():
+        print(f"  {name:<8} {entry['workers']:>7} {entry['items']:>6} {entry['busy_seconds']:>8.2f} "
+              f"{entry['utilisation']:>5.2f} {entry['queue_mean']:>9.2f} {entry['queue_max']:>4} "
+              f"{entry['blocked_seconds']:>9.2f}")
@@ -0,0 +1,142 @@
+from pathlib import Path
+
+import pandas as pd
+
+# Structured statement exports (CSV, or the tab-separated text banks save as .xls)
+# read directly, without tabula. Each layout is recognised by its header labels:
+#   header        - labels that must all appear in the header row
+#   date          - column holding the value date
+#   date_formats  - strptime formats tried in order
+#   description, withdrawal, deposit, balance - source columns of the output
+EXPORT_LAYOUTS = {
+    'SBI': {
+        'header': ['Value Date', 'Description', 'Ref No./Cheque No.', 'Debit', 'Credit', 'Balance'],
+        'date': 'Value Date',
+        'date_formats': ['%d-%b-%y', '%d %b %Y'],
+        'description': 'Description',
+        'withdrawal': 'Debit',
+        'deposit': 'Credit',
+        'balance': 'Balance',
+    },
+}
+
+EXPORT_SUFFIXES = ['.csv', '.xls', '.xlsx', '.txt']
+
+# Exports put account details above the header row; look this far for it
+HEADER_SEARCH_LINES = 60
+
+OLE2_MAGIC = b'\xd0\xcf\x11\xe0'
+ZIP_MAGIC = b'PK\x03\x04'
+
+def _is_spreadsheet(path):
+    """True for real Excel workbooks, as opposed to text saved with an .xls name."""
+    with open(path, 'rb') as f:
+        magic = f.read(4)
+    return magic in (OLE2_MAGIC, ZIP_MAGIC)
+
+def _match_layout(cells):
+    """Return the bank whose header labels all appear in a row of cells, or None."""
+    labels = [str(cell).strip() for cell in cells]
+    for bank, layout in EXPORT_LAYOUTS.items():
+        if all(label in labels for label in layout['header']):
+            return bank
+    return None
+
+def _find_header(path):
+    """
+    Locate the header row of a text export.
+    Returns:
+        tuple: (line index, separator, bank), or None when this is not a known export
+    """
+    try:
+        with open(path, encoding='utf-8-sig', errors='replace') as f:
+            for index, line in zip(range(HEADER_SEARCH_LINES), f):
+                sep = '\t' if '\t' in line else ','
+                bank = _match_layout(line.rstrip('\r\n').split(sep))
+                if bank is not None:
+                    return index, sep, bank
+    except OSError:
+        return None
+    return None
+
+def _read_spreadsheet(path):
+    """Read a real Excel export, returning (rows with header, bank) or None."""
+    try:
+        raw = pd.read_excel(path, header=None, dtype=str)
+    except ImportError:
+        raise ImportError("Reading Excel workbooks needs xlrd (.xls) or openpyxl (.xlsx)")
+    for index, cells in raw.head(HEADER_SEARCH_LINES).iterrows():
+        bank = _match_layout(cells.fillna(''))
+        if bank is not None:
+            df = raw.iloc[index + 1:].reset_index(drop=True)
+            df.columns = [str(col).strip() for col in raw.iloc[index].fillna('')]
+            return df, bank
+    return None
+
+def detect_export(path):
+    """Return the bank of a structured statement export, or None for anything else."""
+    path = Path(path)
+    if path.suffix.lower() not in EXPORT_SUFFIXES or not path.is_file():
+        return None
+    if _is_spreadsheet(path):
+        found = _read_spreadsheet(path)
+        return found[1] if found else None
+    found = _find_header(path)
+    return found[2] if found else None
+
+def find_export(pdf_path):
+    """Return a structured export saved next to a PDF statement under the same name, or None."""
+    pdf_path = Path(pdf_path)
+    for suffix in EXPORT_SUFFIXES:
+        candidate = pdf_path.with_suffix(suffix)
+        if detect_export(candidate):
+            return candidate
+    return None
+
+def _parse_dates(values, formats):
+    """Parse date strings trying each format in turn; 'YYYY-MM-DD' strings, NaN when none fit."""
+    values = values.str.strip()
+    parsed = pd.Series(pd.NaT, index=values.index, dtype='datetime64[ns]')
+    for date_format in formats:
+        parsed = parsed.fillna(pd.to_datetime(values, format=date_format, errors='coerce'))
+    return parsed.dt.strftime('%Y-%m-%d').astype(object).where(parsed.notna(), float('nan'))
+
+def _parse_amounts(values):
+    """'3,000.00' / ' ' / '101' strings to float64, NaN for blanks."""
+    text = values.str.replace(',', '', regex=False).str.strip()
+    return pd.to_numeric(text.where(text != ''), errors='coerce').astype('float64')
+
+def read_bank_export(path):
+    """
+    Read a structured statement export into transaction columns.
+    Args:
+        path (str): CSV or .xls export, see EXPORT_LAYOUTS
+    Returns:
+        tuple: (pandas.DataFrame with Value Date, Description, Deposit,
+            Withdrawal and Balance, bank name)
+    """
+    if _is_spreadsheet(path):
+        found = _read_spreadsheet(path)
+        if found is None:
+            raise ValueError(f"{path} is not a recognised bank statement export")
+        df, bank = found
+        df = df.astype(object).where(df.notna(), '')
+    else:
+        found = _find_header(path)
+        if found is None:
+            raise ValueError(f"{path} is not a recognised bank statement export")
+        index, sep, bank = found
+        df = pd.read_csv(path, sep=sep, skiprows=index, dtype=str, keep_default_na=False,
+                         encoding='utf-8-sig', encoding_errors='replace', index_col=False)
+        # The Debit header is padded with spaces
+        df.columns = [str(col).strip() for col in df.columns]
+    layout = EXPORT_LAYOUTS[bank]
+    transactions = pd.DataFrame({
+        'Value Date': _parse_dates(df[layout['date']].astype(str), layout['date_formats']),
+        'Description': df[layout['description']].astype(str).str.replace(r'\s+', ' ', regex=True).str.strip(),
+        'Deposit': _parse_amounts(df[layout['deposit']].astype(str)),
+        'Withdrawal': _parse_amounts(df[layout['withdrawal']].astype(str)),
+        'Balance': _parse_amounts(df[layout['balance']].astype(str)),
+    })
+    # Footer lines such as "**This is a computer generated statement" have no date
+    return transactions[transactions['Value Date'].notna()].reset_index(drop=True), bank
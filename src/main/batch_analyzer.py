@@ -0,0 +1,114 @@
+import os
+import glob
+import json
+import fnmatch
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from bank_exports import detect_export
+from metrics import profiled
+from pdf_analyzer import extract_statement, save_transactions, warm_tabula
+
+def find_statements(source):
+    """
+    Resolve a directory or glob pattern into a sorted list of statements: PDFs,
+    plus structured CSV/XLS exports that have no PDF of the same name.
+    Args:
+        source (str): Directory containing PDFs, or a glob such as 'statements/*.pdf'
+    Returns:
+        list[str]: Matching statement paths
+    """
+    if os.path.isdir(source):
+        paths = [str(p) for p in Path(source).glob('*')]
+    else:
+        paths = glob.glob(source, recursive=True)
+    pdfs = [p for p in paths if p.lower().endswith('.pdf')]
+    exports = [p for p in paths if not p.lower().endswith('.pdf')
+               and not Path(p).with_suffix('.pdf').exists() and detect_export(p)]
+    return sorted(pdfs + exports)
+
+def load_passwords(spec):
+    """
+    Build a password map from a JSON file or a single password.
+    The JSON file maps file names or fnmatch patterns to passwords, e.g.
+    {"SCB Acct Statement 2.pdf": "...", "*.pdf": "..."}.
+    Args:
+        spec (str): Path to a JSON password map, or one password used for every file
+    Returns:
+        dict: Mapping of file name pattern to password
+    """
+    if spec.lower().endswith('.json') and os.path.isfile(spec):
+        with open(spec, encoding='utf-8') as f:
+            return json.load(f)
+    return {'*': spec}
+
+def password_for(pdf_path, passwords):
+    """Look up the password for a PDF, preferring an exact file name over patterns."""
+    name = Path(pdf_path).name
+    if name in passwords:
+        return passwords[name]
+    for pattern, password in passwords.items():
+        if fnmatch.fnmatch(name, pattern):
+            return password
+    return None
+
+def _extract_and_save(pdf_path, password, outputs, extract_options):
+    df = extract_statement(pdf_path, password, **extract_options)
+    if df is None:
+        return {'pdf': pdf_path, 'output': None, 'transactions': 0}
+    output_path = save_transactions(df, pdf_path, **outputs)
+    return {'pdf': pdf_path, 'output': str(output_path), 'transactions': len(df)}
+
+def _process_statement(pdf_path, password, outputs, extract_options, profile=False):
+    """Worker task: extract one statement and write its CSV, with a metrics report when profiling."""
+    if not profile:
+        return _extract_and_save(pdf_path, password, outputs, extract_options)
+    with profiled() as metrics:
+        result = _extract_and_save(pdf_path, password, outputs, extract_options)
+    return {**result, 'metrics': metrics['report']}
+
+def run_batch(source, password_spec, workers=None, parquet_dir=None, ledger_db=None, account=None, profile=False,
+              **extract_options):
+    """
+    Extract every statement matched by source using a pool of worker processes.
+    Each worker starts the tabula JVM once and reuses it for all of its files.
+    Args:
+        source (str): Directory or glob of PDF statements
+        password_spec (str): JSON password map or a single password
+        workers (int): Number of worker processes (default: CPU count)
+        parquet_dir (str): Also append every statement to this Parquet ledger
+        ledger_db (str): Also upsert every statement into this SQLite ledger
+        account (str): Account name in the SQLite ledger (default: each statement's bank)
+        profile (bool): Collect a metrics report per statement in result['metrics']
+        **extract_options: Keyword arguments passed to extract_statement
+    Returns:
+        list[dict]: One result per statement with 'pdf', 'output' and 'transactions'
+    """
+    pdf_paths = find_statements(source)
+    if not pdf_paths:
+        print(f"No PDF statements found for {source}")
+        return []
+    passwords = load_passwords(password_spec)
+    outputs = {'parquet_dir': parquet_dir, 'ledger_db': ledger_db, 'account': account}
+    workers = min(workers or os.cpu_count() or 1, len(pdf_paths))
+    print(f"\nProcessing {len(pdf_paths)} statements with {workers} workers...")
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=warm_tabula) as pool:
+        futures = {
+            pool.submit(_process_statement, pdf_path, password_for(pdf_path, passwords), outputs,
+                        extract_options, profile): pdf_path
+            for pdf_path in pdf_paths
+        }
+        for future in as_completed(futures):
+            pdf_path = futures[future]
+            try:
+                results.append(future.result())
+            except Exception as e:
+                print(f"Error processing {pdf_path}: {str(e)}")
+                results.append({'pdf': pdf_path, 'output': None, 'transactions': 0})
+    results.sort(key=lambda r: r['pdf'])
+    print("\nBatch summary:")
+    for r in results:
+        status = f"{r['transactions']} transactions -> {r['output']}" if r['output'] else "FAILED"
+        print(f"  {r['pdf']}: {status}")
+    return results
@@ -0,0 +1,166 @@
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import subprocess
+import tempfile
+from pathlib import Path
+from contextlib import redirect_stdout
+from datetime import datetime
+
+import pandas as pd
+
+from pdf_analyzer import (clean_amount, clean_date, clean_description, extract_bank_statement,
+                          finalize_transactions, new_year_state, parse_dates, tables_to_transactions)
+from statement_rules import bank_rules
+from synthetic_statements import generate_transactions, scb_tables, write_scb_pdf
+
+# Transactions per benchmark size; each step quadruples so the scaling curve shows
+DEFAULT_SIZES = [250, 1000, 4000, 16000]
+# Results are per machine, so they live in the user's cache rather than the repository
+DEFAULT_RESULTS = Path(os.environ.get('EXPENSE_TRACKER_BENCHMARKS',
+                                      Path.home() / '.cache' / 'expense_tracker' / 'benchmarks' / 'results.jsonl'))
+
+def _best_of(repeat, func):
+    """Smallest wall time of repeat calls, in seconds."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def _quiet(func):
+    """Run func with its progress prints swallowed."""
+    def run():
+        with redirect_stdout(io.StringIO()):
+            return func()
+    return run
+
+def benchmark_size(size, repeat=3, with_pdf=True, seed=0):
+    """
+    Time every stage at one statement size.
+    Args:
+        size (int): Number of synthetic transactions
+        repeat (int): Runs per stage; the best time is kept
+        with_pdf (bool): Also time extract_bank_statement on a generated PDF (needs Java)
+        seed (int): Random seed of the synthetic statement
+    Returns:
+        list[dict]: One result per stage with 'benchmark', 'size', 'rows' and 'seconds'
+    """
+    transactions = generate_transactions(size, seed=seed)
+    tables = scb_tables(transactions, seed=seed)
+    rules = bank_rules('SCB')
+    rows = pd.concat(tables, ignore_index=True)
+    descriptions = rows['Date   Value Description'].tolist()
+    amounts = rows['Balance'].tolist()
+    dates = [f"{txn['date'].day:02d}/{txn['date'].month:02d}/{txn['date'].year}" for txn in transactions]
+
+    def pipeline():
+        copies = [table.copy() for table in tables]
+        return finalize_transactions(tables_to_transactions(copies, new_year_state(), rules), rules)
+
+    output = pipeline()
+    results = []
+    stages = [
+        ('clean_description', len(descriptions), lambda: [clean_description(d, rules) for d in descriptions]),
+        ('clean_amount', len(amounts), lambda: [clean_amount(a) for a in amounts]),
+        ('clean_date', len(dates), lambda: [clean_date(d) for d in dates]),
+        # The bulk parser clean_date wraps, as tables_to_transactions calls it on whole columns
+        ('parse_dates', len(dates), lambda: parse_dates(pd.Series(dates, dtype=object))),
+        ('tables_to_transactions', len(rows), _quiet(pipeline)),
+    ]
+    with tempfile.TemporaryDirectory(prefix='expense_tracker_bench_') as tmp_dir:
+        csv_path = os.path.join(tmp_dir, 'out.csv')
+        stages.append(('csv_write', len(output), lambda: output.to_csv(csv_path, index=False)))
+        if with_pdf:
+            pdf_path = os.path.join(tmp_dir, 'statement.pdf')
+            write_scb_pdf(pdf_path, transactions)
+
+            def extract():
+                # extract_bank_statement reports errors itself and returns None
+                if extract_bank_statement(pdf_path, None, use_cache=False, use_template=False) is None:
+                    raise RuntimeError("extraction failed; is Java installed?")
+
+            stages.append(('extract_bank_statement', size, _quiet(extract)))
+        for name, count, func in stages:
+            try:
+                seconds = _best_of(repeat, func)
+            except Exception as e:
+                print(f"  {name}: skipped ({str(e)})")
+                continue
+            results.append({'benchmark': name, 'size': size, 'rows': count, 'seconds': round(seconds, 6)})
+            print(f"  {name:<24} {count:>8} rows  {seconds * 1000:10.2f} ms  {seconds / max(count, 1) * 1e6:8.2f} us/row")
+    return results
+
+def git_commit():
+    """Short hash of the checked-out commit, or None outside a git checkout."""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=Path(__file__).resolve().parent, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def record_results(results, results_path=DEFAULT_RESULTS):
+    """Append results, tagged with the commit and the machine, to a JSON lines file."""
+    results_path = Path(results_path)
+    results_path.parent.mkdir(parents=True, exist_ok=True)
+    run = {'commit': git_commit(), 'timestamp': datetime.now().isoformat(timespec='seconds'),
+           'python': platform.python_version(), 'machine': platform.node()}
+    with open(results_path, 'a', encoding='utf-8') as f:
+        for result in results:
+            f.write(json.dumps({**run, **result}) + '\n')
+    print(f"\nRecorded {len(results)} results in {results_path}")
+
+def compare_results(results_path=DEFAULT_RESULTS):
+    """
+    Compare the latest commit's results with the commit benchmarked before it,
+    stage by stage, using the newest result of each stage and size.
+    Returns:
+        pandas.DataFrame: Seconds per stage and size for both commits and their ratio
+    """
+    df = pd.read_json(results_path, lines=True, dtype={'commit': str})
+    df = df.sort_values('timestamp', kind='stable')
+    commits = list(dict.fromkeys(reversed(df['commit'].tolist())))
+    if len(commits) < 2:
+        print("Need results from two commits to compare")
+        return None
+    latest, previous = commits[0], commits[1]
+
+    def last_results(commit):
+        rows = df[df['commit'] == commit].drop_duplicates(['benchmark', 'size'], keep='last')
+        return rows.set_index(['benchmark', 'size'])['seconds']
+
+    table = pd.DataFrame({previous: last_results(previous), latest: last_results(latest)})
+    table['ratio'] = (table[latest] / table[previous]).round(3)
+    print(f"\n{latest} vs {previous} (ratio < 1 is faster):")
+    print(table.to_string())
+    return table
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the extraction pipeline on synthetic statements.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Transactions per statement")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per stage; the best time is kept")
+    parser.add_argument("--no-pdf", dest="with_pdf", action="store_false",
+                        help="Skip extract_bank_statement, which needs Java")
+    parser.add_argument("--results", default=str(DEFAULT_RESULTS),
+                        help="JSON lines file the results are added to (default: EXPENSE_TRACKER_BENCHMARKS or %(default)s)")
+    parser.add_argument("--no-record", dest="record", action="store_false", help="Only print the timings")
+    parser.add_argument("--compare", action="store_true", help="Compare the latest two commits' results and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(0 if compare_results(args.results) is not None else 1)
+    results = []
+    for size in args.sizes:
+        print(f"\n{size} transactions:")
+        results.extend(benchmark_size(size, args.repeat, args.with_pdf))
+    if args.record:
+        record_results(results, args.results)
+
+if __name__ == "__main__":
+    main()
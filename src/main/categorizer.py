@@ -0,0 +1,217 @@
+import os
+import re
+import json
+from functools import lru_cache
+
+import pandas as pd
+
+# Category rules, checked in this order:
+#   upi      - exact UPI IDs, VPAs, phone numbers or payee names (one '/'-separated
+#              part of the description) -> category; a dictionary lookup
+#   merchants - merchant words or phrases -> category, matched on whole words
+#              through a word trie, so the cost does not grow with the rule count
+#   regex    - [pattern, category] pairs for anything else; tried last, keep them few
+# Short names that are also common words or abbreviations ('OLA', 'LIC', 'RD'
+# as in road) only count as a whole UPI payee, or inside a longer phrase.
+DEFAULT_CATEGORY_RULES = {
+    'upi': {'OLA': 'Auto', 'LIC': 'Insurance'},
+    'merchants': {
+        'RAPIDO': 'Auto', 'UBER': 'Auto', 'OLA CABS': 'Auto', 'OLACABS': 'Auto', 'NAMMA YATRI': 'Auto',
+        'DMART': 'Food/Grocery', 'AVENUE SUPERMARTS': 'Food/Grocery', 'BIGBASKET': 'Food/Grocery',
+        'BLINKIT': 'Food/Grocery', 'ZEPTO': 'Food/Grocery', 'INSTAMART': 'Food/Grocery',
+        'SWIGGY': 'Restaurants', 'ZOMATO': 'Restaurants',
+        'SIP': 'Investments', 'NATIONAL PENSION SCHEME': 'Investments', 'NPS': 'Investments',
+        'ZERODHA': 'Investments', 'GROWW': 'Investments', 'MUTUAL FUND': 'Investments',
+        'RD INSTALLMENT': 'Investments', 'RD INSTALMENT': 'Investments', 'RECURRING DEPOSIT': 'Investments',
+        'AIRTEL': 'Internet', 'JIO': 'Internet', 'ACT FIBERNET': 'Internet',
+        'IRCTC': 'Travel', 'MAKEMYTRIP': 'Travel', 'INDIGO': 'Travel', 'REFUEL': 'Travel',
+        'RENT': 'Rent',
+        'MAKEUP': 'Makeup', 'NYKAA': 'Makeup',
+        'MYNTRA': 'Clothes', 'AJIO': 'Clothes',
+        'PMSBY': 'Insurance', 'PMJJBY': 'Insurance', 'LIC OF INDIA': 'Insurance',
+        'LIFE INSURANCE CORPORATION': 'Insurance',
+        'ATM WDL': 'Cash', 'ATM CASH': 'Cash',
+        'CREDIT INTEREST': 'Interest',
+        'NEFT CRED SALARY': 'Salary',
+    },
+    'regex': [
+        [r'\bDENTAL\b|\bDENTIST', 'Dental Procedure'],
+    ],
+}
+
+WORD_PATTERN = re.compile(r'[A-Z0-9]+')
+DIGITS = re.compile(r'\d+')
+# A rule that mentions a digit (or \d) can tell reference numbers apart
+DIGIT_RULE = re.compile(r'[0-9]|\\d')
+
+# UPI handles, the bank's (DR)/(CR)/(reference) markers and month names say
+# nothing about the payee; neither do digits and punctuation
+MERCHANT_NOISE = re.compile(r"\((?:DR|CR|\d+)\)|[^\s/]+@[^\s/]+|\b(?:JAN|FEB|MAR|APR|MAY|JUN|JUL|AUG|SEP|OCT|NOV|DEC)\b")
+UNKNOWN_MERCHANT = 'Uncategorized'
+
+# Trie node key holding the category of a phrase ending at that node
+END = None
+
+def load_category_rules(rules_path=None):
+    """
+    Return the default rules, extended and overridden by a JSON rules file.
+    Args:
+        rules_path (str): JSON file shaped like DEFAULT_CATEGORY_RULES
+    Returns:
+        dict: Combined rules
+    """
+    rules = {
+        'upi': dict(DEFAULT_CATEGORY_RULES['upi']),
+        'merchants': dict(DEFAULT_CATEGORY_RULES['merchants']),
+        'regex': list(DEFAULT_CATEGORY_RULES['regex']),
+    }
+    if rules_path:
+        with open(rules_path, encoding='utf-8') as f:
+            extra = json.load(f)
+        rules['upi'].update(extra.get('upi', {}))
+        rules['merchants'].update(extra.get('merchants', {}))
+        # File regexes come first so they can override the defaults
+        rules['regex'] = list(extra.get('regex', [])) + rules['regex']
+    return rules
+
+def build_trie(phrases):
+    """
+    Build a word trie from merchant phrases.
+    Args:
+        phrases (dict): Merchant word or phrase -> category
+    Returns:
+        dict: Nested word -> node dicts; END marks where a phrase finishes
+    """
+    root = {}
+    for phrase, category in phrases.items():
+        node = root
+        words = WORD_PATTERN.findall(phrase.upper())
+        if not words:
+            continue
+        for word in words:
+            node = node.setdefault(word, {})
+        node[END] = category
+    return root
+
+def compile_classifier(rules):
+    """
+    Compile category rules for matching.
+    Args:
+        rules (dict): Rules shaped like DEFAULT_CATEGORY_RULES
+    Returns:
+        dict: 'upi' lookup, merchant 'trie', one combined 'regex' with a group per
+            rule, and 'ignores_digits' when no rule mentions a digit
+    """
+    upi = {str(key).strip().upper(): category for key, category in rules['upi'].items()}
+    regex, regex_categories = None, {}
+    if rules['regex']:
+        groups = []
+        for i, (pattern, category) in enumerate(rules['regex']):
+            groups.append(f"(?P<r{i}>{pattern})")
+            regex_categories[f"r{i}"] = category
+        regex = re.compile('|'.join(groups), re.IGNORECASE)
+    rule_texts = list(upi) + list(rules['merchants']) + [pattern for pattern, _ in rules['regex']]
+    return {'upi': upi, 'trie': build_trie(rules['merchants']), 'regex': regex,
+            'regex_categories': regex_categories,
+            'ignores_digits': not any(DIGIT_RULE.search(str(text)) for text in rule_texts)}
+
+def match_merchant(words, trie):
+    """Category of the longest merchant phrase in a word list (earliest on ties), or None."""
+    best, best_length = None, 0
+    for start in range(len(words)):
+        node = trie
+        for length, word in enumerate(words[start:], 1):
+            node = node.get(word)
+            if node is None:
+                break
+            if END in node and length > best_length:
+                best, best_length = node[END], length
+    return best
+
+def classify(description, classifier):
+    """
+    Categorize one description.
+    Args:
+        description (str): Cleaned transaction description
+        classifier (dict): Output of compile_classifier
+    Returns:
+        str: Category, or None when no rule matches
+    """
+    if description is None or pd.isna(description):
+        return None
+    text = str(description).upper()
+    upi = classifier['upi']
+    if upi:
+        for part in text.split('/'):
+            category = upi.get(part.strip())
+            if category is not None:
+                return category
+    category = match_merchant(WORD_PATTERN.findall(text), classifier['trie'])
+    if category is not None:
+        return category
+    if classifier['regex'] is not None:
+        match = classifier['regex'].search(text)
+        if match:
+            return classifier['regex_categories'][match.lastgroup]
+    return None
+
+@lru_cache(maxsize=None)
+def _cached_classifier(rules_path, mtime_ns):
+    return compile_classifier(load_category_rules(rules_path or None))
+
+def load_classifier(rules_path=''):
+    """
+    Return the compiled classifier for a rules file ('' for the defaults only).
+    Compiled classifiers are kept until the file changes, so a long-running
+    process picks up edited rules on the next statement.
+    """
+    mtime_ns = os.stat(rules_path).st_mtime_ns if rules_path else 0
+    return _cached_classifier(rules_path, mtime_ns)
+
+def payee_keys(descriptions, classifier):
+    """
+    Key each description on what the rules can see of its payee: uppercased
+    and, unless a rule mentions digits, with every run of digits replaced by
+    one '0'. Payments to one payee differ only in dates and UPI reference
+    numbers, so they share a key; a digit still stands where the digits were,
+    so words and word boundaries - all the rules match on - are unchanged.
+    Args:
+        descriptions (pandas.Series): Cleaned descriptions
+        classifier (dict): Output of compile_classifier
+    Returns:
+        pandas.Series: Keys that classify the same as their descriptions
+    """
+    keys = pd.Series(descriptions, dtype=object)
+    keys = keys.where(keys.isna(), keys.astype(str)).str.upper()
+    if classifier['ignores_digits']:
+        keys = keys.str.replace(DIGITS, '0', regex=True)
+    return keys
+
+def categorize(descriptions, classifier):
+    """
+    Categorize a whole column; each distinct payee key (see payee_keys) is
+    classified once, so repeat payments cost a dictionary lookup.
+    Args:
+        descriptions (pandas.Series): Cleaned descriptions
+        classifier (dict): Output of compile_classifier
+    Returns:
+        pandas.Series: Categories, None where no rule matches
+    """
+    keys = payee_keys(descriptions, classifier)
+    memo = {key: classify(key, classifier) for key in keys.dropna().unique()}
+    categories = keys.map(memo)
+    return categories.astype(object).where(categories.notna(), None)
+
+def merchant_names(descriptions):
+    """
+    Payee part of each description, the same for every payment to one payee:
+    the uppercase words left after dropping dates, reference numbers, UPI
+    handles and markers, e.g. 'SWIGGY (swiggy@ybl) - Payment' -> 'SWIGGY PAYMENT'.
+    Args:
+        descriptions (pandas.Series): Descriptions, as written by format_description
+    Returns:
+        pandas.Series: Payee names; 'Uncategorized' when nothing is left
+    """
+    text = pd.Series(descriptions, dtype=object).fillna('').astype(str).str.upper()
+    text = text.str.replace(MERCHANT_NOISE, ' ', regex=True).str.replace(r'[^A-Z]+', ' ', regex=True).str.strip()
+    return text.where(text != '', UNKNOWN_MERCHANT)
@@ -0,0 +1,28 @@
+from docx.shared import Pt, Inches
+from docx.enum.text import WD_LINE_SPACING
+from docx.oxml.ns import qn
+from docx.oxml import OxmlElement
+
+def add_horizontal_line(paragraph):
+    p = paragraph._element
+    pPr = p.get_or_add_pPr()
+    pBdr = OxmlElement('w:pBdr')
+    bottom = OxmlElement('w:bottom')
+    bottom.set(qn('w:val'), 'single')
+    bottom.set(qn('w:sz'), '6')
+    bottom.set(qn('w:space'), '1')
+    bottom.set(qn('w:color'), '000000')
+    pBdr.append(bottom)
+    pPr.append(pBdr)
+
+def set_paragraph_format(paragraph, font_size=11, font_name='Calibri', indent=0, space_after=6):
+    # The font belongs to the paragraph's style, shared by every paragraph using
+    # it; only touch it when it changes instead of rewriting it on every call
+    font = paragraph.style.font
+    if font.name != font_name:
+        font.name = font_name
+    if font.size != Pt(font_size):
+        font.size = Pt(font_size)
+    paragraph.paragraph_format.left_indent = Inches(indent)
+    paragraph.paragraph_format.space_after = Pt(space_after)
+    paragraph.paragraph_format.line_spacing_rule = WD_LINE_SPACING.SINGLE
@@ -0,0 +1,240 @@
+import re
+import glob
+import argparse
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+import pandas as pd
+
+from categorizer import categorize, load_classifier, merchant_names
+from spend_rollups import UNCATEGORIZED
+
+# Monthly or yearly expense reports as .docx, from extracted transaction CSVs
+# or the SQLite ledger. Styles are set up once per document; the big tables
+# are written as one block of table XML instead of cell by cell through
+# python-docx, which is what keeps a year of transactions to a second or two.
+TOP_MERCHANTS = 10
+AMOUNT_FORMAT = '{:,.2f}'
+
+# Control characters XML 1.0 does not allow; PDF text sometimes carries them
+XML_INVALID = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+REPORT_STYLES = {
+    'Normal': {'font': 'Calibri', 'size': 10, 'space_after': 4},
+    'Title': {'font': 'Calibri', 'size': 20, 'space_after': 6},
+    'Heading 1': {'font': 'Calibri', 'size': 13, 'space_after': 4},
+}
+
+def _require_docx():
+    try:
+        import docx
+    except ImportError:
+        raise ImportError("Reports need python-docx: pip install python-docx")
+    return docx
+
+def load_transactions(csv_paths=(), ledger_db=None, account=None, categories=''):
+    """
+    Read transactions from extracted CSVs and/or the SQLite ledger.
+    Args:
+        csv_paths (list[str]): CSVs written by pdf_analyzer.py (globs allowed)
+        ledger_db (str): SQLite ledger, see sqlite_ledger.py
+        account (str): Only this account from the ledger
+        categories (str): Category rules file for rows without a Category ('' for the built-in rules)
+    Returns:
+        pandas.DataFrame: Value Date (datetime64), Description, Deposit, Withdrawal, Category
+    """
+    frames = []
+    for pattern in csv_paths:
+        for path in sorted(glob.glob(pattern)) or [pattern]:
+            frames.append(pd.read_csv(path))
+    if ledger_db:
+        from sqlite_ledger import query_transactions
+        ledger = query_transactions(ledger_db, account=account)
+        frames.append(ledger.rename(columns={'value_date': 'Value Date', 'description': 'Description',
+                                             'deposit': 'Deposit', 'withdrawal': 'Withdrawal',
+                                             'category': 'Category'}))
+    if not frames:
+        raise ValueError("No transactions: give transaction CSVs or --ledger-db")
+    df = pd.concat(frames, ignore_index=True)
+    df['Value Date'] = pd.to_datetime(df['Value Date'], errors='coerce')
+    df = df.dropna(subset=['Value Date'])
+    for col in ('Deposit', 'Withdrawal'):
+        df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0.0)
+    if 'Category' not in df.columns:
+        df['Category'] = None
+    missing = df['Category'].isna()
+    if missing.any() and categories is not None:
+        df.loc[missing, 'Category'] = categorize(df.loc[missing, 'Description'], load_classifier(categories)).to_numpy()
+    df['Category'] = df['Category'].fillna(UNCATEGORIZED)
+    return df[['Value Date', 'Description', 'Deposit', 'Withdrawal', 'Category']].sort_values('Value Date', kind='stable')
+
+def _period(df, year, month):
+    months = df['Value Date'].dt.to_period('M')
+    if month:
+        current = pd.Period(year=year, month=month, freq='M')
+        return df[months == current], df[months == current - 1]
+    years = df['Value Date'].dt.year
+    return df[years == year], df[years == year - 1]
+
+def category_summary(df, previous):
+    """Spent, received and count per category, with the share of spending and the change from the previous period."""
+    summary = df.groupby('Category').agg(spent=('Withdrawal', 'sum'), received=('Deposit', 'sum'),
+                                         transactions=('Withdrawal', 'size'))
+    total = summary['spent'].sum()
+    summary['share'] = summary['spent'] / total if total else 0.0
+    summary['previous'] = previous.groupby('Category')['Withdrawal'].sum().reindex(summary.index).fillna(0.0)
+    summary['change'] = summary['spent'] - summary['previous']
+    return summary.sort_values('spent', ascending=False)
+
+def top_merchants(df, count=TOP_MERCHANTS):
+    """The payees with the most spent."""
+    spending = df[df['Withdrawal'] > 0]
+    merchants = spending.groupby(merchant_names(spending['Description'])).agg(
+        spent=('Withdrawal', 'sum'), transactions=('Withdrawal', 'size'))
+    return merchants.sort_values('spent', ascending=False).head(count)
+
+def month_summary(df):
+    """Spent and received per month, with the month-over-month change in spending."""
+    months = df.groupby(df['Value Date'].dt.to_period('M')).agg(spent=('Withdrawal', 'sum'),
+                                                                 received=('Deposit', 'sum'))
+    months['change'] = months['spent'].diff()
+    months['change_pct'] = months['spent'].pct_change().replace([float('inf'), float('-inf')], float('nan')) * 100
+    return months
+
+def _amount(value):
+    return '' if pd.isna(value) else AMOUNT_FORMAT.format(value)
+
+def _xml_text(value):
+    return escape(XML_INVALID.sub('', str(value)))
+
+def _change(value):
+    return '' if pd.isna(value) else f"{value:+,.2f}"
+
+def setup_styles(doc):
+    """Set the fonts and spacing of the report's styles, once per document."""
+    from docx.shared import Pt
+    for name, spec in REPORT_STYLES.items():
+        style = doc.styles[name]
+        style.font.name = spec['font']
+        style.font.size = Pt(spec['size'])
+        style.paragraph_format.space_after = Pt(spec['space_after'])
+
+def add_section(doc, title):
+    """Section heading with the rule line used in the CV template."""
+    from docx_format import add_horizontal_line
+    heading = doc.add_heading(title, level=1)
+    add_horizontal_line(heading)
+    return heading
+
+def add_bulk_table(doc, columns, rows, numeric=(), style='Light List Accent 1'):
+    """
+    Add a table, writing the body rows as one block of WordprocessingML.
+    Going through table.add_row() and cell.text costs several XML lookups per
+    cell; for thousands of rows that is minutes instead of milliseconds.
+    Args:
+        doc (docx.document.Document): Document to append to
+        columns (list[str]): Header labels
+        rows (list[list[str]]): Cell texts, already formatted; characters XML can't hold are dropped
+        numeric (set[int]): Column positions to right-align
+        style (str): Table style of the document template
+    Returns:
+        docx.table.Table: The new table
+    """
+    from docx.oxml import parse_xml
+    from docx.oxml.ns import nsdecls
+    table = doc.add_table(rows=1, cols=len(columns))
+    table.style = doc.styles[style]
+    for cell, label in zip(table.rows[0].cells, columns):
+        cell.text = label
+    right = '<w:pPr><w:jc w:val="right"/></w:pPr>'
+    body = ''.join(
+        '<w:tr>' + ''.join(
+            f'<w:tc><w:p>{right if i in numeric else ""}<w:r><w:t xml:space="preserve">{_xml_text(text)}</w:t></w:r></w:p></w:tc>'
+            for i, text in enumerate(row)) + '</w:tr>'
+        for row in rows)
+    if body:
+        for tr in parse_xml(f'<w:tbl {nsdecls("w")}>{body}</w:tbl>'):
+            table._tbl.append(tr)
+    return table
+
+def render_report(df, output_path, year, month=None, with_transactions=True):
+    """
+    Write a monthly (month given) or yearly expense report.
+    Args:
+        df (pandas.DataFrame): Output of load_transactions
+        output_path (str): .docx file to write
+        year (int): Report year
+        month (int): Report month; None for a yearly report
+        with_transactions (bool): Append every transaction of the period
+    Returns:
+        dict: Row counts of the rendered sections
+    """
+    docx = _require_docx()
+    current, previous = _period(df, year, month)
+    label = pd.Period(year=year, month=month, freq='M').strftime('%B %Y') if month else str(year)
+    previous_label = 'previous month' if month else str(year - 1)
+    doc = docx.Document()
+    setup_styles(doc)
+    doc.add_heading(f"Expense report: {label}", level=0)
+    spent, received = current['Withdrawal'].sum(), current['Deposit'].sum()
+    doc.add_paragraph(f"{len(current)} transactions. Spent {_amount(spent)}, received {_amount(received)}, "
+                      f"net {_change(received - spent)}. Previous period spent {_amount(previous['Withdrawal'].sum())}.")
+
+    add_section(doc, "Spending by category")
+    categories = category_summary(current, previous)
+    add_bulk_table(doc, ['Category', 'Spent', 'Share', 'Received', 'Transactions', f'Change vs {previous_label}'],
+                   [[row.Index, _amount(row.spent), f"{row.share:.1%}", _amount(row.received), row.transactions,
+                     _change(row.change)] for row in categories.itertuples()], numeric={1, 2, 3, 4, 5})
+
+    add_section(doc, "Top merchants")
+    merchants = top_merchants(current)
+    add_bulk_table(doc, ['Merchant', 'Spent', 'Transactions'],
+                   [[row.Index, _amount(row.spent), row.transactions] for row in merchants.itertuples()],
+                   numeric={1, 2})
+
+    add_section(doc, "Month over month")
+    # The month before the period gives its first month a change too
+    months = month_summary(pd.concat([previous, current]))
+    months = months[months.index.year == year]
+    if month:
+        months = months[months.index.month == month]
+    add_bulk_table(doc, ['Month', 'Spent', 'Received', 'Change', 'Change %'],
+                   [[row.Index.strftime('%b %Y'), _amount(row.spent), _amount(row.received), _change(row.change),
+                     '' if pd.isna(row.change_pct) else f"{row.change_pct:+.1f}%"] for row in months.itertuples()],
+                   numeric={1, 2, 3, 4})
+
+    if with_transactions:
+        add_section(doc, "Transactions")
+        add_bulk_table(doc, ['Date', 'Description', 'Category', 'Deposit', 'Withdrawal'],
+                       zip(current['Value Date'].dt.strftime('%Y-%m-%d'), current['Description'].fillna(''),
+                           current['Category'], current['Deposit'].map(lambda v: _amount(v) if v else ''),
+                           current['Withdrawal'].map(lambda v: _amount(v) if v else '')),
+                       numeric={3, 4})
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    doc.save(output_path)
+    return {'transactions': len(current), 'categories': len(categories), 'merchants': len(merchants),
+            'months': len(months)}
+
+def main():
+    parser = argparse.ArgumentParser(description="Render a monthly or yearly expense report as a Word document.")
+    parser.add_argument("csv_paths", nargs="*", help="Transaction CSVs written by pdf_analyzer.py (globs allowed)")
+    parser.add_argument("--ledger-db", metavar="DB", default=None, help="Read transactions from the SQLite ledger")
+    parser.add_argument("--account", default=None, help="Only this ledger account")
+    parser.add_argument("--year", type=int, required=True, help="Report year")
+    parser.add_argument("--month", type=int, default=None, help="Report month (1-12); omit for a yearly report")
+    parser.add_argument("--categorize", default="", metavar="RULES_JSON",
+                        help="Category rules for rows without a category (default: the built-in rules)")
+    parser.add_argument("--no-transactions", dest="with_transactions", action="store_false",
+                        help="Leave out the list of every transaction")
+    parser.add_argument("--output", default=None, help="Output .docx (default: expense_report_<period>.docx)")
+    args = parser.parse_args()
+
+    df = load_transactions(args.csv_paths, args.ledger_db, args.account, args.categorize)
+    period = f"{args.year}-{args.month:02d}" if args.month else str(args.year)
+    output = args.output or f"expense_report_{period}.docx"
+    counts = render_report(df, output, args.year, args.month, args.with_transactions)
+    print(f"Report for {period} written to {output}: {counts['transactions']} transactions, "
+          f"{counts['categories']} categories")
+
+if __name__ == "__main__":
+    main()
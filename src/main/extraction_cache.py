@@ -0,0 +1,134 @@
+import os
+import json
+import pickle
+import hashlib
+import tempfile
+from pathlib import Path
+from functools import lru_cache
+
+# Raw tabula tables are cached on disk, keyed by the PDF's content hash and the
+# extraction options, so re-running the cleaning logic skips the JVM entirely.
+# Entries are unencrypted pickles, readable only by the owner. Tables of
+# password-protected statements are only cached when
+# EXPENSE_TRACKER_CACHE_ENCRYPTED=1, and their key includes a hash of the password.
+CACHE_DIR = Path(os.environ.get('EXPENSE_TRACKER_CACHE', Path.home() / '.cache' / 'expense_tracker' / 'tables'))
+CACHE_MAX_BYTES = int(os.environ.get('EXPENSE_TRACKER_CACHE_MAX_MB', '256')) * 1024 * 1024
+CACHE_ENCRYPTED = os.environ.get('EXPENSE_TRACKER_CACHE_ENCRYPTED', '') == '1'
+CACHE_VERSION = 2
+PASSWORD_HASH_ITERATIONS = 200_000
+
+def file_digest(pdf_path, chunk_size=1024 * 1024):
+    """Return the SHA-256 hex digest of a file's content."""
+    digest = hashlib.sha256()
+    with open(pdf_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+@lru_cache(maxsize=32)
+def password_hash(password, digest):
+    """Slow PBKDF2 hash of a PDF's password, salted with the file's digest."""
+    return hashlib.pbkdf2_hmac('sha256', (password or '').encode(), digest.encode(),
+                               PASSWORD_HASH_ITERATIONS).hex()
+
+def cache_key(pdf_path, options, digest=None, password=None):
+    """
+    Build the cache key for a PDF and a set of extraction options.
+    Args:
+        pdf_path (str): Path to the PDF file
+        options (dict): tabula options that influence the extracted tables
+        digest (str): The PDF's file_digest, if already computed
+        password (str): Password of an encrypted PDF; only the same password finds the entry again
+    Returns:
+        str: Hex key naming the cache entry
+    """
+    digest = digest or file_digest(pdf_path)
+    key = hashlib.sha256()
+    key.update(digest.encode())
+    if password is not None:
+        key.update(password_hash(password, digest).encode())
+    key.update(json.dumps({'version': CACHE_VERSION, **options}, sort_keys=True, default=str).encode())
+    return key.hexdigest()
+
+def _entry_path(key, cache_dir):
+    return Path(cache_dir) / f"{key}.pkl"
+
+def load_tables(key, cache_dir=CACHE_DIR):
+    """Return the cached tables for key, or None on a miss."""
+    path = _entry_path(key, cache_dir)
+    try:
+        with open(path, 'rb') as f:
+            tables = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+    # Touch the entry so eviction treats it as recently used
+    os.utime(path)
+    return tables
+
+def store_tables(key, tables, cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+    """Write tables to the cache atomically, then evict old entries over the size cap."""
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+    # mkstemp creates the file readable by its owner only
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(tables, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, _entry_path(key, cache_dir))
+    except OSError as e:
+        print(f"Warning: could not write extraction cache: {str(e)}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return
+    evict(cache_dir, max_bytes)
+
+def evict(cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+    """Delete least recently used entries until the cache fits in max_bytes."""
+    entries = []
+    for path in Path(cache_dir).glob('*.pkl'):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            path.unlink()
+            total -= size
+        except OSError:
+            pass
+
+def cached_read(pdf_path, options, read, use_cache=True, refresh=False, digest=None, encrypted=False,
+                password=None, cache_dir=None):
+    """
+    Return the tables for pdf_path from the cache, calling read() on a miss.
+    Encrypted PDFs bypass the cache unless EXPENSE_TRACKER_CACHE_ENCRYPTED=1.
+    Args:
+        pdf_path (str): Path to the PDF file
+        options (dict): Extraction options that are part of the cache key
+        read (callable): Performs the real extraction and returns a list of tables
+        use_cache (bool): Set False to bypass the cache completely
+        refresh (bool): Re-extract and overwrite any cached entry
+        digest (str): The PDF's file_digest, so callers reading many page
+            ranges of one file hash it only once
+        encrypted (bool): Whether the PDF is password-protected
+        password (str): Password of an encrypted PDF, part of its cache key
+        cache_dir (str): Cache directory (default: CACHE_DIR)
+    Returns:
+        list[pandas.DataFrame]: Extracted tables
+    """
+    if not use_cache or (encrypted and not CACHE_ENCRYPTED):
+        return read()
+    key = cache_key(pdf_path, options, digest, password if encrypted else None)
+    cache_dir = cache_dir or CACHE_DIR
+    if not refresh:
+        tables = load_tables(key, cache_dir)
+        if tables is not None:
+            print(f"\nUsing cached tables for {pdf_path}")
+            return tables
+    tables = read()
+    store_tables(key, tables, cache_dir)
+    return tables
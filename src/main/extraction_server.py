@@ -0,0 +1,308 @@
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import threading
+import ipaddress
+import http.client
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# Resident extraction server. pandas, PyPDF2 and tabula are imported, and the
+# JVM started, once per worker process when the server starts; each request
+# then only pays for the extraction itself. The client side of this module
+# imports nothing but the standard library so that a request starts in tens
+# of milliseconds. The server reads local paths and runs jobs without any
+# authentication, so it refuses to bind to anything but the loopback interface,
+# only takes JSON bodies without an Origin header (so a web page open in a
+# browser can't post jobs to it) and only writes ledgers under its output roots.
+DEFAULT_ADDRESS = os.environ.get('EXPENSE_TRACKER_SERVER', '127.0.0.1:8765')
+# Directories ledgers may be written to, separated by os.pathsep (default: the server's working directory)
+OUTPUT_ROOTS = [path for path in os.environ.get('EXPENSE_TRACKER_SERVER_OUTPUTS', '').split(os.pathsep) if path]
+PREVIEW_ROWS = 10
+
+def _split_address(address):
+    host, _, port = address.rpartition(':')
+    return host.strip('[]') or '127.0.0.1', int(port)
+
+def _is_loopback(host):
+    """True for 'localhost' and loopback IPs (127.0.0.0/8, ::1)."""
+    if host.lower() == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+def _warm_worker():
+    """Worker initializer: import the extraction modules and start the JVM."""
+    from pdf_analyzer import warm_tabula
+    warm_tabula()
+
+def _extract_job(path, password, outputs, extract_options):
+    """
+    Worker task: extract one statement and write its outputs, like the CLI.
+    Returns:
+        dict: 'pdf', 'output', 'transactions' and a text 'preview' of the first rows
+    """
+    from pdf_analyzer import extract_statement, save_transactions
+    df = extract_statement(path, password, **extract_options)
+    if df is None:
+        return {'pdf': path, 'output': None, 'transactions': 0, 'preview': None}
+    output_path = save_transactions(df, path, **outputs)
+    return {'pdf': path, 'output': str(output_path), 'transactions': len(df),
+            'preview': df.head(PREVIEW_ROWS).to_string()}
+
+def _start_pool(workers, initializer=_warm_worker):
+    """Process pool with every worker started, so the first requests don't pay for imports and the JVM."""
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=initializer)
+    for future in [pool.submit(os.getpid) for _ in range(workers)]:
+        future.result()
+    return pool
+
+def _job_error(job):
+    """Why a decoded /extract body can't be run, or None when it can."""
+    if not isinstance(job['path'], str):
+        return "'path' must be a string"
+    if not isinstance(job.get('password'), (str, type(None))):
+        return "'password' must be a string or null"
+    for key in ('outputs', 'options'):
+        if not isinstance(job.get(key) or {}, dict):
+            return f"'{key}' must be an object"
+    for key, value in (job.get('outputs') or {}).items():
+        if not isinstance(value, (str, type(None))):
+            return f"output '{key}' must be a string or null"
+    return None
+
+def _outside_roots(outputs, roots):
+    """The first ledger output of a job that is not inside one of the roots, or None."""
+    for key, value in outputs.items():
+        if key == 'account' or not value:
+            continue
+        path = Path(value).resolve()
+        if not any(path == root or root in path.parents for root in roots):
+            return key
+    return None
+
+class ExtractionServer(ThreadingHTTPServer):
+    """
+    HTTP server holding the worker pool. A pool broken by a dying worker is
+    replaced by a fresh one, so later requests keep working.
+    Args:
+        address (tuple): (host, port); an IPv6 host binds over AF_INET6
+        workers (int): Worker processes
+        output_roots (list[str]): Directories ledgers may be written to
+        initializer (callable): Worker initializer (default: import the extraction code and start the JVM)
+    """
+    daemon_threads = True
+
+    def __init__(self, address, workers, output_roots, initializer=_warm_worker):
+        if ':' in address[0]:
+            self.address_family = socket.AF_INET6
+        self.workers = workers
+        self.output_roots = [Path(root).resolve() for root in output_roots]
+        self.initializer = initializer
+        self.pool = None
+        self._pool_lock = threading.Lock()
+        super().__init__(address, ExtractionHandler)
+
+    def restart_pool(self, broken):
+        """Replace a broken pool, unless another request already did."""
+        with self._pool_lock:
+            if self.pool is broken:
+                print("A worker died; restarting the worker pool")
+                broken.shutdown(wait=False, cancel_futures=True)
+                self.pool = _start_pool(self.workers, self.initializer)
+
+    def run(self, *job):
+        """Run _extract_job in the pool."""
+        pool = self.pool
+        try:
+            return pool.submit(_extract_job, *job).result()
+        except BrokenProcessPool:
+            self.restart_pool(pool)
+            raise
+
+    def server_close(self):
+        super().server_close()
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+
+class ExtractionHandler(BaseHTTPRequestHandler):
+    """
+    GET  /health  -> {"status": "ok", "workers": N}
+    POST /extract -> body {"path", "password", "options", "outputs"}, replies with
+                     the job result and the server-side 'seconds'
+    """
+    server_version = 'ExpenseTrackerExtraction/1'
+
+    def _reply(self, status, body):
+        data = json.dumps(body, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path != '/health':
+            return self._reply(404, {'error': f"unknown path {self.path}"})
+        self._reply(200, {'status': 'ok', 'workers': self.server.workers})
+
+    def do_POST(self):
+        if self.path != '/extract':
+            return self._reply(404, {'error': f"unknown path {self.path}"})
+        # Browsers add Origin to cross-site requests and can only send JSON after a CORS preflight
+        if self.headers.get('Origin') is not None:
+            return self._reply(403, {'error': "requests from web pages are not accepted"})
+        if self.headers.get_content_type() != 'application/json':
+            return self._reply(415, {'error': "expected Content-Type: application/json"})
+        try:
+            job = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+            path = job['path']
+        except (ValueError, KeyError, TypeError):
+            return self._reply(400, {'error': "expected a JSON body with a 'path'"})
+        error = _job_error(job)
+        if error:
+            return self._reply(400, {'error': error})
+        key = _outside_roots(job.get('outputs') or {}, self.server.output_roots)
+        if key:
+            roots = ', '.join(map(str, self.server.output_roots))
+            return self._reply(403, {'error': f"output '{key}' must be inside the server's output roots ({roots})"})
+        if not os.path.exists(path):
+            return self._reply(404, {'error': f"statement not found at {path}"})
+        start = time.perf_counter()
+        try:
+            result = self.server.run(path, job.get('password'), job.get('outputs') or {}, job.get('options') or {})
+        except BrokenProcessPool:
+            return self._reply(500, {'error': "the worker extracting this statement died; workers were restarted"})
+        except Exception as e:
+            return self._reply(500, {'error': str(e)})
+        self._reply(200, {**result, 'seconds': round(time.perf_counter() - start, 3)})
+
+    def log_message(self, format, *args):
+        print(f"{self.log_date_time_string()} {format % args}")
+
+def serve(address=DEFAULT_ADDRESS, workers=None, output_roots=None):
+    """
+    Run the extraction server until interrupted.
+    Args:
+        address (str): Loopback 'host:port' to listen on (default: EXPENSE_TRACKER_SERVER or 127.0.0.1:8765)
+        workers (int): Worker processes, i.e. statements extracted concurrently (default: CPU count)
+        output_roots (list[str]): Directories --parquet/--ledger-db outputs may be in
+            (default: EXPENSE_TRACKER_SERVER_OUTPUTS, else the working directory)
+    Raises:
+        ValueError: When the host is not a loopback address
+    """
+    host, port = _split_address(address)
+    if not _is_loopback(host):
+        raise ValueError(f"The extraction server only listens on loopback addresses "
+                         f"(localhost, 127.0.0.1, ::1), not {host}")
+    workers = workers or os.cpu_count() or 1
+    server = ExtractionServer((host, port), workers, output_roots or OUTPUT_ROOTS or [os.getcwd()])
+    try:
+        server.pool = _start_pool(workers, server.initializer)
+        print(f"Extraction server listening on {host}:{port} with {workers} workers, writing ledgers under "
+              f"{', '.join(map(str, server.output_roots))}. Press Ctrl+C to stop.")
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopping extraction server")
+    finally:
+        server.server_close()
+
+def request_extraction(path, password=None, address=DEFAULT_ADDRESS, outputs=None, timeout=600, **extract_options):
+    """
+    Ask a running server to extract a statement.
+    Args:
+        path (str): Statement path; made absolute, as the server has its own working directory
+        password (str): PDF password
+        address (str): 'host:port' of the server
+        outputs (dict): parquet_dir / ledger_db / account, see save_transactions
+        timeout (float): Seconds to wait for the extraction
+        **extract_options: Keyword arguments passed to extract_statement
+    Returns:
+        dict: The server's reply, see ExtractionHandler
+    Raises:
+        ConnectionError: When no server is listening at address
+    """
+    if outputs:
+        outputs = {key: os.path.abspath(value) if key != 'account' and value else value
+                   for key, value in outputs.items()}
+    body = json.dumps({'path': os.path.abspath(path), 'password': password, 'outputs': outputs or {},
+                       'options': extract_options})
+    host, port = _split_address(address)
+    conn = http.client.HTTPConnection(host, port, timeout=timeout)
+    try:
+        conn.request('POST', '/extract', body, {'Content-Type': 'application/json'})
+        response = conn.getresponse()
+        return json.loads(response.read())
+    except ConnectionRefusedError:
+        raise ConnectionError(f"No extraction server at {address}; start one with "
+                              f"'python extraction_server.py serve'") from None
+    finally:
+        conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Keep the statement extractor warm and send it extraction jobs.")
+    parser.add_argument("--address", default=DEFAULT_ADDRESS,
+                        help="Loopback host:port of the server (default: EXPENSE_TRACKER_SERVER or %(default)s)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve_parser = commands.add_parser("serve", help="Run the server")
+    serve_parser.add_argument("--workers", type=int, default=None,
+                              help="Statements extracted concurrently (default: CPU count)")
+    serve_parser.add_argument("--output-root", dest="output_roots", action="append", default=None, metavar="DIR",
+                              help="Directory --parquet/--ledger-db outputs may be written to; repeat for more "
+                                   "(default: EXPENSE_TRACKER_SERVER_OUTPUTS, else the working directory)")
+    extract_parser = commands.add_parser("extract", help="Extract a statement through a running server")
+    extract_parser.add_argument("pdf_path", help="PDF file or CSV/XLS export")
+    extract_parser.add_argument("password", nargs="?", default=None, help="PDF password")
+    extract_parser.add_argument("--bank", default=None, help="Bank layout (default: the server's default bank)")
+    extract_parser.add_argument("--no-cache", dest="use_cache", action="store_false",
+                                help="Always run tabula and do not read or write the extraction cache")
+    extract_parser.add_argument("--refresh", action="store_true", help="Re-extract tables and overwrite the cache")
+    extract_parser.add_argument("--no-template", dest="use_template", action="store_false",
+                                help="Always use tabula guess mode and do not record a layout template")
+    extract_parser.add_argument("--categorize", nargs="?", const="", default=None, metavar="RULES_JSON",
+                                help="Add a Category column, see pdf_analyzer.py --categorize")
+    extract_parser.add_argument("--parquet", metavar="LEDGER_DIR", default=None, help="Also append to a Parquet ledger")
+    extract_parser.add_argument("--ledger-db", metavar="DB", default=None, help="Also upsert into a SQLite ledger")
+    extract_parser.add_argument("--account", default=None, help="Account name used in the SQLite ledger")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        try:
+            serve(args.address, args.workers, args.output_roots)
+        except ValueError as e:
+            print(f"Error: {str(e)}")
+            sys.exit(1)
+        return
+    options = {'use_cache': args.use_cache, 'refresh': args.refresh, 'use_template': args.use_template,
+               # Server workers already run concurrently; one process per statement
+               'page_workers': 1}
+    if args.bank:
+        options['bank'] = args.bank
+    if args.categorize is not None:
+        options['categories'] = os.path.abspath(args.categorize) if args.categorize else ''
+    outputs = {'parquet_dir': args.parquet, 'ledger_db': args.ledger_db, 'account': args.account}
+    try:
+        result = request_extraction(args.pdf_path, args.password, args.address, outputs, **options)
+    except ConnectionError as e:
+        print(f"Error: {str(e)}")
+        sys.exit(1)
+    if result.get('error'):
+        print(f"Error: {result['error']}")
+        sys.exit(1)
+    if not result['output']:
+        print("Failed to extract data from the PDF.")
+        sys.exit(1)
+    print(f"Data successfully extracted and saved to {result['output']}")
+    print("\nFirst few rows of extracted data:")
+    print(result['preview'])
+    print(f"\nTotal transactions extracted: {result['transactions']} ({result['seconds']}s on the server)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+import os
+import json
+from pathlib import Path
+from collections import Counter, defaultdict
+
+import numpy as np
+import pandas as pd
+
+# Recorded page layouts per bank, reused to skip tabula's guess-mode table detection
+TEMPLATE_DIR = Path(os.environ.get('EXPENSE_TRACKER_TEMPLATES', Path.home() / '.config' / 'expense_tracker' / 'templates'))
+
+# Points added around the recorded table area so small offsets between statements still fit
+AREA_MARGIN = 2.0
+
+def json_to_tables(raw_json):
+    """
+    Build DataFrames from tabula's JSON output the same way tabula.read_pdf does
+    for multiple_tables=True with dtype=str, keeping each table's geometry in
+    df.attrs['layout'] so a layout template can be recorded from it.
+    tabula-py has no public call for this conversion, so the header and
+    duplicate-name handling is copied from its private tabula.io._extract_from
+    (tabula-py 2.10, MIT license). requirements.txt pins tabula-py to 2.10.x,
+    and src/test/test_layout_templates.py compares the two, so check that test
+    when moving the pin.
+    Args:
+        raw_json (list): Decoded tabula-java JSON
+    Returns:
+        list[pandas.DataFrame]: One DataFrame per non-empty table
+    """
+    tables = []
+    for table in raw_json:
+        if len(table['data']) == 0:
+            continue
+        rows = [[np.nan if not cell['text'] else cell['text'] for cell in row] for row in table['data']]
+        columns = rows.pop(0)
+        unnamed = 0
+        for idx, col in enumerate(columns):
+            if col is np.nan:
+                columns[idx] = f"Unnamed: {unnamed}"
+                unnamed += 1
+        # Avoid duplicate column names by adding ".N" suffixes, as tabula does
+        counts = defaultdict(int)
+        for idx, col in enumerate(columns):
+            count = counts[col]
+            while count > 0:
+                counts[col] = count + 1
+                col = f"{col}.{count}"
+                count = counts[col]
+            columns[idx] = col
+            counts[col] = count + 1
+        df = pd.DataFrame(data=rows, columns=columns, dtype=str)
+        header = table['data'][0]
+        df.attrs['layout'] = {
+            'page': table.get('page_number'),
+            'area': [table['top'], table['left'], table['top'] + table['height'], table['left'] + table['width']],
+            'columns': [cell['left'] for cell in header[1:]],
+        }
+        tables.append(df)
+    return tables
+
+def make_template(sections):
+    """
+    Combine the layouts of a statement's transaction tables into a template.
+    Args:
+        sections (dict): 'first_page' / 'other_pages' -> list of (layout, names)
+            pairs, where names labels each column with a STANDARD_COLS key
+    Returns:
+        dict: Template with an area, column boundaries and names per section, or None
+    """
+    template = {}
+    for section, entries in sections.items():
+        if not entries:
+            continue
+        # Use the most common column layout of the section
+        names = Counter(tuple(names) for _, names in entries).most_common(1)[0][0]
+        layouts = [layout for layout, entry_names in entries if tuple(entry_names) == names]
+        area = [
+            min(layout['area'][0] for layout in layouts) - AREA_MARGIN,
+            min(layout['area'][1] for layout in layouts) - AREA_MARGIN,
+            max(layout['area'][2] for layout in layouts) + AREA_MARGIN,
+            max(layout['area'][3] for layout in layouts) + AREA_MARGIN,
+        ]
+        template[section] = {
+            'area': [max(0.0, round(v, 2)) for v in area],
+            'columns': [round(x, 2) for x in layouts[0]['columns']],
+            'names': list(names),
+        }
+    if not template:
+        return None
+    # Single-page statements only show one kind of page; use it for both
+    template.setdefault('first_page', template.get('other_pages'))
+    template.setdefault('other_pages', template.get('first_page'))
+    return template
+
+def _template_path(bank, template_dir):
+    return Path(template_dir) / f"{bank}.json"
+
+def load_template(bank, template_dir=TEMPLATE_DIR):
+    """Return the recorded layout template for a bank, or None."""
+    try:
+        with open(_template_path(bank, template_dir), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def save_template(bank, template, template_dir=TEMPLATE_DIR):
+    """Record the layout template for a bank."""
+    path = _template_path(bank, template_dir)
+    try:
+        Path(template_dir).mkdir(parents=True, exist_ok=True)
+        # Write then rename, so batch workers never read a half-written template
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(template, f, indent=2)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Warning: could not save layout template for {bank}: {str(e)}")
+        return
+    print(f"\nRecorded layout template for {bank}")
+
+def page_numbers(pages, page_count):
+    """Expand a tabula page selection ('all', '3', '1-4', '1,3') into page numbers."""
+    if pages == 'all':
+        return list(range(1, page_count + 1))
+    numbers = []
+    for part in str(pages).split(','):
+        if '-' in part:
+            start, end = part.split('-')
+            numbers.extend(range(int(start), int(end) + 1))
+        else:
+            numbers.append(int(part))
+    return numbers
+
+def format_pages(numbers):
+    """Compress sorted page numbers into a tabula page selection such as '1-4,7'."""
+    parts = []
+    start = prev = None
+    for number in numbers:
+        if prev is not None and number == prev + 1:
+            prev = number
+            continue
+        if start is not None:
+            parts.append(f"{start}-{prev}" if prev > start else str(start))
+        start = prev = number
+    if start is not None:
+        parts.append(f"{start}-{prev}" if prev > start else str(start))
+    return ','.join(parts)
@@ -0,0 +1,125 @@
+import json
+import time
+import cProfile
+import platform
+import tracemalloc
+from pathlib import Path
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+# Per-stage timings and counters. Collection is off unless start_metrics() was
+# called: stage() and count() then cost one global lookup, so the hooks stay in
+# the code for production batch runs.
+_report = None
+_OFF = nullcontext()
+
+def start_metrics(trace_memory=True):
+    """Begin collecting timings and counters in this process."""
+    global _report
+    _report = {'started': datetime.now().isoformat(timespec='seconds'), 'stages': {}, 'counts': {}}
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+def metrics_enabled():
+    """True while start_metrics() is collecting."""
+    return _report is not None
+
+def stage(name):
+    """Time a block of work under a stage name; repeated stages add up."""
+    if _report is None:
+        return _OFF
+    return _timed(name)
+
+@contextmanager
+def _timed(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        entry = _report['stages'].setdefault(name, {'seconds': 0.0, 'calls': 0})
+        entry['seconds'] += time.perf_counter() - start
+        entry['calls'] += 1
+
+def count(name, value=1):
+    """Add to a counter such as 'tables' or 'rows'."""
+    if _report is not None:
+        _report['counts'][name] = _report['counts'].get(name, 0) + value
+
+def stop_metrics():
+    """
+    Stop collecting and return the report.
+    Returns:
+        dict: 'stages' (seconds and calls per stage), 'counts' and 'peak_memory_mb',
+            or None when collection was not started
+    """
+    global _report
+    report, _report = _report, None
+    if report is None:
+        return None
+    if tracemalloc.is_tracing():
+        report['peak_memory_mb'] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 2)
+        tracemalloc.stop()
+    for entry in report['stages'].values():
+        entry['seconds'] = round(entry['seconds'], 6)
+    return report
+
+@contextmanager
+def profiled(dump_path=None):
+    """
+    Collect metrics for the duration of a block, optionally under cProfile.
+    Args:
+        dump_path (str): Write cProfile stats here (view with pstats or snakeviz)
+    Yields:
+        dict: Filled with 'report' (see stop_metrics) and 'wall_seconds' on exit
+    """
+    result = {}
+    start_metrics()
+    profiler = cProfile.Profile() if dump_path else None
+    start = time.perf_counter()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield result
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            Path(dump_path).parent.mkdir(parents=True, exist_ok=True)
+            profiler.dump_stats(dump_path)
+        result['wall_seconds'] = round(time.perf_counter() - start, 6)
+        result['report'] = stop_metrics()
+
+def merge_reports(reports):
+    """Combine the reports of several worker processes: times and counts add, peak memory is the largest."""
+    merged = {'stages': {}, 'counts': {}, 'workers': 0}
+    for report in reports:
+        if not report:
+            continue
+        merged['workers'] += 1
+        for name, entry in report['stages'].items():
+            total = merged['stages'].setdefault(name, {'seconds': 0.0, 'calls': 0})
+            total['seconds'] = round(total['seconds'] + entry['seconds'], 6)
+            total['calls'] += entry['calls']
+        for name, value in report['counts'].items():
+            merged['counts'][name] = merged['counts'].get(name, 0) + value
+        if 'peak_memory_mb' in report:
+            merged['peak_memory_mb'] = max(merged.get('peak_memory_mb', 0.0), report['peak_memory_mb'])
+    return merged
+
+def write_report(report, path, **context):
+    """Write a metrics report as JSON, with the run's context (input, options, wall time)."""
+    report = {**context, 'python': platform.python_version(), **report}
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, default=str)
+    print(f"\nMetrics report written to {path}")
+
+def print_report(report):
+    """Print the slowest stages first."""
+    stages = sorted(report['stages'].items(), key=lambda item: item[1]['seconds'], reverse=True)
+    print("\nStage timings:")
+    for name, entry in stages:
+        print(f"  {name:<22} {entry['seconds'] * 1000:10.1f} ms  ({entry['calls']} calls)")
+    for name, value in report['counts'].items():
+        print(f"  {name:<22} {value:>10}")
+    if 'peak_memory_mb' in report:
+        print(f"  {'peak memory':<22} {report['peak_memory_mb']:>10} MB")
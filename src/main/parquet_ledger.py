@@ -0,0 +1,141 @@
+import re
+import hashlib
+from pathlib import Path
+
+import pandas as pd
+
+# Typed, month-partitioned Parquet dataset of extracted transactions:
+#   <ledger>/year=2024/month=1/<account>_<statement>_<path hash>-<part>-0.parquet
+PARTITION_COLS = ['year', 'month']
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Parquet output needs pyarrow: pip install pyarrow")
+    return pyarrow
+
+def ledger_schema():
+    """Arrow schema of the ledger: real dates, float64 amounts and the partition keys."""
+    pa = _require_pyarrow()
+    return pa.schema([
+        ('Value Date', pa.date32()),
+        ('Description', pa.string()),
+        ('Deposit', pa.float64()),
+        ('Withdrawal', pa.float64()),
+        ('Balance', pa.float64()),
+        ('Source', pa.string()),
+        ('year', pa.int16()),
+        ('month', pa.int8()),
+    ])
+
+def source_name(pdf_path, account=None):
+    """
+    Identify a statement in the ledger, safe for use in file names. The name
+    depends on where the file is, not on its bytes: re-running a statement,
+    even after it was re-downloaded or re-exported, replaces its rows, while
+    statements that only share a file name, e.g. 'statement.pdf' of two
+    accounts or two folders, keep their own.
+    Args:
+        pdf_path (str): Statement file
+        account (str): Account or bank the statement belongs to
+    Returns:
+        str: '<account>_<file stem>_<first 8 hex digits of the resolved path's hash>'
+    """
+    path_hash = hashlib.sha256(str(Path(pdf_path).resolve()).encode()).hexdigest()[:8]
+    name = '_'.join(part for part in (account, Path(pdf_path).stem, path_hash) if part)
+    return re.sub(r'[^\w.-]+', '_', name)
+
+def to_ledger_frame(df, source):
+    """
+    Convert extracted transactions to the ledger's column types.
+    Args:
+        df (pandas.DataFrame): Output of extract_bank_statement
+        source (str): Statement identifier, see source_name
+    Returns:
+        pandas.DataFrame: Typed transactions with year/month partition columns
+    """
+    dates = pd.to_datetime(df['Value Date'], format='%Y-%m-%d')
+    return pd.DataFrame({
+        'Value Date': dates.dt.date,
+        'Description': df['Description'].astype(object),
+        'Deposit': pd.to_numeric(df['Deposit'], errors='coerce').astype('float64'),
+        'Withdrawal': pd.to_numeric(df['Withdrawal'], errors='coerce').astype('float64'),
+        'Balance': pd.to_numeric(df['Balance'], errors='coerce').astype('float64'),
+        'Source': source,
+        'year': dates.dt.year.astype('int16'),
+        'month': dates.dt.month.astype('int8'),
+    })
+
+def remove_statement(ledger_dir, source):
+    """Delete the files a statement wrote earlier, so re-running it replaces its rows."""
+    for path in Path(ledger_dir).glob(f"year=*/month=*/{source}-*.parquet"):
+        path.unlink()
+
+def write_parquet_ledger(df, ledger_dir, source, part=0):
+    """
+    Append one statement's transactions (or one streamed chunk of them) to the ledger.
+    Args:
+        df (pandas.DataFrame): Output of extract_bank_statement
+        ledger_dir (str): Root directory of the Parquet dataset
+        source (str): Statement identifier, see source_name
+        part (int): Chunk number when a statement is written in several parts
+    Returns:
+        int: Number of rows written
+    """
+    pa = _require_pyarrow()
+    df = df.dropna(subset=['Value Date'])
+    if len(df) == 0:
+        return 0
+    table = pa.Table.from_pandas(to_ledger_frame(df, source), schema=ledger_schema(), preserve_index=False)
+    pa.parquet.write_to_dataset(
+        table,
+        root_path=str(ledger_dir),
+        partition_cols=PARTITION_COLS,
+        basename_template=f"{source}-{part}-{{i}}.parquet",
+        existing_data_behavior='overwrite_or_ignore',
+    )
+    return len(df)
+
+def _month_filters(start, end):
+    """DNF filters selecting the year/month partitions between two dates."""
+    filters = []
+    year, month = start.year, start.month
+    while (year, month) <= (end.year, end.month):
+        filters.append([('year', '=', year), ('month', '=', month)])
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return filters
+
+def read_parquet_ledger(ledger_dir, start=None, end=None):
+    """
+    Read transactions from the ledger, only opening the month partitions in range.
+    Args:
+        ledger_dir (str): Root directory of the Parquet dataset
+        start (str): First value date to include, e.g. '2024-01-01'
+        end (str): Last value date to include
+    Returns:
+        pandas.DataFrame: Transactions sorted by value date (datetime64)
+    """
+    _require_pyarrow()
+    filters = None
+    if start is not None or end is not None:
+        start = pd.Timestamp(start) if start is not None else None
+        end = pd.Timestamp(end) if end is not None else None
+        if start is not None and end is not None:
+            filters = _month_filters(start, end)
+        elif start is not None:
+            filters = [[('year', '>', start.year)], [('year', '=', start.year), ('month', '>=', start.month)]]
+        else:
+            filters = [[('year', '<', end.year)], [('year', '=', end.year), ('month', '<=', end.month)]]
+    df = pd.read_parquet(ledger_dir, engine='pyarrow', filters=filters)
+    dates = pd.to_datetime(df['Value Date'])
+    keep = pd.Series(True, index=df.index)
+    if start is not None:
+        keep &= dates >= start
+    if end is not None:
+        keep &= dates <= end
+    df = df[keep].assign(**{'Value Date': dates[keep]})
+    # Partition keys come back as categoricals; restore plain integers
+    df = df.astype({col: 'int64' for col in PARTITION_COLS})
+    return df.sort_values('Value Date', kind='stable').reset_index(drop=True)
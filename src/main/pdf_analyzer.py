@@ -1,11 +1,59 @@
 import sys
 import os
-from PyPDF2 import PdfReader
+import argparse
+import tempfile
+from contextlib import ExitStack, contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from PyPDF2 import PdfReader, PdfWriter
 import tabula
+import numpy as np
 import pandas as pd
 from pathlib import Path
 import re
-from datetime import datetime
+from datetime import date, datetime
+from functools import lru_cache
+
+from bank_exports import detect_export, find_export, read_bank_export
+from categorizer import categorize, load_classifier
+from extraction_cache import cached_read, file_digest
+from parquet_ledger import remove_statement, source_name, write_parquet_ledger
+from sqlite_ledger import ingest_transactions
+from metrics import count, merge_reports, print_report, profiled, stage, write_report
+from layout_templates import format_pages, json_to_tables, load_template, make_template, page_numbers, save_template
+from statement_rules import DEFAULT_BANK, bank_rules, clean_descriptions, contains
+
+# tabula options used for every statement; they are also part of the extraction cache key
+TABULA_OPTIONS = {
+    'pages': 'all',
+    'multiple_tables': True,
+    'guess': True,
+}
+
+# Statements with at least this many pages are split across processes by default
+PARALLEL_MIN_PAGES = 40
+
+TRANSACTION_COLUMNS = ['Value Date', 'Description', 'Deposit', 'Withdrawal', 'Balance']
+
+# Standard column names we want, matched as substrings of the lowercased table headers
+STANDARD_COLS = {
+    'date_desc': ['date   value description', 'date', 'value date', 'description'],
+    'deposit': ['cheque deposit', 'deposit', 'credit', 'deposits'],
+    'withdrawal': ['withdrawal', 'debit', 'payment', 'withdrawals'],
+    'balance': ['balance', 'closing balance', 'available balance']
+}
+
+MONTH_MAP = {m: i for i, m in enumerate(['Jan','Feb','Mar','Apr','May','Jun','Jul','Aug','Sep','Oct','Nov','Dec'], 1)}
+
+# The leftmost date in a text, trying the forms with a year first at each position:
+# '05 Mar 2024' / '05-Mar-24', '05/03/2024', 'Mar 05, 2024' / 'Mar 05 2024',
+# 'Mar 05' (SCB rows), '05 Mar'
+_MONTHS = '|'.join(MONTH_MAP)
+DATE_PATTERN = re.compile(
+    rf"\b(?:(?P<d1>\d{{1,2}})[\s-](?P<m1>{_MONTHS})[\s-](?P<y1>\d{{4}}|\d{{2}})\b"
+    rf"|(?P<d2>\d{{1,2}})[/-](?P<m2>\d{{1,2}})[/-](?P<y2>\d{{4}}|\d{{2}})\b"
+    rf"|(?P<m5>{_MONTHS})\s+(?P<d5>\d{{1,2}}),?\s+(?P<y5>(?:19|20)\d{{2}})\b(?![.,]\d)"
+    rf"|(?P<m3>{_MONTHS})\s+(?P<d3>\d{{1,2}})\b"
+    rf"|(?P<d4>\d{{1,2}})\s+(?P<m4>{_MONTHS})\b)", re.IGNORECASE)
 
 def clean_amount(amount_str):
     """Clean and convert amount string to float."""
@@ -24,42 +72,124 @@ def clean_amount(amount_str):
         return None
 
 def clean_date(date_str):
-    """Clean and standardize date format."""
-    if pd.isna(date_str):
+    """Parse a single date string like parse_dates does; None when it holds no date."""
+    parts = _date_parts(date_str) if isinstance(date_str, str) else None
+    if parts is None:
         return None
-    
-    date_str = str(date_str).strip()
-    
-    # Try different date patterns
-    patterns = [
-        (r'(\d{2})[/-](\d{2})[/-](\d{4})', '%d/%m/%Y'),  # DD/MM/YYYY
-        (r'(\d{2})[/-](\d{2})[/-](\d{2})', '%d/%m/%y'),  # DD/MM/YY
-        (r'([A-Za-z]{3})\s+(\d{1,2})(?:\s+(\d{4}))?', '%b %d %Y'),  # MMM DD YYYY
-        (r'(\d{1,2})\s+([A-Za-z]{3})(?:\s+(\d{4}))?', '%d %b %Y'),  # DD MMM YYYY
-    ]
-    
-    for pattern, date_format in patterns:
-        match = re.search(pattern, date_str)
-        if match:
-            try:
-                date_str = match.group(0)
-                # If year is not in the pattern, use current year
-                if '%Y' not in date_format and len(match.groups()) == 2:
-                    date_str += f" {datetime.now().year}"
-                return datetime.strptime(date_str, date_format).strftime('%Y-%m-%d')
-            except ValueError:
+    day, month, year = parts
+    if year is None:
+        year = _first_year(month, day, new_year_state())
+    return _iso_date(year, month, day)
+
+@lru_cache(maxsize=None)
+def _iso_date(year, month, day):
+    """'YYYY-MM-DD', or None for impossible dates; statements repeat the same few dates."""
+    try:
+        return date(year, month, day).isoformat()
+    except ValueError:
+        return None
+
+@lru_cache(maxsize=65536)
+def _date_parts(text):
+    """(day, month, year or None) of the leftmost date in a text, or None."""
+    match = DATE_PATTERN.search(text)
+    if match is None:
+        return None
+    groups = match.groupdict()
+    name = groups['m1'] or groups['m5'] or groups['m3'] or groups['m4']
+    month = MONTH_MAP[name.capitalize()] if name else int(groups['m2'])
+    year = groups['y1'] or groups['y2'] or groups['y5']
+    year = int(year) if year else None
+    if year is not None and year < 100:
+        year += 2000
+    return int(groups['d1'] or groups['d2'] or groups['d5'] or groups['d3'] or groups['d4']), month, year
+
+def _first_year(month, day, year_state):
+    """Year of the first yearless date: the statement's start date, else its end date (default: today)."""
+    anchor = year_state.get('anchor') or {}
+    if anchor.get('start') is not None:
+        start = anchor['start']
+        return start.year + int((month, day) < (start.month, start.day))
+    end = anchor.get('end') or date.today()
+    return end.year - int((month, day) > (end.month, end.day))
+
+def parse_dates(values, year_state=None):
+    """
+    Parse a whole column of date-bearing text at once. Each distinct string is
+    matched once with DATE_PATTERN and each distinct date formatted once; the
+    year arithmetic runs over arrays.
+    Dates without a year take it from the nearest earlier date that has one,
+    rolling over whenever the month/day goes backwards. Dates before the first
+    one with a year count back from it; without any, the statement's
+    start/end date decides (see statement_anchor). year_state carries the
+    rollover from one table to the next and is updated in place.
+    Args:
+        values (pandas.Series): Date strings or row text, in statement order
+        year_state (dict): Rollover state, see new_year_state (default: a new one)
+    Returns:
+        pandas.Series: 'YYYY-MM-DD' strings, NaN for values without a date
+    """
+    year_state = year_state if year_state is not None else new_year_state()
+    values = pd.Series(values, dtype=object)
+    parts = [_date_parts(v) if isinstance(v, str) else None for v in values.tolist()]
+    dated = np.array([p is not None for p in parts], dtype=bool)
+    found = np.full(len(values), np.nan, dtype=object)
+    if not dated.any():
+        return pd.Series(found, index=values.index)
+    parts = [p for p in parts if p is not None]
+    days = np.array([p[0] for p in parts])
+    months = np.array([p[1] for p in parts])
+    years = np.array([np.nan if p[2] is None else p[2] for p in parts], dtype='float64')
+    explicit = ~np.isnan(years)
+    prev_months = np.concatenate([[year_state['prev_month'] or 0], months[:-1]])
+    prev_days = np.concatenate([[year_state['prev_day'] or 0], days[:-1]])
+    backwards = (months < prev_months) | ((months == prev_months) & (days < prev_days))
+    base = year_state['year']
+    if base is None:
+        backwards[0] = False
+        first = np.flatnonzero(explicit)
+        # A year printed in the statement beats the header: count back from it
+        if len(first):
+            base = int(years[first[0]]) - int(backwards[:first[0] + 1].sum())
+        else:
+            base = _first_year(months[0], days[0], year_state)
+    # Each run of yearless dates counts its rollovers from the last explicit year
+    rollover = backwards & ~explicit
+    group = np.cumsum(explicit)
+    rolled = np.cumsum(rollover)
+    bases = np.concatenate([[base], years[explicit]]).astype(int)
+    starts = np.concatenate([[0], rolled[explicit]])
+    years = bases[group] + rolled - starts[group]
+    year_state['year'] = int(years[-1])
+    year_state['prev_month'] = int(months[-1])
+    year_state['prev_day'] = int(days[-1])
+    found[dated] = [_iso_date(y, m, d) or np.nan for y, m, d in zip(years.tolist(), months.tolist(), days.tolist())]
+    return pd.Series(found, index=values.index)
+
+def statement_anchor(tables, rules, max_tables=3):
+    """
+    Find the statement's start and end dates in the page header, e.g.
+    'STATEMENT DATE :31 Jan 2024', using the bank's date labels.
+    Args:
+        tables (list[pandas.DataFrame]): Tables of the first pages
+        rules (dict): Compiled rules with 'start'/'end' label patterns
+        max_tables (int): Tables searched; the header is on the first page
+    Returns:
+        dict: 'start' and 'end' datetime.date, None where not printed
+    """
+    anchor = {'start': None, 'end': None}
+    for df in tables[:max_tables]:
+        cells = [str(col) for col in df.columns] + [str(v) for v in df.to_numpy().ravel() if pd.notna(v)]
+        for key in ('start', 'end'):
+            if rules.get(key) is None or anchor[key] is not None:
                 continue
-    
-    # Try to extract date from description if it contains a date
-    date_in_desc = re.search(r'(\d{1,2})\s+([A-Za-z]{3})', date_str)
-    if date_in_desc:
-        try:
-            date_str = date_in_desc.group(0) + f" {datetime.now().year}"
-            return datetime.strptime(date_str, '%d %b %Y').strftime('%Y-%m-%d')
-        except ValueError:
-            pass
-    
-    return None
+            for cell in cells:
+                match = rules[key].search(cell)
+                parsed = match and clean_date(match.group(1))
+                if parsed and DATE_PATTERN.search(match.group(1)).group('y1', 'y2', 'y5') != (None, None, None):
+                    anchor[key] = date.fromisoformat(parsed)
+                    break
+    return anchor
 
 def format_description(desc):
     """Format transaction description for better readability."""
@@ -92,238 +222,711 @@ def format_description(desc):
     # Handle other transactions
     return desc
 
-def extract_withdrawal_amount(row_str, withdrawal_col_value, balance_col_value):
-    """Extract withdrawal amount from row data, ensuring it's different from balance."""
-    # First check the withdrawal column
-    if pd.notna(withdrawal_col_value):
-        withdrawal_amount = clean_amount(withdrawal_col_value)
-        balance_amount = clean_amount(balance_col_value)
-        
-        # Only return withdrawal if it's different from balance and positive
-        if withdrawal_amount is not None and withdrawal_amount > 0:
-            if balance_amount is None or withdrawal_amount != balance_amount:
-                return withdrawal_amount
-    
-    # Look for withdrawal patterns in the description
-    # Common patterns: "WITHDRAWAL", "DEBIT", "PAYMENT", "PURCHASE"
-    withdrawal_keywords = ['WITHDRAWAL', 'DEBIT', 'PAYMENT', 'PURCHASE', 'PAYTM', 'UPI', 'NEFT', 'RTGS']
-    if any(keyword in row_str.upper() for keyword in withdrawal_keywords):
-        # Look for amount patterns in the description
-        amount_patterns = [
-            r'(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)',  # Numbers with commas and decimals
-            r'(\d+\.\d{2})',  # Decimal amounts
-            r'(\d+)',  # Whole numbers
-        ]
-        
-        for pattern in amount_patterns:
-            matches = re.findall(pattern, row_str)
-            for match in matches:
-                amount = clean_amount(match)
-                balance_amount = clean_amount(balance_col_value)
-                if amount is not None and amount > 0:
-                    if balance_amount is None or amount != balance_amount:
-                        return amount
-    
-    return None
-
-def extract_deposit_amount(row_str, deposit_col_value, balance_col_value):
-    """Extract deposit amount from row data, ensuring it's different from balance."""
-    # First check the deposit column
-    if pd.notna(deposit_col_value):
-        deposit_amount = clean_amount(deposit_col_value)
-        balance_amount = clean_amount(balance_col_value)
-        
-        # Only return deposit if it's different from balance and positive
-        if deposit_amount is not None and deposit_amount > 0:
-            if balance_amount is None or deposit_amount != balance_amount:
-                return deposit_amount
-    
-    # Look for deposit patterns in the description
-    # Common patterns: "CREDIT", "DEPOSIT", "CHEQUE", "NEFT CREDIT", "RTGS CREDIT"
-    deposit_keywords = ['CREDIT', 'DEPOSIT', 'CHEQUE', 'NEFT CREDIT', 'RTGS CREDIT', 'SALARY', 'REFUND']
-    if any(keyword in row_str.upper() for keyword in deposit_keywords):
-        # Look for amount patterns in the description
-        amount_patterns = [
-            r'(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)',  # Numbers with commas and decimals
-            r'(\d+\.\d{2})',  # Decimal amounts
-            r'(\d+)',  # Whole numbers
-        ]
-        
-        for pattern in amount_patterns:
-            matches = re.findall(pattern, row_str)
-            for match in matches:
-                amount = clean_amount(match)
-                balance_amount = clean_amount(balance_col_value)
-                if amount is not None and amount > 0:
-                    if balance_amount is None or amount != balance_amount:
-                        return amount
-    
-    return None
+def reconcile_balances(df, tolerance=0.005, opening_balance=None):
+    """
+    Check every row against the running balance, for the whole statement at once.
+    Between two rows with a known balance, the balance change must equal the
+    deposits minus the withdrawals of the rows in between. A single row with
+    neither amount gets its amount from that change. Must run in statement
+    order, i.e. before sorting.
+    Args:
+        df (pandas.DataFrame): Transactions with float64 Deposit, Withdrawal and Balance
+        tolerance (float): Largest difference still counted as reconciled
+        opening_balance (float): Balance before the first row, e.g. the last
+            balance of the previous page chunk, so the first rows are checked too
+    Returns:
+        pandas.DataFrame: df with inferred amounts filled in and a 'Reconciled'
+            column: True, False, or None where the balance gives nothing to check against
+    """
+    df = df.copy()
+    deposit = df['Deposit'].to_numpy(dtype='float64', copy=True)
+    withdrawal = df['Withdrawal'].to_numpy(dtype='float64', copy=True)
+    balance = df['Balance'].to_numpy(dtype='float64')
+    # The opening balance is a virtual row 0 without amounts, dropped again at the end
+    opening = int(opening_balance is not None and not np.isnan(opening_balance))
+    if opening:
+        deposit, withdrawal = np.r_[np.nan, deposit], np.r_[np.nan, withdrawal]
+        balance = np.r_[opening_balance, balance]
+    reconciled = np.full(len(balance), None, dtype=object)
+    known = np.flatnonzero(~np.isnan(balance))
+    if len(known) < 2:
+        df['Reconciled'] = reconciled[opening:]
+        return df
+    change = np.round(np.diff(balance[known]), 2)
+    ends = known[1:]
+    # Rows right after a known balance, with no amount of their own: the change is their amount
+    fill = (np.diff(known) == 1) & np.isnan(deposit[ends]) & np.isnan(withdrawal[ends])
+    deposit[ends[fill]] = np.where(change[fill] > 0, change[fill], np.nan)
+    withdrawal[ends[fill]] = np.where(change[fill] < 0, -change[fill], np.nan)
+    net = np.cumsum(np.nan_to_num(deposit) - np.nan_to_num(withdrawal))
+    matches = np.abs(change - (net[ends] - net[known[:-1]])) < tolerance
+    # Each row after the first known balance belongs to the span ending at the next known balance
+    rows = np.arange(known[0] + 1, known[-1] + 1)
+    reconciled[rows] = matches[np.searchsorted(ends, rows)]
+    df['Deposit'], df['Withdrawal'], df['Reconciled'] = deposit[opening:], withdrawal[opening:], reconciled[opening:]
+    return df
 
-def extract_bank_statement(pdf_path, password):
+def clean_amounts(values):
     """
-    Extract table data from a password-protected PDF bank statement.
+    Vectorized clean_amount over a whole column.
+    Args:
+        values (pandas.Series): Raw amount strings
+    Returns:
+        pandas.Series: float64 amounts, NaN where clean_amount would return None
+    """
+    values = pd.Series(values, dtype=object)
+    text = values[values.notna()].astype(str)
+    text = text.str.replace(',', '', regex=False).str.strip()
+    text = text.str.replace(r'[^\d.-]', '', regex=True)
+    negative = text.str.startswith('-')
+    amounts = pd.to_numeric(text.where(~negative, text.str[1:]), errors='coerce').astype('float64')
+    amounts[negative] = -amounts[negative]
+    return amounts.reindex(values.index)
+
+def map_columns(columns):
+    """Map the standard keys (date_desc, deposit, withdrawal, balance) to table column names."""
+    col_map = {}
+    for key, options in STANDARD_COLS.items():
+        for col in columns:
+            if any(opt in col for opt in options):
+                col_map[key] = col
+                break
+    return col_map
+
+# Standard transaction column of each map_columns key
+MAPPED_COLUMNS = {'date_desc': 'Description', 'deposit': 'Deposit', 'withdrawal': 'Withdrawal', 'balance': 'Balance'}
+
+def mapped_table(table):
+    """
+    Select and rename one table's transaction columns, see map_columns.
+    Args:
+        table (pandas.DataFrame): Table as returned by tabula.read_pdf
+    Returns:
+        pandas.DataFrame: Description, Balance and whichever of Deposit and
+            Withdrawal the table has; None for tables without date/description
+            and balance columns
+    """
+    columns = [str(col).strip().lower() for col in table.columns]
+    col_map = map_columns(columns)
+    if 'date_desc' not in col_map or 'balance' not in col_map:
+        return None
+    # Positions, not names: tabula can produce duplicate column names; the first one wins
+    keys = list(col_map)
+    return table.iloc[:, [columns.index(col_map[key]) for key in keys]] \
+        .set_axis([MAPPED_COLUMNS[key] for key in keys], axis=1)
+
+def table_transactions(df, year_state, rules):
+    """
+    Columnar extraction of the transactions in the mapped rows of a statement:
+    header/address filtering and date detection, each one pass over the whole
+    column. Amounts are left raw for tables_to_transactions to clean.
+    Args:
+        df (pandas.DataFrame): Mapped tables concatenated in statement order, see mapped_table
+        year_state (dict): Rollover state, see parse_dates
+        rules (dict): Compiled description rules, see statement_rules
+    Returns:
+        pandas.DataFrame: Kept rows with 'Value Date' and the mapped columns
+    """
+    desc = df['Description']
+    text = desc.astype(object).where(desc.notna(), '').astype(str)
+    # Filtering
+    has_transaction_data = df['Balance'].notna()
+    for col in ('Withdrawal', 'Deposit'):
+        if col in df.columns:
+            has_transaction_data |= df[col].notna()
+    has_transaction_data |= desc.notna() & ~contains(text, rules['noise'])
+    has_transaction_data &= ~contains(text, rules['header'])
+    # Dates only of rows that can be transactions, so header dates don't move the year
+    found_dates = parse_dates(text[has_transaction_data], year_state)
+    found_dates = found_dates[found_dates.notna()]
+    return df.loc[found_dates.index].assign(**{'Value Date': found_dates})
+
+def tables_to_transactions(tables, year_state, rules=None):
+    """
+    Turn raw tabula tables into one DataFrame of transactions. Per table only
+    the transaction columns are picked out; the picked tables are concatenated
+    once and filtered, dated and cleaned as one frame, since the pandas
+    overhead of each call would otherwise be paid for every one of a
+    statement's hundreds of tables.
+    Args:
+        tables (list[pandas.DataFrame]): Tables as returned by tabula.read_pdf
+        year_state (dict): Rollover state, see parse_dates
+        rules (dict): Compiled description rules (default: bank_rules())
+    Returns:
+        pandas.DataFrame: Transactions with TRANSACTION_COLUMNS; descriptions
+            are not cleaned yet, amounts are
+    """
+    rules = rules or bank_rules()
+    if year_state['year'] is None and year_state.get('anchor') is None:
+        year_state['anchor'] = statement_anchor(tables, rules)
+    count('tables', len(tables))
+    with stage('column_mapping'):
+        mapped = [df for df in map(mapped_table, tables) if df is not None]
+    if not mapped:
+        return pd.DataFrame(columns=TRANSACTION_COLUMNS)
+    with stage('row_extraction'):
+        rows = pd.concat(mapped, ignore_index=True)
+        count('rows', len(rows))
+        kept = table_transactions(rows, year_state, rules)
+    with stage('amount_cleaning'):
+        columns = {'Value Date': kept['Value Date'].to_numpy(dtype=object),
+                   'Description': kept['Description'].to_numpy(dtype=object)}
+        for col in ('Deposit', 'Withdrawal', 'Balance'):
+            columns[col] = clean_amounts(kept[col]).to_numpy() if col in kept.columns \
+                else np.full(len(kept), np.nan)
+    return pd.DataFrame(columns, columns=TRANSACTION_COLUMNS, copy=False)
+
+def finalize_transactions(final_df, rules=None, sort=True, categories=None, opening_balance=None):
+    """
+    Clean descriptions, fix the column order, check the amounts against the
+    running balance (see reconcile_balances) and sort by date. Rows that do not
+    reconcile are listed by index label in df.attrs['unreconciled']. Chunks of
+    a statement pass the previous chunk's last balance as opening_balance.
+    With categories (a category rules file, '' for the built-in rules) a
+    Category column is added, classified before UPI descriptions are shortened.
+    """
+    columns = TRANSACTION_COLUMNS
+    if 'Description' in final_df.columns:
+        with stage('description_cleaning'):
+            final_df['Description'] = clean_descriptions(final_df['Description'], rules)
+        if categories is not None:
+            with stage('categorization'):
+                final_df['Category'] = categorize(final_df['Description'], load_classifier(categories))
+            columns = TRANSACTION_COLUMNS + ['Category']
+        with stage('description_cleaning'):
+            final_df['Description'] = final_df['Description'].apply(format_description)
+    # Amounts arrive as float64 from tables_to_transactions and read_bank_export
+    final_df = final_df.reindex(columns=columns, fill_value=None)
+    final_df = final_df.dropna(how='all')
+    with stage('reconciliation'):
+        final_df = reconcile_balances(final_df, opening_balance=opening_balance)
+        unreconciled = final_df.pop('Reconciled').eq(False)
+    # Index labels survive the sort, so df.loc[df.attrs['unreconciled']] finds the rows
+    final_df.attrs['unreconciled'] = final_df.index[unreconciled].tolist()
+    if unreconciled.any():
+        print(f"Warning: {int(unreconciled.sum())} transactions do not reconcile with the running balance")
+    if sort and 'Value Date' in final_df.columns:
+        with stage('sort'):
+            final_df = final_df.sort_values('Value Date', ascending=True)
+    count('transactions', len(final_df))
+    return final_df
+
+def new_year_state(year=None):
+    """
+    Initial rollover state for parse_dates. Without a year, the first yearless
+    date gets its year from the statement's dates (see statement_anchor).
+    """
+    return {'year': year, 'prev_month': None, 'prev_day': None, 'anchor': None}
+
+def split_page_ranges(pages, workers=None, min_pages=PARALLEL_MIN_PAGES):
+    """
+    Split page numbers into contiguous tabula page ranges, one per worker.
+    Args:
+        pages (list[int]): Page numbers to extract, in order
+        workers (int): Number of ranges wanted; None picks the CPU count for
+            at least min_pages pages and 1 otherwise
+        min_pages (int): Page count from which workers=None goes parallel
+    Returns:
+        list[str]: Ranges such as ['1-50', '51-100']
+    """
+    if workers is None:
+        workers = (os.cpu_count() or 1) if len(pages) >= min_pages else 1
+    workers = max(1, min(workers, len(pages)))
+    size, extra = divmod(len(pages), workers)
+    ranges = []
+    start = 0
+    for i in range(workers):
+        end = start + size + (1 if i < extra else 0)
+        ranges.append(format_pages(pages[start:end]))
+        start = end
+    return ranges
+
+def _page_has_text(page):
+    """
+    Cheap text-layer check without running text extraction: text-showing
+    operators in the page content, or a form XObject that may hold text.
+    """
+    contents = page.get_contents()
+    if contents is not None:
+        streams = contents if isinstance(contents, list) else [contents]
+        for stream in streams:
+            data = stream.get_object().get_data()
+            if b'Tj' in data or b'TJ' in data:
+                return True
+    resources = page.get('/Resources')
+    xobjects = resources.get_object().get('/XObject') if resources is not None else None
+    if xobjects is None:
+        return False
+    return any(xobject.get_object().get('/Subtype') == '/Form' for xobject in xobjects.get_object().values())
+
+@contextmanager
+def open_statement(pdf_path, password):
+    """
+    Parse and decrypt a statement once with PyPDF2 and describe its pages.
+    Tabula later reads a decrypted copy (see tabula_path) instead of parsing
+    and decrypting the file again. The copy lives in a private temporary
+    directory that is removed when the context exits.
     Args:
         pdf_path (str): Path to the PDF file
         password (str): Password for the PDF file
-    Returns:
-        pandas.DataFrame: Extracted table data
+    Yields:
+        dict: 'page_count', 'text_pages' (pages with a text layer) and the reader
     """
-    try:
+    with stage('pdf_open_decrypt'):
         reader = PdfReader(pdf_path)
-        if reader.is_encrypted:
-            reader.decrypt(password)
-        print("\nExtracting tables from PDF...")
-        tables = tabula.read_pdf(
+        if reader.is_encrypted and not reader.decrypt(password or ''):
+            raise ValueError("Incorrect password for the PDF")
+        text_pages = [number for number, page in enumerate(reader.pages, 1) if _page_has_text(page)]
+    count('pages', len(reader.pages))
+    with tempfile.TemporaryDirectory(prefix='expense_tracker_') as tmp_dir:
+        yield {
+            'source': str(pdf_path),
+            'reader': reader,
+            'tmp_dir': tmp_dir,
+            'path': None,
+            'page_count': len(reader.pages),
+            'text_pages': text_pages,
+        }
+
+def tabula_path(statement):
+    """Path tabula should read: the original file, or a decrypted copy written on first use."""
+    if statement['path'] is None:
+        reader = statement['reader']
+        if not reader.is_encrypted:
+            statement['path'] = statement['source']
+        else:
+            with stage('pdf_decrypted_copy'):
+                writer = PdfWriter()
+                for page in reader.pages:
+                    writer.add_page(page)
+                path = os.path.join(statement['tmp_dir'], 'statement.pdf')
+                with open(path, 'wb') as f:
+                    writer.write(f)
+            statement['path'] = path
+    return statement['path']
+
+def _read_page_range(pdf_path, password, pages, template=None, page_count=None):
+    """
+    Worker task: run tabula over one page range.
+    Without a template tabula guesses the tables and the geometry of each one
+    is kept in df.attrs['layout']; with a template the recorded areas and column
+    boundaries are used and the columns are named directly after STANDARD_COLS.
+    """
+    if template is None:
+        raw_json = tabula.read_pdf(
             pdf_path,
-            pages='all',
             password=password,
+            output_format='json',
+            **{**TABULA_OPTIONS, 'pages': pages}
+        )
+        return json_to_tables(raw_json)
+    numbers = page_numbers(pages, page_count)
+    tables = []
+    for section, section_pages in (('first_page', [n for n in numbers if n == 1]),
+                                   ('other_pages', [n for n in numbers if n > 1])):
+        if not section_pages:
+            continue
+        layout = template[section]
+        section_tables = tabula.read_pdf(
+            pdf_path,
+            password=password,
+            pages=format_pages(section_pages),
+            area=layout['area'],
+            columns=layout['columns'],
+            guess=False,
+            stream=True,
             multiple_tables=True,
-            guess=True,
-            pandas_options={'dtype': str}
+            pandas_options={'dtype': str, 'header': None}
         )
-        print(f"\nFound {len(tables)} tables in the PDF")
-        # Debug: Print column names for the first 30 tables
-        for i, table in enumerate(tables[:30]):
-            print(f"Table {i} columns: {list(table.columns)}")
-        if len(tables) > 0:
-            # Standard column names we want
-            standard_cols = {
-                'date_desc': ['date   value description', 'date', 'value date', 'description'],
-                'deposit': ['cheque deposit', 'deposit', 'credit', 'deposits'],
-                'withdrawal': ['withdrawal', 'debit', 'payment', 'withdrawals'],
-                'balance': ['balance', 'closing balance', 'available balance']
-            }
-            
-            all_transactions = []
-            month_map = {m: i for i, m in enumerate(['Jan','Feb','Mar','Apr','May','Jun','Jul','Aug','Sep','Oct','Nov','Dec'], 1)}
-            prev_month = None
-            prev_day = None
-            year = 2024
-            
-            for table in tables:
-                df = table.copy()
-                df.columns = [str(col).strip().lower() for col in df.columns]
-                col_map = {}
-                for key, options in standard_cols.items():
-                    for col in df.columns:
-                        if any(opt in col for opt in options):
-                            col_map[key] = col
-                            break
-                # Skip tables that don't have at least date/desc and balance
-                if 'date_desc' not in col_map or 'balance' not in col_map:
-                    continue
-                for idx, row in df.iterrows():
-                    row_str = str(row[col_map['date_desc']])
-                    match = re.search(r'([A-Za-z]{3})\s+(\d{1,2})', row_str)
-                    found_date = None
-                    if match:
-                        month_str, day_str = match.groups()
-                        month = month_map.get(month_str.capitalize())
-                        if month is not None:
-                            day = int(day_str)
-                            if prev_month is not None and prev_day is not None:
-                                if (month < prev_month) or (month == prev_month and day < prev_day):
-                                    year += 1
-                            prev_month = month
-                            prev_day = day
-                            found_date = f"{year}-{month:02d}-{day:02d}"
-                    if found_date:
-                        current_date = found_date
-                    # Filtering
-                    has_transaction_data = (
-                        (col_map.get('withdrawal') and pd.notna(row.get(col_map['withdrawal']))) or
-                        (col_map.get('deposit') and pd.notna(row.get(col_map['deposit']))) or
-                        pd.notna(row.get(col_map['balance'])) or
-                        (pd.notna(row.get(col_map['date_desc'])) and not re.search(r'CURRENCY|ACCOUNT|BRANCH|Date|STATEMENT|NOMINEE|ADDRESS|IFSC|MICR|Phone|Brought Forward|ABR Complex|EPIP Zone|Whitefield|Bengaluru|Karnataka|560066|560036004|9036002402', row_str, re.IGNORECASE))
-                    )
-                    desc_str = str(row.get(col_map['date_desc'], ''))
-                    if re.search(r'STATEMENT DATE|CURRENCY|ACCOUNT TYPE|ACCOUNT NO|NOMINEE REGISTERED|BRANCH ADDRESS|ABR Complex|EPIP Zone|Whitefield|Bengaluru|Karnataka|560066|IFSC|MICR CODE|Phone No|Balance Brought Forward', desc_str, re.IGNORECASE):
-                        has_transaction_data = False
-                    if has_transaction_data and found_date:
-                        deposit_amount = clean_amount(row.get(col_map.get('deposit'), None)) if col_map.get('deposit') else None
-                        withdrawal_amount = clean_amount(row.get(col_map.get('withdrawal'), None)) if col_map.get('withdrawal') else None
-                        balance_amount = clean_amount(row.get(col_map.get('balance'), None)) if col_map.get('balance') else None
-                        all_transactions.append({
-                            'Value Date': found_date,
-                            'Description': row.get(col_map['date_desc'], None),
-                            'Deposit': deposit_amount,
-                            'Withdrawal': withdrawal_amount,
-                            'Balance': balance_amount
-                        })
-            final_df = pd.DataFrame(all_transactions)
-            if 'Description' in final_df.columns:
-                final_df['Description'] = final_df['Description'].apply(clean_description)
-                final_df['Description'] = final_df['Description'].apply(format_description)
-            if 'Deposit' in final_df.columns:
-                final_df['Deposit'] = final_df['Deposit'].apply(clean_amount)
-            if 'Withdrawal' in final_df.columns:
-                final_df['Withdrawal'] = final_df['Withdrawal'].apply(clean_amount)
-            if 'Balance' in final_df.columns:
-                final_df['Balance'] = final_df['Balance'].apply(clean_amount)
-            column_order = ['Value Date', 'Description', 'Deposit', 'Withdrawal', 'Balance']
-            final_df = final_df.reindex(columns=column_order, fill_value=None)
-            final_df = final_df.dropna(how='all')
-            if 'Value Date' in final_df.columns:
-                final_df = final_df.sort_values('Value Date', ascending=True)
-            return final_df
+        for table in section_tables:
+            if len(table.columns) == len(layout['names']):
+                table.columns = layout['names']
+        tables.extend(section_tables)
+    return tables
+
+def _read_pages(statement, pages, workers, template):
+    """Run tabula over the selected pages that have a text layer, in parallel page ranges when asked."""
+    text_pages = set(statement['text_pages'])
+    numbers = [n for n in page_numbers(pages, statement['page_count']) if n in text_pages]
+    if not numbers:
+        print("\nNo pages with a text layer to extract tables from")
+        return []
+    skipped = len(page_numbers(pages, statement['page_count'])) - len(numbers)
+    if skipped:
+        print(f"\nSkipping {skipped} pages without a text layer")
+    # The decrypted copy needs no password
+    path = tabula_path(statement)
+    page_count = statement['page_count']
+    mode = "with layout template" if template else "in guess mode"
+    if pages == 'all' and workers != 1:
+        ranges = split_page_ranges(numbers, workers)
+        if len(ranges) > 1:
+            print(f"\nExtracting tables from PDF {mode} in {len(ranges)} page ranges...")
+            workers = len(ranges)
+            with stage('tabula'), ProcessPoolExecutor(max_workers=workers, initializer=warm_tabula) as pool:
+                # map() returns the ranges in submission order, so the tables stay in page order
+                parts = pool.map(_read_page_range, [path] * workers, [None] * workers, ranges,
+                                 [template] * workers, [page_count] * workers)
+                return [table for part in parts for table in part]
+    if pages == 'all':
+        print(f"\nExtracting tables from PDF {mode}...")
+    else:
+        print(f"\nExtracting tables from PDF pages {pages} {mode}...")
+    with stage('tabula'):
+        return _read_page_range(path, None, format_pages(numbers), template, page_count)
+
+def build_layout_template(tables):
+    """
+    Derive a layout template from guess-mode tables: the area and column
+    boundaries of the transaction tables on the first and on later pages.
+    Returns None when the tables carry no geometry or no transaction table.
+    """
+    sections = {'first_page': [], 'other_pages': []}
+    for table in tables:
+        layout = table.attrs.get('layout')
+        if not layout:
+            continue
+        columns = [str(col).strip().lower() for col in table.columns]
+        col_map = map_columns(columns)
+        if 'date_desc' not in col_map or 'balance' not in col_map:
+            continue
+        keys = {}
+        for key, col in col_map.items():
+            keys.setdefault(col, key)
+        names = [keys.pop(col, f"column_{i}") for i, col in enumerate(columns)]
+        section = 'first_page' if layout['page'] == 1 else 'other_pages'
+        sections[section].append((layout, names))
+    return make_template(sections)
+
+def template_fits(tables, template):
+    """Check that template-mode tables have the recorded columns and real balances."""
+    names = [template['first_page']['names'], template['other_pages']['names']]
+    if not tables or any(list(table.columns) not in names for table in tables):
+        return False
+    return any(clean_amounts(table['balance']).notna().any() for table in tables)
+
+def read_tables(pdf_path, password, pages='all', use_cache=True, refresh=False, workers=1,
+                bank=DEFAULT_BANK, use_template=True, statement=None, digest=None):
+    """
+    Extract the raw tables of some or all pages with tabula, through the extraction cache.
+    A recorded layout template for the bank replaces guess-mode detection; if it
+    does not fit, guess mode runs and the template is recorded again.
+    Args:
+        pdf_path (str): Path to the PDF file
+        password (str): Password for the PDF file
+        pages (str): tabula page selection, e.g. 'all', '3' or '1-4'
+        use_cache (bool): Reuse raw tables cached for this file's content (and
+            password, if it is encrypted; see extraction_cache.cached_read)
+        refresh (bool): Re-extract even if the tables are cached
+        workers (int): Processes used to extract page ranges of the whole
+            document in parallel; None decides from the page count, see split_page_ranges
+        bank (str): Bank whose layout template is used and recorded
+        use_template (bool): Set False to always use guess mode and never record
+        statement (dict): Already opened statement, see open_statement; by
+            default the PDF is opened and decrypted only on a cache miss
+        digest (str): The PDF's file_digest, if already computed
+    Returns:
+        list[pandas.DataFrame]: Tables in page order
+    """
+    with ExitStack() as stack:
+        def source():
+            nonlocal statement
+            if statement is None:
+                statement = stack.enter_context(open_statement(pdf_path, password))
+            return statement
+        if statement is not None:
+            encrypted = statement['reader'].is_encrypted
         else:
-            print("No tables found in the PDF.")
-            return None
+            # Parsing tells whether the file is encrypted; nothing is decrypted on a cache hit
+            encrypted = use_cache and PdfReader(pdf_path).is_encrypted
+        cache_options = {'use_cache': use_cache, 'refresh': refresh, 'digest': digest,
+                         'encrypted': encrypted, 'password': password}
+        template = load_template(bank) if use_template else None
+        if template is not None:
+            options = {**TABULA_OPTIONS, 'pages': pages, 'dtype': 'str', 'template': template}
+            tables = cached_read(pdf_path, options, lambda: _read_pages(source(), pages, workers, template),
+                                 **cache_options)
+            if template_fits(tables, template):
+                return tables
+            print(f"\nLayout template for {bank} does not fit this statement; falling back to guess mode")
+        options = {**TABULA_OPTIONS, 'pages': pages, 'dtype': 'str'}
+        tables = cached_read(pdf_path, options, lambda: _read_pages(source(), pages, workers, None),
+                             **cache_options)
+    # Only whole documents show both first-page and continuation-page layouts
+    if use_template and pages == 'all':
+        new_template = build_layout_template(tables)
+        if new_template is not None and new_template != template:
+            save_template(bank, new_template)
+    return tables
+
+def _read_pdf(pdf_path, password, bank=DEFAULT_BANK, use_cache=True, refresh=False, page_workers=None,
+              use_template=True):
+    """Read half of extract_bank_statement: the raw tables for clean_statement, or None if there are none."""
+    tables = read_tables(pdf_path, password, use_cache=use_cache, refresh=refresh, workers=page_workers,
+                         bank=bank, use_template=use_template)
+    print(f"\nFound {len(tables)} tables in the PDF")
+    # Debug: Print column names for the first 30 tables
+    for i, table in enumerate(tables[:30]):
+        print(f"Table {i} columns: {list(table.columns)}")
+    if len(tables) == 0:
+        print("No tables found in the PDF.")
+        return None
+    return {'tables': tables, 'bank': bank}
+
+def _read_export(export_path, bank=None):
+    """Read half of extract_bank_export: the export's rows for clean_statement."""
+    with stage('export_read'):
+        df, detected = read_bank_export(export_path)
+    print(f"\nRead {len(df)} rows from {detected} export {export_path}")
+    return {'frame': df, 'bank': bank or detected}
+
+def clean_statement(raw, categories=None):
+    """
+    Clean half of extract_statement: turn what read_statement returned into transactions.
+    Args:
+        raw (dict): 'bank' and either the PDF's raw 'tables' or an export's 'frame'
+        categories (str): Category rules file to add a Category column, see extract_bank_statement
+    Returns:
+        pandas.DataFrame: Extracted transactions
+    """
+    rules = bank_rules(raw['bank'])
+    if 'frame' in raw:
+        df = raw['frame']
+    else:
+        df = tables_to_transactions(raw['tables'], new_year_state(), rules)
+    df = finalize_transactions(df, rules, categories=categories)
+    df.attrs['bank'] = raw['bank']
+    return df
+
+def extract_bank_statement(pdf_path, password, bank=DEFAULT_BANK, use_cache=True, refresh=False, page_workers=None,
+                           use_template=True, categories=None):
+    """
+    Extract table data from a password-protected PDF bank statement.
+    Args:
+        pdf_path (str): Path to the PDF file
+        password (str): Password for the PDF file
+        bank (str): Bank whose header/address rules are used, see statement_rules.BANK_RULES
+        use_cache (bool): Reuse raw tables cached for this file's content
+        refresh (bool): Re-extract even if the tables are cached
+        page_workers (int): Processes for parallel page-range extraction; None
+            splits only large statements, 1 forces a single tabula call
+        use_template (bool): Use and record the bank's layout template
+        categories (str): Category rules file ('' for the built-in rules) to add a
+            Category column; None leaves transactions uncategorized
+    Returns:
+        pandas.DataFrame: Extracted table data
+    """
+    try:
+        raw = _read_pdf(pdf_path, password, bank=bank, use_cache=use_cache, refresh=refresh,
+                        page_workers=page_workers, use_template=use_template)
+        return None if raw is None else clean_statement(raw, categories)
     except Exception as e:
         print(f"Error processing PDF: {str(e)}")
         return None
 
-def clean_description(desc):
+def iter_transactions(pdf_path, password, bank=DEFAULT_BANK, pages_per_chunk=1, use_cache=True, refresh=False,
+                      use_template=True, categories=None, digest=None):
+    """
+    Extract a statement a few pages at a time, yielding cleaned transactions as
+    each chunk is parsed. The year rollover state and the last balance are
+    carried across chunks, so dates and reconciliation match
+    extract_bank_statement; rows come out in statement order.
+    Args:
+        pdf_path (str): Path to the PDF file
+        password (str): Password for the PDF file
+        bank (str): Bank whose header/address rules are used
+        pages_per_chunk (int): Number of pages handed to tabula per call
+        use_cache (bool): Reuse raw tables cached for this file's content
+        refresh (bool): Re-extract even if the tables are cached
+        use_template (bool): Use the bank's recorded layout template
+        categories (str): Category rules file to add a Category column, see extract_bank_statement
+        digest (str): The PDF's file_digest (default: hashed once here when the cache is used)
+    Yields:
+        pandas.DataFrame: Cleaned transactions of one page chunk
+    """
+    rules = bank_rules(bank)
+    year_state = new_year_state()
+    # Every chunk is a cache lookup; hash the file once, not once per chunk
+    if use_cache and digest is None:
+        digest = file_digest(pdf_path)
+    balance = None
+    # One tabula call per chunk: keep a single JVM alive for all of them
+    warm_tabula()
+    with open_statement(pdf_path, password) as statement:
+        text_pages = statement['text_pages']
+        for start in range(0, len(text_pages), pages_per_chunk):
+            pages = format_pages(text_pages[start:start + pages_per_chunk])
+            tables = read_tables(pdf_path, password, pages=pages, use_cache=use_cache, refresh=refresh,
+                                 bank=bank, use_template=use_template, statement=statement, digest=digest)
+            chunk = finalize_transactions(tables_to_transactions(tables, year_state, rules), rules, sort=False,
+                                          categories=categories, opening_balance=balance)
+            balances = chunk['Balance'].dropna()
+            if len(balances) > 0:
+                balance = float(balances.iloc[-1])
+            if len(chunk) > 0:
+                yield chunk
+
+def extract_bank_export(export_path, bank=None, categories=None):
+    """
+    Read a structured CSV/XLS statement export directly, without tabula.
+    Args:
+        export_path (str): Export file, see bank_exports.EXPORT_LAYOUTS
+        bank (str): Bank whose description rules are used (default: detected from the header)
+        categories (str): Category rules file to add a Category column, see extract_bank_statement
+    Returns:
+        pandas.DataFrame: Extracted transactions, in the same shape as extract_bank_statement
+    """
+    try:
+        return clean_statement(_read_export(export_path, bank), categories)
+    except Exception as e:
+        print(f"Error processing export: {str(e)}")
+        return None
+
+def statement_export(path):
+    """The structured export to read for path: path itself, one saved next to it, or None."""
+    return path if detect_export(path) else find_export(path)
+
+def read_statement(path, password=None, **kwargs):
+    """
+    Read half of extract_statement, for callers that read and clean in
+    different processes (see async_pipeline). Errors are raised, not printed.
+    Args:
+        path (str): PDF statement or structured export
+        password (str): Password for the PDF file
+        **kwargs: Keyword arguments of extract_bank_statement, except categories
+    Returns:
+        dict: Input for clean_statement, or None if the PDF has no tables
+    """
+    export_path = statement_export(path)
+    if export_path is not None:
+        return _read_export(export_path)
+    return _read_pdf(path, password, **kwargs)
+
+def extract_statement(path, password=None, **kwargs):
+    """
+    Extract transactions from a statement, preferring a structured export.
+    A CSV/XLS export given directly, or saved next to the PDF under the same
+    name, is parsed as-is; otherwise the PDF goes through tabula.
+    Args:
+        path (str): PDF statement or structured export
+        password (str): Password for the PDF file
+        **kwargs: Keyword arguments passed to extract_bank_statement
+    Returns:
+        pandas.DataFrame: Extracted transactions, or None on failure
+    """
+    export_path = statement_export(path)
+    if export_path is not None:
+        return extract_bank_export(export_path, categories=kwargs.get('categories'))
+    return extract_bank_statement(path, password, **kwargs)
+
+def output_csv_path(source_path):
+    """
+    CSV written for a statement: next to it, without overwriting a CSV export.
+    When '<name>.csv' is taken by an export, exports get '<name>_<suffix>_transactions.csv',
+    so 'x.csv' and 'x.xls' of one batch write different files; PDFs get '<name>_transactions.csv'.
+    """
+    source_path = Path(source_path)
+    output_path = source_path.with_suffix('.csv')
+    if output_path == source_path or detect_export(output_path):
+        suffix = source_path.suffix.lower().lstrip('.')
+        tag = '' if suffix == 'pdf' else f"_{suffix}"
+        output_path = output_path.parent / f"{output_path.stem}{tag}_transactions.csv"
+    return output_path
+
+def stream_bank_statement(pdf_path, password, parquet_dir=None, ledger_db=None, account=None, **kwargs):
+    """
+    Extract a statement page by page and append each chunk to the output CSV as it goes.
+    Args:
+        pdf_path (str): Path to the PDF file
+        password (str): Password for the PDF file
+        parquet_dir (str): Also append each chunk to this Parquet ledger, see parquet_ledger
+        ledger_db (str): Also upsert each chunk into this SQLite ledger, see sqlite_ledger
+        account (str): Account name in the ledgers (default: the bank)
+        **kwargs: Keyword arguments passed to iter_transactions
+    Returns:
+        tuple: (output path, number of transactions written), or None on failure
+    """
+    output_path = output_csv_path(pdf_path)
+    try:
+        f = open(output_path, 'w', newline='')
+    except PermissionError:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_path = output_path.parent / f"{output_path.stem}_processed_{timestamp}.csv"
+        f = open(output_path, 'w', newline='')
+        print("Note: Original filename was in use, so timestamp was added.")
+    total = 0
+    account = account or kwargs.get('bank', DEFAULT_BANK)
+    source = source_name(pdf_path, account)
+    try:
+        with f:
+            if parquet_dir:
+                remove_statement(parquet_dir, source)
+            columns = TRANSACTION_COLUMNS + (['Category'] if kwargs.get('categories') is not None else [])
+            pd.DataFrame(columns=columns).to_csv(f, index=False)
+            for part, chunk in enumerate(iter_transactions(pdf_path, password, **kwargs)):
+                with stage('csv_write'):
+                    chunk.to_csv(f, index=False, header=False)
+                    f.flush()
+                if parquet_dir:
+                    with stage('parquet_write'):
+                        write_parquet_ledger(chunk, parquet_dir, source, part=part)
+                if ledger_db:
+                    with stage('ledger_write'):
+                        ingest_transactions(ledger_db, chunk, account, source)
+                total += len(chunk)
+                print(f"Wrote {total} transactions so far to {output_path}")
+    except Exception as e:
+        print(f"Error processing PDF: {str(e)}")
+        return None
+    return output_path, total
+
+def clean_description(desc, rules=None):
     """Clean description by removing account information and header text."""
     if pd.isna(desc):
         return None
     
     desc = str(desc).strip()
     
-    # Remove account information patterns
-    patterns_to_remove = [
-        r'STATEMENT DATE.*?Phone No\.: \d+',
-        r'CURRENCY.*?Phone No\.: \d+',
-        r'ACCOUNT TYPE.*?Phone No\.: \d+',
-        r'ACCOUNT NO.*?Phone No\.: \d+',
-        r'NOMINEE REGISTERED.*?Phone No\.: \d+',
-        r'BRANCH ADDRESS.*?Phone No\.: \d+',
-        r'ABR Complex.*?Phone No\.: \d+',
-        r'EPIP Zone.*?Phone No\.: \d+',
-        r'Whitefield.*?Phone No\.: \d+',
-        r'Bengaluru.*?Phone No\.: \d+',
-        r'Karnataka.*?Phone No\.: \d+',
-        r'560066.*?Phone No\.: \d+',
-        r'IFSC.*?Phone No\.: \d+',
-        r'MICR CODE.*?Phone No\.: \d+',
-        r'Phone No\.: \d+',
-        r'Balance Brought Forward',
-        r'Date   Value Description Date',
-    ]
-    
-    for pattern in patterns_to_remove:
-        desc = re.sub(pattern, '', desc, flags=re.IGNORECASE | re.DOTALL)
+    # Remove account information with the bank's combined cleanup pattern
+    rules = rules or bank_rules()
+    if rules['cleanup'] is not None:
+        desc = rules['cleanup'].sub('', desc)
     
     # Clean up extra whitespace
     desc = re.sub(r'\s+', ' ', desc).strip()
     
     return desc if desc else None
 
-def main():
-    if len(sys.argv) != 3:
-        print("Usage: python pdf_analyzer.py <pdf_path> <password>")
-        sys.exit(1)
-    pdf_path = sys.argv[1]
-    password = sys.argv[2]
-    if not os.path.exists(pdf_path):
-        print(f"Error: PDF file not found at {pdf_path}")
-        sys.exit(1)
-    # Extract the data
-    df = extract_bank_statement(pdf_path, password)
-    if df is not None:
-        # Save the extracted data to CSV with original name
-        output_path = Path(pdf_path).with_suffix('.csv')
+def warm_tabula():
+    """
+    Start the tabula JVM in this process so later read_pdf calls reuse it.
+    Without jpype, tabula falls back to launching java once per call.
+    """
+    try:
+        import jpype
+        from tabula.backend import jar_path
+    except ImportError:
+        print("jpype not installed; tabula will start a new JVM for every statement")
+        return
+    if not jpype.isJVMStarted():
+        jpype.addClassPath(jar_path())
+        jpype.startJVM("-Djava.awt.headless=true", "-Dfile.encoding=UTF8", convertStrings=False)
+
+def save_transactions(df, pdf_path, parquet_dir=None, ledger_db=None, account=None):
+    """
+    Save extracted transactions to a CSV next to the input PDF.
+    Args:
+        df (pandas.DataFrame): Extracted transactions
+        pdf_path (str): Path to the source PDF file
+        parquet_dir (str): Also write them to this month-partitioned Parquet ledger
+        ledger_db (str): Also upsert them into this SQLite ledger
+        account (str): Account name in the ledgers (default: the bank)
+    Returns:
+        pathlib.Path: Path of the written CSV file
+    """
+    # Save the extracted data to CSV with original name
+    output_path = output_csv_path(pdf_path)
+    with stage('csv_write'):
         try:
             df.to_csv(output_path, index=False)
             print(f"\nData successfully extracted and saved to {output_path}")
@@ -334,13 +937,151 @@ def main():
             df.to_csv(output_path, index=False)
             print(f"\nData successfully extracted and saved to {output_path}")
             print("Note: Original filename was in use, so timestamp was added.")
+    account = account or df.attrs.get('bank', DEFAULT_BANK)
+    source = source_name(pdf_path, account) if parquet_dir or ledger_db else None
+    if parquet_dir:
+        with stage('parquet_write'):
+            remove_statement(parquet_dir, source)
+            rows = write_parquet_ledger(df, parquet_dir, source)
+        print(f"Appended {rows} transactions to Parquet ledger {parquet_dir}")
+    if ledger_db:
+        with stage('ledger_write'):
+            added = ingest_transactions(ledger_db, df, account, source)
+        print(f"Added {added} new transactions to ledger {ledger_db} ({len(df) - added} already present)")
+    return output_path
+
+def run(args, extract_options, worker_reports=None):
+    """Run the extraction the command line asked for; returns the exit status."""
+    if args.batch and args.pipeline:
+        from async_pipeline import run_pipeline
+        extract_options['page_workers'] = args.page_workers or 1
+        results, _ = run_pipeline(args.pdf_path, args.password, extract_workers=args.workers,
+                                  clean_workers=args.clean_workers, write_workers=args.write_workers,
+                                  queue_size=args.queue_size or 2, parquet_dir=args.parquet,
+                                  ledger_db=args.ledger_db, account=args.account, **extract_options)
+        return 0 if results and all(r['output'] for r in results) else 1
+    if args.batch:
+        from batch_analyzer import run_batch
+        # The batch pool already uses every core; don't nest page-level pools by default
+        extract_options['page_workers'] = args.page_workers or 1
+        results = run_batch(args.pdf_path, args.password, workers=args.workers, parquet_dir=args.parquet,
+                            ledger_db=args.ledger_db, account=args.account,
+                            profile=worker_reports is not None, **extract_options)
+        if worker_reports is not None:
+            worker_reports.extend(r['metrics'] for r in results if r.get('metrics'))
+        return 0 if results and all(r['output'] for r in results) else 1
+    if args.watch:
+        from watch_folder import watch_folder
+        extract_options['page_workers'] = args.page_workers or 1
+        state = watch_folder(args.pdf_path, args.password, workers=args.workers, queue_size=args.queue_size,
+                             poll_interval=args.poll_interval, max_attempts=args.max_attempts,
+                             parquet_dir=args.parquet, ledger_db=args.ledger_db, account=args.account,
+                             once=args.once, **extract_options)
+        return 0 if all(entry['status'] != 'quarantined' for entry in state['files'].values()) else 1
+    pdf_path = args.pdf_path
+    password = args.password
+    if not os.path.exists(pdf_path):
+        print(f"Error: PDF file not found at {pdf_path}")
+        return 1
+    # Structured exports parse in milliseconds; streaming only pays off for PDFs
+    if args.stream and not (detect_export(pdf_path) or find_export(pdf_path)):
+        result = stream_bank_statement(pdf_path, password, parquet_dir=args.parquet, ledger_db=args.ledger_db,
+                                       account=args.account, **extract_options)
+        if result is None:
+            print("Failed to extract data from the PDF.")
+            return 1
+        output_path, total = result
+        print(f"\nData successfully extracted and saved to {output_path}")
+        print(f"\nTotal transactions extracted: {total}")
+        return 0
+    # Extract the data
+    df = extract_statement(pdf_path, password, **extract_options)
+    if df is not None:
+        save_transactions(df, pdf_path, parquet_dir=args.parquet, ledger_db=args.ledger_db, account=args.account)
         
         # Display first few rows
         print("\nFirst few rows of extracted data:")
         print(df.head(10))
         print(f"\nTotal transactions extracted: {len(df)}")
-    else:
-        print("Failed to extract data from the PDF.")
+        return 0
+    print("Failed to extract data from the PDF.")
+    return 1
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract transactions from bank statement PDFs.")
+    parser.add_argument("pdf_path", help="PDF file or CSV/XLS export, or a directory/glob of PDFs with --batch")
+    parser.add_argument("password", nargs="?", default=None,
+                        help="PDF password, or a JSON password map with --batch")
+    parser.add_argument("--batch", action="store_true",
+                        help="Process every statement matched by pdf_path in parallel")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="With --batch, overlap extraction, cleaning and writing in a staged pipeline")
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep watching the pdf_path folder and extract statements as they arrive")
+    parser.add_argument("--bank", default=DEFAULT_BANK,
+                        help="Bank layout whose header/address rules apply (default: %(default)s)")
+    parser.add_argument("--no-cache", dest="use_cache", action="store_false",
+                        help="Always run tabula and do not read or write the extraction cache")
+    parser.add_argument("--refresh", action="store_true",
+                        help="Re-extract tables and overwrite the cached copy")
+    parser.add_argument("--no-template", dest="use_template", action="store_false",
+                        help="Always use tabula guess mode and do not record a layout template")
+    parser.add_argument("--parquet", metavar="LEDGER_DIR", default=None,
+                        help="Also append transactions to a Parquet ledger partitioned by year/month")
+    parser.add_argument("--ledger-db", metavar="DB", default=None,
+                        help="Also upsert transactions into a de-duplicating SQLite ledger")
+    parser.add_argument("--account", default=None,
+                        help="Account name used in the SQLite ledger (default: the bank)")
+    parser.add_argument("--categorize", nargs="?", const="", default=None, metavar="RULES_JSON",
+                        help="Add a Category column using the built-in merchant rules, extended by RULES_JSON")
+    parser.add_argument("--stream", action="store_true",
+                        help="Extract page by page and append rows to the CSV as they are parsed")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Number of worker processes for --batch and --watch, or extract processes "
+                             "for --pipeline (default: CPU count; half of it for --pipeline)")
+    parser.add_argument("--clean-workers", type=int, default=None,
+                        help="Cleaning processes for --pipeline (default: half the CPU count)")
+    parser.add_argument("--write-workers", type=int, default=2,
+                        help="Output writing threads for --pipeline (default: %(default)s)")
+    parser.add_argument("--queue-size", type=int, default=None,
+                        help="Statements queued or running at once in --watch (default: 2 per worker), "
+                             "or waiting in front of each --pipeline stage (default: 2)")
+    parser.add_argument("--poll-interval", type=float, default=10.0,
+                        help="Seconds between folder scans in --watch (default: %(default)s)")
+    parser.add_argument("--max-attempts", type=int, default=3,
+                        help="Failed attempts before --watch moves a statement to quarantine/ (default: %(default)s)")
+    parser.add_argument("--once", action="store_true",
+                        help="With --watch, stop when the folder has been processed instead of polling forever")
+    parser.add_argument("--page-workers", type=int, default=None,
+                        help="Processes that extract page ranges of one statement in parallel "
+                             f"(default: CPU count for statements of {PARALLEL_MIN_PAGES}+ pages, 1 in --batch)")
+    parser.add_argument("--profile", metavar="REPORT_JSON", default=None,
+                        help="Write per-stage timings, row/table counts and peak memory to a JSON report")
+    parser.add_argument("--profile-dump", metavar="PROF_FILE", default=None,
+                        help="Also run under cProfile and write the stats to PROF_FILE")
+    args = parser.parse_args()
+    extract_options = {'bank': args.bank, 'use_cache': args.use_cache, 'refresh': args.refresh,
+                       'use_template': args.use_template, 'categories': args.categorize}
+    if not args.stream:
+        extract_options['page_workers'] = args.page_workers
+    if (args.batch or args.watch) and args.password is None:
+        parser.error("--batch and --watch need a password or a JSON password map")
+    if not (args.profile or args.profile_dump):
+        sys.exit(run(args, extract_options))
+    with profiled(args.profile_dump) as profile:
+        worker_reports = []
+        status = run(args, extract_options, worker_reports)
+    report = profile['report']
+    if worker_reports:
+        # Batch statements run in worker processes; their stages are what matters
+        report = merge_reports(worker_reports)
+    print_report(report)
+    if args.profile:
+        write_report(report, args.profile, input=args.pdf_path, wall_seconds=profile['wall_seconds'],
+                     options=extract_options)
+    if args.profile_dump:
+        print(f"cProfile stats written to {args.profile_dump}")
+    sys.exit(status)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
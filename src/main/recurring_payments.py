@@ -0,0 +1,221 @@
+import glob
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from categorizer import merchant_names
+
+# Recurring payments: rent, SIPs, subscriptions, salary. Transactions are
+# grouped by account, payee and direction, sorted by amount and cut wherever
+# the next amount is more than the tolerance above the previous one; each
+# group is then sorted by date and its intervals matched against the cadences
+# below. Payees left without a series get a second pass ignoring the amount.
+# Sorts and grouped passes only, no pairwise comparison.
+#   name, period in days, slack in days, calendar months (0 for day-based)
+CADENCES = [
+    ('weekly', 7.0, 2.0, 0),
+    ('fortnightly', 14.0, 3.0, 0),
+    ('monthly', 30.44, 5.0, 1),
+    ('quarterly', 91.31, 12.0, 3),
+    ('half-yearly', 182.62, 20.0, 6),
+    ('yearly', 365.25, 25.0, 12),
+]
+
+AMOUNT_TOLERANCE = 0.25
+CHANGE_TOLERANCE = 0.01
+MIN_PAYMENTS = 3
+MIN_REGULARITY = 0.75
+# Expected payments missing in a row before a series counts as stopped
+STOPPED_AFTER = 3
+
+SHEET_ACCOUNT = 'sheet'
+
+def load_transactions(csv_paths=(), ledger_db=None, account=None, sheets=()):
+    """
+    Read transactions from extracted CSVs, the SQLite ledger and expenditure sheets.
+    Args:
+        csv_paths (list[str]): CSVs written by pdf_analyzer.py (globs allowed); overlapping
+            statements of one account are de-duplicated
+        ledger_db (str): SQLite ledger, see sqlite_ledger.py
+        account (str): Account of the CSV rows, and the only account read from the ledger
+        sheets (list[str]): Expenditure sheet exports (globs allowed), read as account 'sheet'
+    Returns:
+        pandas.DataFrame: account, date, description, amount (deposits positive, withdrawals negative)
+    """
+    frames = []
+    statements = [pd.read_csv(path) for pattern in csv_paths for path in sorted(glob.glob(pattern)) or [pattern]]
+    if statements:
+        df = pd.concat(statements, ignore_index=True).drop_duplicates()
+        amount = pd.to_numeric(df['Deposit'], errors='coerce').fillna(0.0) \
+            - pd.to_numeric(df['Withdrawal'], errors='coerce').fillna(0.0)
+        frames.append(pd.DataFrame({'account': account or 'statement', 'date': df['Value Date'],
+                                    'description': df['Description'], 'amount': amount}))
+    if ledger_db:
+        from sqlite_ledger import query_transactions
+        ledger = query_transactions(ledger_db, account=account)
+        frames.append(ledger[['account', 'value_date', 'description', 'amount']]
+                      .rename(columns={'value_date': 'date'}))
+    if sheets:
+        from analyse_spends import pandas_sheet_rows, sheet_paths
+        rows = pandas_sheet_rows(sheet_paths(sheets))
+        frames.append(pd.DataFrame({'account': SHEET_ACCOUNT, 'date': rows['Date'], 'description': rows['Item'],
+                                    'amount': -rows['Expenditure']}))
+    if not frames:
+        raise ValueError("No transactions: give transaction CSVs, --ledger-db or --sheets")
+    df = pd.concat(frames, ignore_index=True)
+    df['date'] = pd.to_datetime(df['date'], errors='coerce')
+    return df.dropna(subset=['date'])
+
+def _cadences(median_interval):
+    """Cadence of each series from its median interval; None where none fits."""
+    name = np.full(len(median_interval), None, dtype=object)
+    period = np.full(len(median_interval), np.nan)
+    slack = np.full(len(median_interval), np.nan)
+    for cadence, days, tolerance, _ in reversed(CADENCES):
+        fits = np.abs(median_interval - days) <= tolerance
+        name[fits], period[fits], slack[fits] = cadence, days, tolerance
+    return name, period, slack
+
+def _next_dates(last, cadence):
+    """Expected next payment: the same day of the month for month-based cadences."""
+    next_date = pd.Series(pd.NaT, index=last.index, dtype=last.dtype)
+    for name, days, _, months in CADENCES:
+        rows = cadence == name
+        if rows.any():
+            step = pd.DateOffset(months=months) if months else pd.Timedelta(days=days)
+            next_date[rows] = (last[rows] + step).dt.normalize()
+    return next_date
+
+def _series(tx, amount_tolerance, change_tolerance, min_payments, min_regularity):
+    """Series of tx (see detect_recurring) that keep to a cadence, with their cadence, period and slack."""
+    # Amount buckets: one sort, then a cut wherever the amount jumps or the payee changes
+    tx = tx.sort_values(['account', 'payee', 'direction', 'amount'], kind='stable')
+    keys = [tx[col].to_numpy() for col in ('account', 'payee', 'direction')]
+    amounts = tx['amount'].to_numpy()
+    cut = np.ones(len(tx), dtype=bool)
+    if len(tx) > 1:
+        cut[1:] = (amounts[1:] > amounts[:-1] * (1 + amount_tolerance)) \
+            | np.logical_or.reduce([key[1:] != key[:-1] for key in keys])
+    tx = tx.assign(series=np.cumsum(cut))
+    # Two payments on one day are one occurrence
+    tx = tx.drop_duplicates(['series', 'date'])
+    tx = tx[tx.groupby('series')['series'].transform('size') >= min_payments]
+    if tx.empty:
+        return None
+
+    # Intervals and amount changes in date order within each series
+    tx = tx.sort_values(['series', 'date'], kind='stable')
+    series = tx['series'].to_numpy()
+    same = np.r_[False, series[1:] == series[:-1]]
+    days = tx['date'].to_numpy().astype('datetime64[D]').astype('int64')
+    interval = np.where(same, np.r_[0, np.diff(days)], np.nan)
+    amounts = tx['amount'].to_numpy()
+    previous = np.r_[np.nan, amounts[:-1]]
+    changed = same & (np.abs(amounts / previous - 1) > change_tolerance)
+    tx = tx.assign(interval=interval, previous=np.where(changed, previous, np.nan),
+                   change_date=tx['date'].where(changed))
+
+    result = tx.groupby('series', sort=True).agg(
+        account=('account', 'first'), payee=('payee', 'first'), direction=('direction', 'first'),
+        payments=('date', 'size'), amount=('amount', 'median'), last_amount=('amount', 'last'),
+        first_date=('date', 'min'), last_date=('date', 'max'), median_interval=('interval', 'median'),
+        amount_changes=('change_date', 'count'), last_change=('change_date', 'max'),
+        previous_amount=('previous', 'last'))
+    result['cadence'], result['period'], result['slack'] = _cadences(result['median_interval'].to_numpy())
+
+    # An interval of about k periods is on cadence, with k - 1 payments missed
+    rows = result.index.get_indexer(series)
+    period, slack = result['period'].to_numpy()[rows], result['slack'].to_numpy()[rows]
+    steps = np.maximum(np.round(interval / period), 1)
+    tx = tx.assign(on_cadence=np.where(np.isnan(interval), np.nan, np.abs(interval - steps * period) <= slack * steps),
+                   gap_missed=np.where(np.isnan(interval), 0, steps - 1))
+    result['regularity'] = tx.groupby('series')['on_cadence'].mean().round(2)
+    result['missed'] = tx.groupby('series')['gap_missed'].sum()
+    return result[result['cadence'].notna() & (result['regularity'] >= min_regularity)]
+
+def detect_recurring(df, amount_tolerance=AMOUNT_TOLERANCE, change_tolerance=CHANGE_TOLERANCE,
+                     min_payments=MIN_PAYMENTS, min_regularity=MIN_REGULARITY, as_of=None):
+    """
+    Find recurring payments and their state. Payments of about the same amount
+    form a series first; payees left without one are tried again with any
+    amount, which finds bills and interest that vary ('varying_amount').
+    Args:
+        df (pandas.DataFrame): Output of load_transactions
+        amount_tolerance (float): Relative step between sorted amounts that still keeps them in one series
+        change_tolerance (float): Relative difference from the previous payment counted as an amount change
+        min_payments (int): Fewest payments in a series
+        min_regularity (float): Share of intervals that must fit the cadence (a multiple of it counts, as missed payments)
+        as_of (str): Date missed payments are counted up to (default: each account's latest transaction)
+    Returns:
+        pandas.DataFrame: One row per series: account, payee, direction, cadence, payments,
+            amount (median), last_amount, varying_amount, first_date, last_date, next_date,
+            missed, amount_changes, last_change, previous_amount, regularity and status
+            ('active', 'missed' or 'stopped')
+    """
+    columns = ['account', 'payee', 'direction', 'cadence', 'payments', 'amount', 'last_amount', 'varying_amount',
+               'first_date', 'last_date', 'next_date', 'missed', 'amount_changes', 'last_change',
+               'previous_amount', 'regularity', 'status']
+    amount = df['amount'].to_numpy(dtype='float64')
+    tx = pd.DataFrame({'account': df['account'].astype(str).to_numpy(),
+                       'payee': merchant_names(df['description']).to_numpy(),
+                       'direction': np.where(amount < 0, 'debit', 'credit'),
+                       'amount': np.abs(amount).round(2),
+                       'date': pd.to_datetime(df['date']).dt.normalize().to_numpy()})
+    tx = tx[tx['amount'] > 0]
+    latest = tx.groupby('account')['date'].max()
+
+    found = []
+    fixed = _series(tx, amount_tolerance, change_tolerance, min_payments, min_regularity)
+    if fixed is not None:
+        found.append(fixed.assign(varying_amount=False))
+        matched = pd.MultiIndex.from_frame(fixed[['account', 'payee', 'direction']])
+        tx = tx[~pd.MultiIndex.from_frame(tx[['account', 'payee', 'direction']]).isin(matched)]
+    varying = _series(tx, np.inf, change_tolerance, min_payments, min_regularity)
+    if varying is not None:
+        found.append(varying.assign(varying_amount=True))
+    if not found:
+        return pd.DataFrame(columns=columns)
+    result = pd.concat(found, ignore_index=True)
+    result['next_date'] = _next_dates(result['last_date'], result['cadence'])
+
+    # Payments expected since the last one that have not come
+    end = pd.Series(pd.Timestamp(as_of), index=result.index) if as_of else result['account'].map(latest)
+    overdue = (end - result['next_date']).dt.days.to_numpy(dtype='float64')
+    trailing = np.where(overdue > result['slack'], np.floor(overdue / result['period']) + 1, 0)
+    result['missed'] = (result['missed'] + trailing).astype('int64')
+    result['status'] = np.select([trailing >= STOPPED_AFTER, trailing > 0], ['stopped', 'missed'], 'active')
+    result['amount'] = result['amount'].round(2)
+    return result[columns].sort_values(['account', 'direction', 'amount'], ascending=[True, False, False],
+                                       kind='stable').reset_index(drop=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Find recurring payments, subscriptions and their missed or changed payments.")
+    parser.add_argument("csv_paths", nargs="*", help="Transaction CSVs written by pdf_analyzer.py (globs allowed)")
+    parser.add_argument("--ledger-db", metavar="DB", default=None, help="Read transactions from the SQLite ledger")
+    parser.add_argument("--account", default=None,
+                        help="Account of the CSV rows, and the only ledger account read")
+    parser.add_argument("--sheets", nargs="+", default=[], metavar="SHEET",
+                        help="Also read expenditure sheet exports (globs allowed)")
+    parser.add_argument("--tolerance", type=float, default=AMOUNT_TOLERANCE,
+                        help="Relative amount variation within one series (default: %(default)s)")
+    parser.add_argument("--min-payments", type=int, default=MIN_PAYMENTS,
+                        help="Fewest payments in a series (default: %(default)s)")
+    parser.add_argument("--as-of", default=None, metavar="YYYY-MM-DD",
+                        help="Count missed payments up to this date (default: each account's latest transaction)")
+    parser.add_argument("--output", default=None, help="Also write the series to this CSV")
+    args = parser.parse_args()
+
+    df = load_transactions(args.csv_paths, args.ledger_db, args.account, args.sheets)
+    result = detect_recurring(df, amount_tolerance=args.tolerance, min_payments=args.min_payments, as_of=args.as_of)
+    print(f"Found {len(result)} recurring series in {len(df)} transactions")
+    if not result.empty:
+        print(result.to_string(index=False))
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        result.to_csv(args.output, index=False)
+        print(f"\nSeries written to {args.output}")
+
+if __name__ == "__main__":
+    main()
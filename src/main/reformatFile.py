@@ -1,27 +1,8 @@
 from docx import Document
-from docx.shared import Pt, Inches
-from docx.enum.text import WD_ALIGN_PARAGRAPH, WD_LINE_SPACING
-from docx.oxml.ns import qn
-from docx.oxml import OxmlElement
-
-def add_horizontal_line(paragraph):
-    p = paragraph._element
-    pPr = p.get_or_add_pPr()
-    pBdr = OxmlElement('w:pBdr')
-    bottom = OxmlElement('w:bottom')
-    bottom.set(qn('w:val'), 'single')
-    bottom.set(qn('w:sz'), '6')
-    bottom.set(qn('w:space'), '1')
-    bottom.set(qn('w:color'), '000000')
-    pBdr.append(bottom)
-    pPr.append(pBdr)
-
-def set_paragraph_format(paragraph, font_size=11, font_name='Calibri', indent=0, space_after=6):
-    paragraph.style.font.name = font_name
-    paragraph.style.font.size = Pt(font_size)
-    paragraph.paragraph_format.left_indent = Inches(indent)
-    paragraph.paragraph_format.space_after = Pt(space_after)
-    paragraph.paragraph_format.line_spacing_rule = WD_LINE_SPACING.SINGLE
+from docx.shared import Pt
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+
+from docx_format import add_horizontal_line, set_paragraph_format
 
 doc = Document()
 
@@ -0,0 +1,135 @@
+import os
+import json
+from pathlib import Path
+
+import pandas as pd
+
+# Per-category, per-month sums and counts of the expenditure sheets, kept up to
+# date sheet by sheet so summaries never rescan the sheets. Only aggregates are
+# stored: each sheet's own month totals, and their sum over all sheets.
+ROLLUP_PATH = Path(os.environ.get('EXPENSE_TRACKER_ROLLUPS', Path.home() / '.local' / 'share' / 'expense_tracker' / 'rollups.json'))
+ROLLUP_VERSION = 3
+
+# Pseudo-category holding the totals over all categories
+ALL = '*'
+UNCATEGORIZED = 'Uncategorized'
+
+def empty_store():
+    """
+    Return a new rollup store:
+        months - 'YYYY-MM' -> category -> [sum, count] over all sheets
+        sheets - resolved sheet path -> {'stamp', 'months'}, that sheet's share of months
+    """
+    return {'version': ROLLUP_VERSION, 'months': {}, 'sheets': {}}
+
+def load_rollups(path=ROLLUP_PATH):
+    """Return the rollup store at path, or an empty store."""
+    try:
+        with open(path, encoding='utf-8') as f:
+            store = json.load(f)
+    except (OSError, ValueError):
+        return empty_store()
+    if store.get('version') != ROLLUP_VERSION:
+        return empty_store()
+    return store
+
+def save_rollups(store, path=ROLLUP_PATH):
+    """Write the rollup store atomically."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(store, f)
+    os.replace(tmp_path, path)
+
+def _add(cells, category, amount, count):
+    total, n = cells.get(category, [0.0, 0])
+    total, n = round(total + amount, 2), n + count
+    if n == 0:
+        cells.pop(category, None)
+    else:
+        cells[category] = [total, n]
+
+def sheet_months(csv_path):
+    """
+    Aggregate one expenditure sheet by month and category.
+    Args:
+        csv_path (str): Zoho sheet export, read with analyse_spends.pandas_sheet_rows
+    Returns:
+        dict: 'YYYY-MM' -> category -> [sum, count], with the ALL pseudo-category
+    """
+    # analyse_spends imports this module, so its parser is imported on use
+    from analyse_spends import pandas_sheet_rows
+    rows = pandas_sheet_rows([csv_path])
+    totals = rows.groupby([rows['Date'].dt.strftime('%Y-%m').rename('month'), 'Category'])['Expenditure'] \
+        .agg(['sum', 'size'])
+    months = {}
+    for (month, category), total, count in totals.itertuples():
+        cells = months.setdefault(month, {})
+        for key in (category, ALL):
+            _add(cells, key, float(total), int(count))
+    return months
+
+def sync_sheet(store, csv_path):
+    """
+    Bring the rollups up to date with a sheet. An unchanged file is not even
+    read; a changed one is aggregated again and only the difference from its
+    previous totals is applied, so other sheets are never touched.
+    Args:
+        store (dict): Rollup store, updated in place
+        csv_path (str): Expenditure sheet export
+    Returns:
+        int: Number of month/category totals that changed
+    """
+    stat = os.stat(csv_path)
+    stamp = [stat.st_size, stat.st_mtime_ns]
+    key = str(Path(csv_path).resolve())
+    sheet = store['sheets'].get(key, {'stamp': None, 'months': {}})
+    if sheet['stamp'] == stamp:
+        return 0
+    old_months, new_months = sheet['months'], sheet_months(csv_path)
+    changed = 0
+    for month in sorted(set(old_months) | set(new_months)):
+        old_cells, new_cells = old_months.get(month, {}), new_months.get(month, {})
+        cells = store['months'].setdefault(month, {})
+        for category in set(old_cells) | set(new_cells):
+            old_total, old_count = old_cells.get(category, [0.0, 0])
+            new_total, new_count = new_cells.get(category, [0.0, 0])
+            if [old_total, old_count] == [new_total, new_count]:
+                continue
+            _add(cells, category, new_total - old_total, new_count - old_count)
+            changed += category != ALL
+        if not cells:
+            del store['months'][month]
+    store['sheets'][key] = {'stamp': stamp, 'months': new_months}
+    return changed
+
+def month_summary(store, month):
+    """
+    Totals for one month, read straight from the store.
+    Args:
+        store (dict): Rollup store
+        month (str): 'YYYY-MM'
+    Returns:
+        pandas.DataFrame: Category, Total, Count and Cumulative, the running
+            total from January of the same year up to and including the month
+    """
+    cells = store['months'].get(month, {})
+    cumulative = {}
+    for earlier in store['months']:
+        if earlier[:4] == month[:4] and earlier <= month:
+            for category, (total, _) in store['months'][earlier].items():
+                cumulative[category] = round(cumulative.get(category, 0.0) + total, 2)
+    return pd.DataFrame(
+        [[category, total, count, cumulative[category]] for category, (total, count) in sorted(cells.items())],
+        columns=['Category', 'Total', 'Count', 'Cumulative'],
+    )
+
+def category_totals(store):
+    """Overall expenditure per category, summed over the stored months."""
+    totals = {}
+    for cells in store['months'].values():
+        for category, (total, _) in cells.items():
+            if category != ALL:
+                totals[category] = round(totals.get(category, 0.0) + total, 2)
+    return dict(sorted(totals.items()))
@@ -0,0 +1,135 @@
+import sqlite3
+from pathlib import Path
+
+import pandas as pd
+
+# Local ledger of every extracted transaction. Overlapping statements (a monthly
+# PDF and the full-year one covering it) collapse onto the same rows through
+# the unique key, so re-ingesting never grows the ledger.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    id INTEGER PRIMARY KEY,
+    account TEXT NOT NULL,
+    value_date TEXT NOT NULL,
+    description TEXT,
+    normalized_description TEXT NOT NULL,
+    deposit REAL,
+    withdrawal REAL,
+    amount REAL NOT NULL,
+    balance REAL,
+    category TEXT,
+    source TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS transactions_key
+    ON transactions (account, value_date, amount, IFNULL(balance, ''), normalized_description);
+CREATE INDEX IF NOT EXISTS transactions_date ON transactions (value_date);
+CREATE INDEX IF NOT EXISTS transactions_category ON transactions (category, value_date);
+"""
+
+# On a key match only fill in what the stored row lacks
+UPSERT = """
+INSERT INTO transactions
+    (account, value_date, description, normalized_description, deposit, withdrawal, amount, balance, category, source)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (account, value_date, amount, IFNULL(balance, ''), normalized_description) DO UPDATE SET
+    category = COALESCE(transactions.category, excluded.category),
+    description = COALESCE(transactions.description, excluded.description)
+"""
+
+COLUMNS = ['account', 'value_date', 'description', 'deposit', 'withdrawal', 'amount', 'balance', 'category', 'source']
+
+def connect(db_path):
+    """Open the ledger database, creating the table and indexes on first use."""
+    Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+    # Batch workers write concurrently; wait for the lock instead of failing
+    conn = sqlite3.connect(db_path, timeout=60)
+    conn.executescript(SCHEMA)
+    return conn
+
+def normalize_descriptions(descriptions):
+    """Lowercased alphanumeric words of each description, so spacing and punctuation differences still match."""
+    text = pd.Series(descriptions, dtype=object).fillna('').astype(str).str.lower()
+    return text.str.replace(r'[^a-z0-9]+', ' ', regex=True).str.strip()
+
+def _nullable(values):
+    """float64 Series to a list with None for NaN, as sqlite3 expects."""
+    return [None if pd.isna(v) else float(v) for v in values]
+
+def ingest_transactions(db_path, df, account, source=None):
+    """
+    Upsert extracted transactions into the ledger in one transaction.
+    Args:
+        db_path (str): SQLite database file
+        df (pandas.DataFrame): Output of extract_bank_statement / extract_statement
+        account (str): Account the statement belongs to, part of the unique key
+        source (str): Statement the rows came from (kept from the first ingest)
+    Returns:
+        int: Number of new rows; 0 when the statement was already ingested
+    """
+    df = df.dropna(subset=['Value Date'])
+    deposit = pd.to_numeric(df['Deposit'], errors='coerce').astype('float64')
+    withdrawal = pd.to_numeric(df['Withdrawal'], errors='coerce').astype('float64')
+    balance = pd.to_numeric(df['Balance'], errors='coerce').astype('float64')
+    # Signed amount: deposits positive, withdrawals negative
+    amount = deposit.fillna(0.0) - withdrawal.fillna(0.0)
+    category = df['Category'] if 'Category' in df.columns else pd.Series(None, index=df.index, dtype=object)
+    descriptions = df['Description'].astype(object).where(df['Description'].notna(), None)
+    rows = zip(
+        [account] * len(df),
+        df['Value Date'].astype(str),
+        descriptions,
+        normalize_descriptions(df['Description']),
+        _nullable(deposit),
+        _nullable(withdrawal),
+        amount.round(2).tolist(),
+        _nullable(balance),
+        category.astype(object).where(category.notna(), None),
+        [source] * len(df),
+    )
+    with connect(db_path) as conn:
+        before = conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+        conn.executemany(UPSERT, rows)
+        after = conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+    conn.close()
+    return after - before
+
+def _where(start=None, end=None, category=None, account=None):
+    """WHERE clause and parameters for the date range / category / account filters."""
+    clauses, params = [], []
+    for clause, value in (("value_date >= ?", start), ("value_date <= ?", end),
+                          ("category = ?", category), ("account = ?", account)):
+        if value is not None:
+            clauses.append(clause)
+            params.append(str(value))
+    return (f" WHERE {' AND '.join(clauses)}" if clauses else ""), params
+
+def query_transactions(db_path, start=None, end=None, category=None, account=None):
+    """
+    Look up ledger transactions by value date range, category and account.
+    Args:
+        db_path (str): SQLite database file
+        start (str): First value date, 'YYYY-MM-DD'
+        end (str): Last value date, 'YYYY-MM-DD'
+        category (str): Only this category
+        account (str): Only this account
+    Returns:
+        pandas.DataFrame: Matching transactions ordered by value date
+    """
+    where, params = _where(start, end, category, account)
+    conn = connect(db_path)
+    try:
+        return pd.read_sql_query(f"SELECT {', '.join(COLUMNS)} FROM transactions{where} ORDER BY value_date, id",
+                                 conn, params=params)
+    finally:
+        conn.close()
+
+def category_totals(db_path, start=None, end=None, account=None):
+    """Total withdrawals and deposits per category over a value date range."""
+    where, params = _where(start, end, account=account)
+    conn = connect(db_path)
+    try:
+        return pd.read_sql_query(
+            f"SELECT category, SUM(withdrawal) AS withdrawals, SUM(deposit) AS deposits, COUNT(*) AS transactions "
+            f"FROM transactions{where} GROUP BY category ORDER BY category", conn, params=params)
+    finally:
+        conn.close()
@@ -0,0 +1,125 @@
+import re
+from functools import lru_cache
+
+import pandas as pd
+
+# Per-bank description rules. Each rule set lists the page furniture that
+# tabula mixes into the description column:
+#   header_labels   - labels of the account details block at the top of a page
+#   branch_address  - the home branch address printed under the labels
+#   contact_numbers - branch pin/phone numbers that show up on their own
+#   noise_words     - looser words marking a description-only row as furniture
+#   header_phrases  - extra phrases that always mark a row as a header row
+#   block_end       - regex ending a details block (removed label..block_end)
+#   strip_phrases   - phrases removed from descriptions wherever they appear
+#   start_labels    - labels printed before the first day the statement covers
+#   end_labels      - labels printed before the statement's closing date; with
+#                     the start date these give the year of dates like 'Jan 05'
+SCB_RULES = {
+    'header_labels': ['STATEMENT DATE', 'CURRENCY', 'ACCOUNT TYPE', 'ACCOUNT NO', 'NOMINEE REGISTERED',
+                      'BRANCH ADDRESS', 'IFSC', 'MICR CODE'],
+    'branch_address': ['ABR Complex', 'EPIP Zone', 'Whitefield', 'Bengaluru', 'Karnataka', '560066'],
+    'contact_numbers': ['560036004', '9036002402'],
+    'noise_words': ['CURRENCY', 'ACCOUNT', 'BRANCH', 'Date', 'STATEMENT', 'NOMINEE', 'ADDRESS', 'IFSC', 'MICR',
+                    'Phone', 'Brought Forward'],
+    'header_phrases': ['Phone No', 'Balance Brought Forward'],
+    'block_end': r'Phone No\.: \d+',
+    'strip_phrases': ['Balance Brought Forward', 'Date   Value Description Date'],
+    'start_labels': [],
+    'end_labels': ['STATEMENT DATE'],
+}
+
+SBI_RULES = {
+    'header_labels': ['Account Name', 'Account Number', 'Account Description', 'CIF No', 'IFS (Indian Financial System) Code',
+                      'MICR (Magnetic Ink Character Recognition)', 'Nomination Registered', 'Start Date', 'End Date'],
+    'branch_address': [],
+    'contact_numbers': [],
+    'noise_words': ['Account', 'Branch', 'Address', 'Drawing Power', 'Interest Rate', 'MOD Balance', 'CKYCR'],
+    'header_phrases': ['Balance on', 'Txn Date'],
+    'block_end': None,
+    'strip_phrases': ['Txn Date', 'Value Date'],
+    'start_labels': ['Start Date'],
+    'end_labels': ['End Date'],
+}
+
+BANK_RULES = {
+    'SCB': SCB_RULES,
+    'SBI': SBI_RULES,
+}
+
+DEFAULT_BANK = 'SCB'
+
+def _alternation(words):
+    """Escape literal words and join them into one alternation."""
+    return '|'.join(re.escape(word) for word in words)
+
+def compile_rules(rules):
+    """
+    Compile a rule set into the combined patterns used for filtering and cleaning.
+    Args:
+        rules (dict): Rule set shaped like SCB_RULES
+    Returns:
+        dict: Compiled 'noise', 'header' and 'cleanup' patterns, and 'start'/'end'
+            patterns capturing the text after a statement date label
+    """
+    flags = re.IGNORECASE | re.DOTALL
+    labels = rules['header_labels'] + rules['branch_address']
+    noise = rules['noise_words'] + rules['branch_address'] + rules['contact_numbers']
+    header = labels + rules['header_phrases']
+    # One alternation replaces the chain of re.sub calls: a details block runs
+    # from the first label to the next block_end, then stray fragments go too.
+    cleanup = []
+    if rules.get('block_end'):
+        if labels:
+            cleanup.append(f"(?:{_alternation(labels)}).*?{rules['block_end']}")
+        cleanup.append(rules['block_end'])
+    if rules['strip_phrases']:
+        cleanup.append(_alternation(rules['strip_phrases']))
+    return {
+        'noise': re.compile(_alternation(noise), flags) if noise else None,
+        'header': re.compile(_alternation(header), flags) if header else None,
+        'cleanup': re.compile('|'.join(cleanup), flags) if cleanup else None,
+        'start': _label_value(rules.get('start_labels'), flags),
+        'end': _label_value(rules.get('end_labels'), flags),
+    }
+
+def _label_value(labels, flags):
+    """Pattern capturing the short value printed after any of the labels."""
+    if not labels:
+        return None
+    return re.compile(rf"(?:{_alternation(labels)})\s*:?\s*(.{{1,24}})", flags)
+
+@lru_cache(maxsize=None)
+def bank_rules(bank=DEFAULT_BANK):
+    """Return the compiled rule set for a bank registered in BANK_RULES."""
+    if bank not in BANK_RULES:
+        raise ValueError(f"No description rules for bank '{bank}'. Known banks: {', '.join(BANK_RULES)}")
+    return compile_rules(BANK_RULES[bank])
+
+def contains(text, pattern):
+    """Vectorized pattern search over a Series of strings; False when there is no pattern."""
+    if pattern is None:
+        return pd.Series(False, index=text.index)
+    return text.str.contains(pattern, na=False)
+
+def clean_descriptions(descriptions, rules=None):
+    """
+    Remove account information and header text from a whole column of descriptions.
+    Args:
+        descriptions (pandas.Series): Raw descriptions
+        rules (dict): Compiled rule set (default: bank_rules())
+    Returns:
+        pandas.Series: Cleaned descriptions, None where nothing is left
+    """
+    rules = rules or bank_rules()
+    descriptions = pd.Series(descriptions, dtype=object)
+    present = descriptions.notna()
+    text = descriptions[present].astype(str).str.strip()
+    if rules['cleanup'] is not None:
+        text = text.str.replace(rules['cleanup'], '', regex=True)
+    # Clean up extra whitespace
+    text = text.str.replace(r'\s+', ' ', regex=True).str.strip()
+    text = text[text != '']
+    cleaned = pd.Series([None] * len(descriptions), index=descriptions.index, dtype=object)
+    cleaned[text.index] = text.astype(object)
+    return cleaned
@@ -0,0 +1,244 @@
+import random
+import argparse
+from pathlib import Path
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+# Synthetic statements for benchmarks and for sharing reproducible inputs:
+# no real account data, any size, with the year rollovers, page furniture and
+# continuation lines the extraction has to cope with.
+
+MONTHS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+MERCHANTS = ['DMART', 'SWIGGY', 'ZOMATO', 'RAPIDO', 'UBER', 'BIGBASKET', 'AIRTEL', 'IRCTC', 'MYNTRA', 'ZEPTO',
+             'CAFE COFFEE DAY', 'APOLLO PHARMACY', 'SHELL FUEL', 'BOOKMYSHOW']
+
+# SCB page furniture, as tabula puts it into the description column
+SCB_NOISE = [
+    'STATEMENT DATE :31 Jan 2024', 'CURRENCY :INR', 'ACCOUNT TYPE :SAVINGS', 'ACCOUNT NO :52710000000',
+    'BRANCH ADDRESS: ABR Complex EPIP Zone', 'Whitefield Bengaluru 560066',
+    'IFSC: SCBL0036089 MICR CODE: 560036004 Phone No.: 9036002402', 'Balance Brought Forward',
+    'Date   Value Description Date',
+]
+SCB_COLUMNS = ['Date   Value Description', 'Cheque Deposit', 'Withdrawal', 'Balance']
+
+SBI_PREAMBLE = [
+    'Account Name       :\tSynthetic Account',
+    'Address            :\t1, Example Road,',
+    'Account Number     :\t_00000012345678901',
+    'Account Description:\tSAVING BANK',
+    'Branch             :\tEXAMPLE',
+    'IFS (Indian Financial System) Code         :\tSBIN0000001',
+]
+
+def generate_transactions(count, start=date(2023, 11, 1), seed=0, opening_balance=50000.0, span_days=365):
+    """
+    Generate a running-balance transaction history.
+    Args:
+        count (int): Number of transactions
+        start (datetime.date): First value date; the default crosses a year end early
+        seed (int): Random seed, the same seed gives the same statement
+        opening_balance (float): Balance before the first transaction
+        span_days (int): Most days covered; larger counts get more transactions per
+            day, as a statement covers at most a year
+    Returns:
+        list[dict]: date, description, deposit, withdrawal and balance per transaction
+    """
+    rnd = random.Random(seed)
+    day = start
+    balance = opening_balance
+    transactions = []
+    # Steps average 2/3 of a day; skip some of them for long statements
+    advance = min(1.0, span_days / (count * 2 / 3)) if count else 1.0
+    for _ in range(count):
+        step = rnd.choice([0, 0, 0, 1, 1, 2])
+        if advance < 1.0 and rnd.random() >= advance:
+            step = 0
+        day += timedelta(days=step)
+        merchant = rnd.choice(MERCHANTS)
+        style = rnd.random()
+        deposit = withdrawal = None
+        if style < 0.08:
+            description, deposit = 'NEFT CRED SALARY ACME CORP', round(rnd.uniform(40000, 90000), 2)
+        elif style < 0.25:
+            description = f"UPI/{rnd.randrange(10 ** 11, 10 ** 12)}/FRIEND {rnd.randrange(20)}/friend{rnd.randrange(20)}@okaxis/UPI"
+            deposit = round(rnd.uniform(50, 5000), 2)
+        elif style < 0.35:
+            description, withdrawal = f"ATM WDL ATM CASH {rnd.randrange(1000, 9999)}", float(rnd.choice([500, 2000, 5000]))
+        elif style < 0.5:
+            description, withdrawal = f"POS PURCHASE {merchant}", round(rnd.uniform(50, 8000), 2)
+        else:
+            description = f"UPI/{rnd.randrange(10 ** 11, 10 ** 12)}/{merchant}/{merchant.lower().replace(' ', '')}@ybl/Payment"
+            withdrawal = round(rnd.uniform(20, 3000), 2)
+        balance = round(balance + (deposit or 0.0) - (withdrawal or 0.0), 2)
+        transactions.append({'date': day, 'description': description, 'deposit': deposit,
+                             'withdrawal': withdrawal, 'balance': balance})
+    return transactions
+
+def _statement_date(transactions):
+    """Header line with the closing date, which the extraction takes the years from."""
+    last = transactions[-1]['date'] if transactions else date.today()
+    return f"STATEMENT DATE :{last.day:02d} {MONTHS[last.month - 1]} {last.year}"
+
+def _amount(value):
+    return np.nan if value is None else f"{value:,.2f}"
+
+def scb_tables(transactions, rows_per_page=25, noise=0.1, seed=0):
+    """
+    Lay transactions out the way tabula returns an SCB statement: one table per
+    page, 'Mon DD' dates inside the description column, the statement date
+    first, header and branch address rows mixed in, and long UPI descriptions wrapped onto a second row.
+    Args:
+        transactions (list[dict]): Output of generate_transactions
+        rows_per_page (int): Table rows per page
+        noise (float): Share of rows that are page furniture
+        seed (int): Random seed for the furniture and wrapping
+    Returns:
+        list[pandas.DataFrame]: One string table per page
+    """
+    rnd = random.Random(seed)
+    rows = [[_statement_date(transactions), np.nan, np.nan, np.nan]]
+    for txn in transactions:
+        while rnd.random() < noise:
+            rows.append([rnd.choice(SCB_NOISE), np.nan, np.nan, np.nan])
+        day = f"{MONTHS[txn['date'].month - 1]} {txn['date'].day:02d}"
+        description = txn['description']
+        wrapped = None
+        if len(description) > 40 and rnd.random() < 0.5:
+            description, wrapped = description[:40], description[40:]
+        rows.append([f"{day} {day} {description}", _amount(txn['deposit']), _amount(txn['withdrawal']),
+                     _amount(txn['balance'])])
+        if wrapped:
+            rows.append([wrapped, np.nan, np.nan, np.nan])
+    return [pd.DataFrame(rows[i:i + rows_per_page], columns=SCB_COLUMNS, dtype=str)
+            for i in range(0, len(rows), rows_per_page)]
+
+def _pdf_text(text):
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+def _pdf_page(lines):
+    """Content stream drawing (x, y, text) lines in 8pt Helvetica."""
+    ops = ['BT', '/F1 8 Tf']
+    for x, y, text in lines:
+        ops.append(f"1 0 0 1 {x:.1f} {y:.1f} Tm ({_pdf_text(text)}) Tj")
+    ops.append('ET')
+    return '\n'.join(ops).encode('latin-1', 'replace')
+
+def _write_pdf(path, pages):
+    """Write a minimal PDF with one content stream per page."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None,
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"]
+    kids = []
+    for content in pages:
+        objects.append(b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % len(objects))
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>".encode()
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b''.join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    Path(path).write_bytes(bytes(out))
+
+def write_scb_pdf(path, transactions, rows_per_page=40, password=None):
+    """
+    Write transactions as an SCB-style PDF statement that tabula can read.
+    Args:
+        path (str): Output PDF path
+        transactions (list[dict]): Output of generate_transactions
+        rows_per_page (int): Transactions per page
+        password (str): Encrypt the PDF with this password, like real statements
+    """
+    columns = [(30, 'Date'), (70, 'Value Date'), (120, 'Description'), (360, 'Cheque Deposit'),
+               (430, 'Withdrawal'), (510, 'Balance')]
+    pages = []
+    for start in range(0, len(transactions), rows_per_page):
+        lines = []
+        top = 800
+        if start == 0:
+            for i, text in enumerate([_statement_date(transactions)] + SCB_NOISE[1:7]):
+                lines.append((30, top - 12 * i, text))
+            top -= 12 * 8
+        lines.extend((x, top, label) for x, label in columns)
+        for i, txn in enumerate(transactions[start:start + rows_per_page], 1):
+            y = top - 16 * i
+            day = f"{MONTHS[txn['date'].month - 1]} {txn['date'].day:02d}"
+            lines.extend([(30, y, day), (70, y, day), (120, y, txn['description'][:48])])
+            for x, value in ((360, txn['deposit']), (430, txn['withdrawal']), (510, txn['balance'])):
+                if value is not None:
+                    lines.append((x, y, f"{value:,.2f}"))
+        pages.append(_pdf_page(lines))
+    _write_pdf(path, pages)
+    if password:
+        from PyPDF2 import PdfReader, PdfWriter
+        writer = PdfWriter()
+        for page in PdfReader(path).pages:
+            writer.add_page(page)
+        writer.encrypt(password)
+        with open(path, 'wb') as f:
+            writer.write(f)
+
+def sbi_frame(transactions, long_dates=False):
+    """
+    Transactions in SBI export columns, with the padded Debit header and comma
+    amounts; dates as '05-Mar-24' (CSV) or '5 Mar 2024' (long_dates, .xls).
+    """
+    if long_dates:
+        dates = [f"{txn['date'].day} {MONTHS[txn['date'].month - 1]} {txn['date'].year}" for txn in transactions]
+    else:
+        dates = [txn['date'].strftime('%d-%b-%y') for txn in transactions]
+    return pd.DataFrame({
+        'Value Date': dates,
+        'Description': [f"   {'BY' if txn['deposit'] else 'TO'} TRANSFER-{txn['description']}--" for txn in transactions],
+        'Ref No./Cheque No.': '',
+        '        Debit': [' ' if txn['withdrawal'] is None else f"{txn['withdrawal']:,.2f}" for txn in transactions],
+        'Credit': [' ' if txn['deposit'] is None else f"{txn['deposit']:,.2f}" for txn in transactions],
+        'Balance': [f"{txn['balance']:,.2f}" for txn in transactions],
+    })
+
+def write_sbi_csv(path, transactions):
+    """Write transactions as an SBI CSV export (BOM, DD-Mon-YY dates, quoted amounts)."""
+    sbi_frame(transactions).to_csv(path, index=False, encoding='utf-8-sig')
+
+def write_sbi_xls(path, transactions):
+    """Write transactions as SBI's tab-separated .xls export, account details first."""
+    df = sbi_frame(transactions, long_dates=True)
+    df.insert(0, 'Txn Date', df['Value Date'])
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        f.write('\n'.join(SBI_PREAMBLE) + '\n')
+        df.to_csv(f, sep='\t', index=False)
+        f.write('\n**This is a computer generated statement and does not require a signature\n')
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic bank statements.")
+    parser.add_argument("output_dir", help="Directory for the generated statements")
+    parser.add_argument("--bank", choices=['SCB', 'SBI'], default='SCB')
+    parser.add_argument("--transactions", type=int, default=500, help="Number of transactions")
+    parser.add_argument("--rows-per-page", type=int, default=40, help="Transactions per PDF page (SCB)")
+    parser.add_argument("--password", default=None, help="Encrypt the SCB PDF with this password")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    transactions = generate_transactions(args.transactions, seed=args.seed)
+    name = f"synthetic_{args.bank}_{args.transactions}"
+    if args.bank == 'SCB':
+        path = output_dir / f"{name}.pdf"
+        write_scb_pdf(path, transactions, args.rows_per_page, args.password)
+        print(f"Wrote {path}")
+    else:
+        write_sbi_csv(output_dir / f"{name}.csv", transactions)
+        write_sbi_xls(output_dir / f"{name}.xls", transactions)
+        print(f"Wrote {output_dir / name}.csv and .xls")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+import os
+import json
+import time
+import shutil
+from pathlib import Path
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from batch_analyzer import _process_statement, find_statements, load_passwords, password_for
+from extraction_cache import file_digest
+from pdf_analyzer import warm_tabula
+
+# Long-running ingest of a drop folder. Every poll lists the folder, skips files
+# whose size and mtime match the checkpoint, and hashes the rest so a re-saved
+# or renamed copy of a finished statement is not extracted again. The
+# checkpoint is rewritten after every statement, so a restart resumes where
+# the previous run stopped.
+WATCH_STATE_VERSION = 1
+QUARANTINE_DIR = 'quarantine'
+FINISHED = ('done', 'duplicate', 'quarantined')
+
+def checkpoint_path(folder):
+    """Default checkpoint file of a watched folder."""
+    return Path(folder) / '.watch_checkpoint.json'
+
+def empty_checkpoint():
+    """
+    Return a new checkpoint:
+        files   - file name -> {'size', 'mtime_ns', 'sha256', 'status', 'attempts', ...}
+        digests - sha256 -> file name of every statement already extracted
+    """
+    return {'version': WATCH_STATE_VERSION, 'files': {}, 'digests': {}}
+
+def load_checkpoint(path):
+    """Return the checkpoint at path, or an empty one."""
+    try:
+        with open(path, encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return empty_checkpoint()
+    if state.get('version') != WATCH_STATE_VERSION:
+        return empty_checkpoint()
+    return state
+
+def save_checkpoint(state, path):
+    """Write the checkpoint atomically."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=1)
+    os.replace(tmp_path, path)
+
+def _stamp(path):
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+def pending_statements(folder, state, last_seen, now):
+    """
+    List the statements in folder that need extracting.
+    A file is pending when its size or mtime differ from the checkpoint, it is
+    not waiting out a retry delay, and its stamp was the same on the previous
+    poll, so files still being copied in are left alone.
+    Args:
+        folder (str): Watched folder
+        state (dict): Checkpoint, see empty_checkpoint
+        last_seen (dict): File name -> stamp from the previous poll; updated in place
+        now (float): Current time.time()
+    Returns:
+        list[str]: Pending statement paths, oldest first
+    """
+    pending = []
+    seen = {}
+    for path in find_statements(str(folder)):
+        name = Path(path).name
+        try:
+            stamp = _stamp(path)
+        except OSError:
+            continue
+        seen[name] = stamp
+        entry = state['files'].get(name)
+        if entry and (entry['size'], entry['mtime_ns']) == stamp:
+            # 'queued' entries were interrupted by a stop and run again
+            if entry['status'] in FINISHED or entry.get('retry_at', 0) > now:
+                continue
+        if last_seen.get(name) != stamp:
+            continue
+        pending.append((stamp[1], path))
+    last_seen.clear()
+    last_seen.update(seen)
+    return [path for _, path in sorted(pending)]
+
+def _record_failure(state, name, entry, folder, max_attempts, retry_delay):
+    """Count a failed attempt; schedule a retry, or quarantine the file once attempts run out."""
+    entry['attempts'] = entry.get('attempts', 0) + 1
+    if entry['attempts'] < max_attempts:
+        entry['status'] = 'failed'
+        # Back off exponentially between attempts
+        entry['retry_at'] = time.time() + retry_delay * 2 ** (entry['attempts'] - 1)
+        print(f"  {name}: attempt {entry['attempts']} of {max_attempts} failed, retrying later")
+        return
+    quarantine = Path(folder) / QUARANTINE_DIR
+    quarantine.mkdir(exist_ok=True)
+    try:
+        shutil.move(str(Path(folder) / name), str(quarantine / name))
+    except OSError as e:
+        print(f"  {name}: could not move to quarantine: {str(e)}")
+    entry['status'] = 'quarantined'
+    entry.pop('retry_at', None)
+    print(f"  {name}: failed {entry['attempts']} times, moved to {quarantine}")
+
+def watch_folder(folder, password_spec, workers=None, queue_size=None, poll_interval=10.0, max_attempts=3,
+                 retry_delay=60.0, checkpoint=None, parquet_dir=None, ledger_db=None, account=None,
+                 once=False, extractor=_process_statement, **extract_options):
+    """
+    Watch a folder and extract every new or changed statement with a pool of
+    worker processes. At most queue_size statements are queued or running at a
+    time; the rest stay on disk until a slot frees up, so a large drop of
+    files does not pile up in memory.
+    Args:
+        folder (str): Folder statements arrive in
+        password_spec (str): JSON password map or a single password
+        workers (int): Number of worker processes (default: CPU count)
+        queue_size (int): Statements queued or in flight at once (default: 2 per worker)
+        poll_interval (float): Seconds between folder scans
+        max_attempts (int): Failed extractions before a file is moved to quarantine/
+        retry_delay (float): Seconds before the first retry; doubled for each further attempt
+        checkpoint (str): Checkpoint file (default: .watch_checkpoint.json in folder)
+        parquet_dir (str): Also append every statement to this Parquet ledger
+        ledger_db (str): Also upsert every statement into this SQLite ledger
+        account (str): Account name in the SQLite ledger (default: each statement's bank)
+        once (bool): Stop once nothing is pending or running instead of polling forever
+        extractor (callable): Worker task called as extractor(path, password, outputs,
+            extract_options) and returning a result like batch_analyzer.run_batch's;
+            it runs in the worker processes, so it must be a module-level function
+        **extract_options: Keyword arguments passed to extract_statement
+    Returns:
+        dict: The final checkpoint
+    """
+    folder = Path(folder)
+    checkpoint = Path(checkpoint) if checkpoint else checkpoint_path(folder)
+    state = load_checkpoint(checkpoint)
+    passwords = load_passwords(password_spec)
+    outputs = {'parquet_dir': parquet_dir, 'ledger_db': ledger_db, 'account': account}
+    workers = workers or os.cpu_count() or 1
+    queue_size = max(queue_size or 2 * workers, 1)
+    last_seen = {}
+    in_flight = {}
+    print(f"\nWatching {folder} with {workers} workers (checkpoint: {checkpoint}). Press Ctrl+C to stop.")
+    with ProcessPoolExecutor(max_workers=workers, initializer=warm_tabula) as pool:
+        try:
+            while True:
+                busy = {Path(path).name for path in in_flight.values()}
+                for path in pending_statements(folder, state, last_seen, time.time()):
+                    if len(in_flight) >= queue_size:
+                        break
+                    name = Path(path).name
+                    if name in busy:
+                        continue
+                    size, mtime_ns = _stamp(path)
+                    digest = file_digest(path)
+                    entry = state['files'].setdefault(name, {})
+                    if entry.get('sha256') != digest:
+                        entry['attempts'] = 0
+                    entry.update({'size': size, 'mtime_ns': mtime_ns, 'sha256': digest})
+                    done_as = state['digests'].get(digest)
+                    if done_as is not None:
+                        # Touched but unchanged, or a copy of a finished statement
+                        if done_as == name:
+                            entry['status'] = 'done'
+                        else:
+                            entry.update({'status': 'duplicate', 'duplicate_of': done_as})
+                            print(f"  {name}: same content as {done_as}, skipped")
+                        save_checkpoint(state, checkpoint)
+                        continue
+                    entry['status'] = 'queued'
+                    future = pool.submit(extractor, path, password_for(path, passwords), outputs,
+                                         extract_options)
+                    in_flight[future] = path
+                if once and not in_flight and not pending_statements(folder, state, dict(last_seen), time.time()):
+                    break
+                if not in_flight:
+                    time.sleep(poll_interval)
+                    continue
+                done, _ = wait(in_flight, timeout=poll_interval, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path = in_flight.pop(future)
+                    name = Path(path).name
+                    entry = state['files'][name]
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        print(f"Error processing {path}: {str(e)}")
+                        result = {'output': None}
+                    if result['output']:
+                        entry.update({'status': 'done', 'output': result['output'],
+                                      'transactions': result['transactions'],
+                                      'finished': datetime.now().isoformat(timespec='seconds')})
+                        entry.pop('retry_at', None)
+                        state['digests'][entry['sha256']] = name
+                        print(f"  {name}: {result['transactions']} transactions -> {result['output']}")
+                    else:
+                        _record_failure(state, name, entry, folder, max_attempts, retry_delay)
+                    save_checkpoint(state, checkpoint)
+        except KeyboardInterrupt:
+            print("\nStopping; queued statements are picked up again on the next start.")
+            for future in in_flight:
+                future.cancel()
+    return state
@@ -0,0 +1,35 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from analyse_spends import check_parity, pandas_sheet_rows, sheet_paths, start_spark, summarise
+
+SHEETS = [str(Path(__file__).resolve().parents[1] / 'resources' / 'monthly_data' / '*.csv')]
+
+@pytest.fixture(scope='module')
+def spark():
+    pytest.importorskip('pyspark')
+    spark = start_spark('local[1]')
+    yield spark
+    spark.stop()
+
+def test_pandas_totals_add_up_to_the_sheet():
+    rows = pandas_sheet_rows(sheet_paths(SHEETS))
+    totals = summarise(SHEETS, engine='pandas')
+    assert totals['Transactions'].sum() == len(rows)
+    assert totals['Total_Expenditure'].sum() == pytest.approx(rows['Expenditure'].sum(), abs=0.01)
+    by_month = summarise(SHEETS, engine='pandas', by_month=True)
+    assert by_month['Total_Expenditure'].sum() == pytest.approx(totals['Total_Expenditure'].sum(), abs=0.01)
+
+@pytest.mark.parametrize('by_month', [False, True])
+def test_pandas_matches_spark_on_the_sample_sheets(spark, by_month):
+    expected = summarise(SHEETS, engine='spark', spark=spark, by_month=by_month)
+    actual = summarise(SHEETS, engine='pandas', by_month=by_month)
+    assert len(actual) > 0
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+
+def test_check_parity_reuses_the_session(spark):
+    assert check_parity(SHEETS, year=2025, spark=spark)
+    # The shared session must still be usable
+    assert spark.range(3).count() == 3
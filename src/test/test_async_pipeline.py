@@ -0,0 +1,34 @@
+import pandas as pd
+
+import async_pipeline
+import batch_analyzer
+from async_pipeline import run_pipeline
+from batch_analyzer import run_batch
+from synthetic_statements import generate_transactions, write_sbi_csv, write_sbi_xls
+
+def _write_exports(directory):
+    directory.mkdir()
+    write_sbi_csv(directory / 'jan.csv', generate_transactions(40, seed=1))
+    write_sbi_xls(directory / 'feb.xls', generate_transactions(60, seed=2))
+    write_sbi_csv(directory / 'mar.csv', generate_transactions(25, seed=3))
+
+def _outputs(results):
+    return {r['pdf'].rsplit('/', 1)[-1]: pd.read_csv(r['output']) for r in results}
+
+def test_pipeline_matches_run_batch(tmp_path, monkeypatch):
+    # Exports never reach tabula; don't start a JVM in the workers
+    monkeypatch.setattr(batch_analyzer, 'warm_tabula', lambda: None)
+    monkeypatch.setattr(async_pipeline, 'warm_tabula', lambda: None)
+    _write_exports(tmp_path / 'batch')
+    _write_exports(tmp_path / 'pipeline')
+    batch = run_batch(str(tmp_path / 'batch'), 'unused', workers=2, categories='')
+    pipeline, stats = run_pipeline(str(tmp_path / 'pipeline'), 'unused', extract_workers=2, clean_workers=2,
+                                   categories='')
+    assert all(r['output'] for r in batch + pipeline)
+    assert [r['transactions'] for r in pipeline] == [r['transactions'] for r in batch]
+    expected, actual = _outputs(batch), _outputs(pipeline)
+    assert sorted(actual) == ['feb.xls', 'jan.csv', 'mar.csv']
+    for name in expected:
+        assert 'Category' in actual[name]
+        pd.testing.assert_frame_equal(actual[name], expected[name])
+    assert all(entry['items'] == 3 and entry['failed'] == 0 for entry in stats['stages'].values())
@@ -0,0 +1,70 @@
+import json
+import os
+
+import pandas as pd
+
+import batch_analyzer
+from batch_analyzer import find_statements, load_passwords, password_for, run_batch
+from pdf_analyzer import output_csv_path
+from synthetic_statements import generate_transactions, write_sbi_csv, write_sbi_xls
+
+def test_exports_of_one_stem_write_separate_files(tmp_path, monkeypatch):
+    # Exports never reach tabula; don't start a JVM in the workers
+    monkeypatch.setattr(batch_analyzer, 'warm_tabula', lambda: None)
+    write_sbi_csv(tmp_path / 'statement.csv', generate_transactions(40, seed=1))
+    write_sbi_xls(tmp_path / 'statement.xls', generate_transactions(60, seed=2))
+    assert len(find_statements(str(tmp_path))) == 2
+    results = run_batch(str(tmp_path), 'unused', workers=2)
+    outputs = {r['pdf']: r['output'] for r in results}
+    assert len(set(outputs.values())) == 2
+    for path, count in (('statement.csv', 40), ('statement.xls', 60)):
+        assert len(pd.read_csv(outputs[str(tmp_path / path)])) == count
+
+def test_output_names(tmp_path):
+    assert output_csv_path(tmp_path / 'jan.pdf') == tmp_path / 'jan.csv'
+    write_sbi_csv(tmp_path / 'jan.csv', generate_transactions(5))
+    assert output_csv_path(tmp_path / 'jan.pdf') == tmp_path / 'jan_transactions.csv'
+    assert output_csv_path(tmp_path / 'jan.csv') == tmp_path / 'jan_csv_transactions.csv'
+    assert output_csv_path(tmp_path / 'jan.xls') == tmp_path / 'jan_xls_transactions.csv'
+    assert output_csv_path(tmp_path / 'feb.xls') == tmp_path / 'feb.csv'
+
+def test_password_map(tmp_path):
+    assert load_passwords('hunter2') == {'*': 'hunter2'}
+    spec = tmp_path / 'passwords.json'
+    spec.write_text(json.dumps({'SCB Acct Statement 2.pdf': 'exact', 'SCB*.pdf': 'scb', '*': 'other'}))
+    passwords = load_passwords(str(spec))
+    assert password_for('/x/SCB Acct Statement 2.pdf', passwords) == 'exact'
+    assert password_for('/x/SCB Acct Statement 3.pdf', passwords) == 'scb'
+    assert password_for('/x/sbi.csv', passwords) == 'other'
+    assert password_for('/x/sbi.csv', {'*.pdf': 'pdf'}) is None
+
+def test_exports_with_a_pdf_twin_are_skipped(tmp_path):
+    (tmp_path / 'jan.pdf').write_bytes(b'%PDF-1.4')
+    write_sbi_csv(tmp_path / 'jan.csv', generate_transactions(5, seed=1))
+    write_sbi_csv(tmp_path / 'feb.csv', generate_transactions(5, seed=2))
+    (tmp_path / 'notes.txt').write_text('not a statement')
+    expected = [str(tmp_path / 'feb.csv'), str(tmp_path / 'jan.pdf')]
+    assert find_statements(str(tmp_path)) == expected
+    assert find_statements(str(tmp_path / '*.pdf')) == expected[1:]
+
+def test_each_worker_warms_tabula_once(tmp_path, monkeypatch):
+    statements = tmp_path / 'statements'
+    statements.mkdir()
+    for n in range(6):
+        (statements / f'{n}.pdf').write_bytes(b'%PDF-1.4')
+    warmups = tmp_path / 'warmups'
+    warmups.mkdir()
+    # Workers are forked after these patches, so they see them too
+    def warm_tabula():
+        with open(warmups / str(os.getpid()), 'a') as f:
+            f.write('.')
+    def extract_and_save(pdf_path, password, outputs, extract_options):
+        return {'pdf': pdf_path, 'output': pdf_path, 'transactions': 1, 'password': password, 'pid': os.getpid()}
+    monkeypatch.setattr(batch_analyzer, 'warm_tabula', warm_tabula)
+    monkeypatch.setattr(batch_analyzer, '_extract_and_save', extract_and_save)
+    results = run_batch(str(statements), 'secret', workers=2)
+    assert [r['password'] for r in results] == ['secret'] * 6
+    warmed = {p.name for p in warmups.iterdir()}
+    assert {str(r['pid']) for r in results} <= warmed
+    assert len(warmed) <= 2
+    assert all(p.read_text() == '.' for p in warmups.iterdir())
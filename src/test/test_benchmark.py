@@ -0,0 +1,30 @@
+import json
+
+import pandas as pd
+
+import benchmark
+from benchmark import benchmark_size, compare_results, record_results
+
+def test_times_every_stage_without_java(capsys):
+    results = benchmark_size(60, repeat=1, with_pdf=False)
+    assert [r['benchmark'] for r in results] == ['clean_description', 'clean_amount', 'clean_date', 'parse_dates',
+                                                 'tables_to_transactions', 'csv_write']
+    assert all(r['size'] == 60 and r['rows'] > 0 and r['seconds'] >= 0 for r in results)
+    assert 'us/row' in capsys.readouterr().out
+
+def test_compares_the_latest_two_commits(tmp_path, monkeypatch):
+    results_path = tmp_path / 'results.jsonl'
+    for commit, seconds in (('aaa1111', 0.2), ('bbb2222', 0.1)):
+        monkeypatch.setattr(benchmark, 'git_commit', lambda: commit)
+        record_results([{'benchmark': 'clean_date', 'size': 250, 'rows': 250, 'seconds': seconds}], results_path)
+    lines = [json.loads(line) for line in results_path.read_text().splitlines()]
+    assert [line['commit'] for line in lines] == ['aaa1111', 'bbb2222']
+    table = compare_results(results_path)
+    assert table.loc[('clean_date', 250), 'ratio'] == 0.5
+    assert list(table.columns) == ['aaa1111', 'bbb2222', 'ratio']
+
+def test_compare_needs_two_commits(tmp_path, monkeypatch):
+    results_path = tmp_path / 'results.jsonl'
+    monkeypatch.setattr(benchmark, 'git_commit', lambda: 'aaa1111')
+    record_results([{'benchmark': 'csv_write', 'size': 250, 'rows': 250, 'seconds': 0.1}], results_path)
+    assert compare_results(results_path) is None
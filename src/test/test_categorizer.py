@@ -0,0 +1,69 @@
+import pandas as pd
+
+import categorizer
+from categorizer import DEFAULT_CATEGORY_RULES, categorize, classify, compile_classifier, load_classifier
+
+def _classifier(upi=None, merchants=None, regex=None):
+    return compile_classifier({'upi': upi or {}, 'merchants': merchants or {}, 'regex': regex or []})
+
+def test_upi_beats_merchants_and_regex():
+    classifier = _classifier(upi={'landlord@okaxis': 'Rent'}, merchants={'SWIGGY': 'Restaurants'},
+                             regex=[[r'SWIGGY', 'Regex']])
+    assert classify('UPI/123/SWIGGY/landlord@okaxis/Payment', classifier) == 'Rent'
+
+def test_merchants_beat_regex():
+    classifier = _classifier(merchants={'SWIGGY': 'Restaurants'}, regex=[[r'SWIGGY', 'Regex']])
+    assert classify('POS PURCHASE SWIGGY', classifier) == 'Restaurants'
+    assert classify('POS PURCHASE SWIGGYINSTAMART', classifier) == 'Regex'
+
+def test_longest_merchant_phrase_wins():
+    classifier = _classifier(merchants={'ATM': 'Bank', 'ATM CASH': 'Cash'})
+    assert classify('ATM WDL ATM CASH 1234', classifier) == 'Cash'
+
+def test_merchants_match_whole_words_only():
+    classifier = _classifier(merchants={'RENT': 'Rent'})
+    assert classify('PARENT TRANSFER', classifier) is None
+    assert classify('HOUSE RENT MARCH', classifier) == 'Rent'
+
+def test_first_regex_rule_wins_at_the_same_position():
+    classifier = _classifier(regex=[[r'DENT', 'First'], [r'DENTAL', 'Second']])
+    assert classify('CITY DENTAL CLINIC', classifier) == 'First'
+    # Otherwise the leftmost match decides
+    assert classify('CLINIC DENTAL', _classifier(regex=[[r'DENTAL', 'First'], [r'CLINIC', 'Second']])) == 'Second'
+
+def test_rules_file_overrides_defaults(tmp_path):
+    rules = tmp_path / 'rules.json'
+    rules.write_text('{"merchants": {"SWIGGY": "Food/Grocery"}, "regex": [["DENTAL", "Health"]]}')
+    classifier = load_classifier(str(rules))
+    assert classify('UPI/1/SWIGGY/swiggy@ybl/Payment', classifier) == 'Food/Grocery'
+    assert classify('CITY DENTAL CLINIC', classifier) == 'Health'
+    assert classify('ZOMATO ORDER', classifier) == DEFAULT_CATEGORY_RULES['merchants']['ZOMATO']
+
+def test_categorize_column_keeps_none_for_unmatched():
+    classifier = load_classifier('')
+    result = categorize(pd.Series(['POS PURCHASE DMART', None, 'SOMETHING ELSE']), classifier)
+    assert result.tolist() == ['Food/Grocery', None, None]
+
+def test_short_names_need_context():
+    classifier = load_classifier('')
+    assert classify('THACKWELL RD ATM', classifier) is None
+    assert classify('RD INSTALLMENT 0042', classifier) == 'Investments'
+    assert classify('UPI/123/OLA/olacabs@ybl/Payment', classifier) == 'Auto'
+    assert classify('OLA ELECTRIC SERVICE', classifier) is None
+    assert classify('NEFT LIC OF INDIA PREMIUM', classifier) == 'Insurance'
+
+def test_reference_numbers_share_one_classification(monkeypatch):
+    classifier = load_classifier('')
+    calls = []
+    monkeypatch.setattr(categorizer, 'classify', lambda key, classifier: calls.append(key) or classify(key, classifier))
+    descriptions = pd.Series([f"UPI/{400000000000 + i}/SWIGGY/swiggy@ybl/Payment" for i in range(50)]
+                             + ['04 May 24 NEFT CRED SALARY', '18 May 24 NEFT CRED SALARY', None])
+    result = categorize(descriptions, classifier)
+    assert result.tolist() == ['Restaurants'] * 50 + ['Salary', 'Salary', None]
+    assert len(calls) == 2
+
+def test_digit_rules_see_the_digits():
+    classifier = _classifier(upi={'9876543210': 'Family'}, regex=[[r'\bREF 1\d{3}\b', 'Refund']])
+    result = categorize(pd.Series(['UPI/1234/9876543210/Payment', 'UPI/1234/9876543211/Payment',
+                                   'REF 1234', 'REF 2234']), classifier)
+    assert result.tolist() == ['Family', None, 'Refund', None]
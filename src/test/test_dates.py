@@ -0,0 +1,54 @@
+from datetime import date
+
+import pandas as pd
+
+from pdf_analyzer import clean_date, new_year_state, parse_dates, tables_to_transactions
+from synthetic_statements import generate_transactions, scb_tables
+
+def _iso(transactions):
+    return [txn['date'].isoformat() for txn in transactions]
+
+def test_synthetic_statement_keeps_its_years_across_year_end():
+    transactions = generate_transactions(300, start=date(2023, 11, 1), seed=1)
+    assert transactions[0]['date'].year != transactions[-1]['date'].year
+    df = tables_to_transactions(scb_tables(transactions, seed=1), new_year_state())
+    assert df['Value Date'].tolist() == _iso(transactions)
+
+def test_year_state_carries_across_tables():
+    transactions = generate_transactions(120, start=date(2023, 12, 1), seed=2)
+    tables = scb_tables(transactions, rows_per_page=10, seed=2)
+    year_state = new_year_state()
+    dates = [d for table in tables for d in tables_to_transactions([table], year_state)['Value Date']]
+    # Only the first table has the statement date; later ones rely on the carried rollover
+    assert dates == _iso(transactions)
+
+def test_yearless_dates_count_back_from_first_explicit_year():
+    values = pd.Series(['Dec 30 TRANSFER', 'Jan 02 UPI', '05 Jan 2024 NEFT', 'Jan 09 ATM'])
+    assert parse_dates(values).tolist() == ['2023-12-30', '2024-01-02', '2024-01-05', '2024-01-09']
+
+def test_month_first_dates_keep_their_year():
+    values = pd.Series(['Dec 30, 2022 OPENING', 'Jan 02 UPI', 'Mar 15 2024 NEFT', 'Mar 20 ATM'])
+    assert parse_dates(values).tolist() == ['2022-12-30', '2023-01-02', '2024-03-15', '2024-03-20']
+    # An amount after the day is not a year
+    year_state = new_year_state()
+    year_state['anchor'] = {'start': None, 'end': date(2024, 3, 31)}
+    assert parse_dates(pd.Series(['Mar 15 2000.00 NEFT']), year_state).tolist() == ['2024-03-15']
+
+def test_yearless_dates_without_any_year_use_the_anchor():
+    year_state = new_year_state()
+    year_state['anchor'] = {'start': date(2023, 12, 1), 'end': date(2024, 1, 31)}
+    assert parse_dates(pd.Series(['Dec 15', 'Jan 03']), year_state).tolist() == ['2023-12-15', '2024-01-03']
+
+def test_clean_date_formats():
+    assert clean_date('05 Mar 2024') == '2024-03-05'
+    assert clean_date('05-Mar-24') == '2024-03-05'
+    assert clean_date('05/03/2024') == '2024-03-05'
+    assert clean_date('Mar 15 2024') == '2024-03-15'
+    assert clean_date('Mar 15, 2024') == '2024-03-15'
+    assert clean_date('no date here') is None
+
+def test_clean_date_matches_parse_dates():
+    values = ['05 Mar 2024', 'Dec 31', 'Jan 02 UPI', '31/02/2024', '1-6-25', None, 'nothing', 17]
+    # Each value on its own: in a column, yearless dates follow the rows before them
+    expected = [parse_dates(pd.Series([value], dtype=object)).iloc[0] for value in values]
+    assert [clean_date(value) for value in values] == [None if pd.isna(v) else v for v in expected]
@@ -0,0 +1,73 @@
+import os
+
+import pytest
+from PyPDF2 import PdfReader
+
+import pdf_analyzer
+from pdf_analyzer import open_statement, read_tables, tabula_path
+from synthetic_statements import generate_transactions, write_scb_pdf
+
+@pytest.fixture
+def tabula_calls(monkeypatch):
+    """Replace tabula with a stub that records what it was asked to read."""
+    calls = []
+    def read_pdf(path, password=None, pages=None, **options):
+        reader = PdfReader(path)
+        calls.append({'path': path, 'password': password, 'pages': pages, 'encrypted': reader.is_encrypted,
+                      'page_count': len(reader.pages)})
+        return []
+    monkeypatch.setattr(pdf_analyzer.tabula, 'read_pdf', read_pdf)
+    return calls
+
+@pytest.fixture
+def reader_opens(monkeypatch):
+    """Count how often pdf_analyzer parses a PDF with PyPDF2."""
+    opened = []
+    def counting_reader(path, *args, **kwargs):
+        opened.append(str(path))
+        return PdfReader(path, *args, **kwargs)
+    monkeypatch.setattr(pdf_analyzer, 'PdfReader', counting_reader)
+    return opened
+
+def test_encrypted_statement_is_decrypted_once(tmp_path, tabula_calls, reader_opens):
+    pdf_path = str(tmp_path / 'locked.pdf')
+    write_scb_pdf(pdf_path, generate_transactions(90, seed=3), rows_per_page=40, password='secret')
+    read_tables(pdf_path, 'secret', use_cache=False, use_template=False, workers=1)
+    assert reader_opens == [pdf_path]
+    [call] = tabula_calls
+    # tabula reads a decrypted copy with every page, and needs no password for it
+    assert call['path'] != pdf_path
+    assert call['password'] is None
+    assert not call['encrypted']
+    assert call['page_count'] == 3
+    assert call['pages'] == '1-3'
+    # The private copy is gone once extraction is done
+    assert not os.path.exists(call['path'])
+    assert not os.path.exists(os.path.dirname(call['path']))
+
+def test_plain_statement_is_read_in_place(tmp_path, tabula_calls):
+    pdf_path = str(tmp_path / 'plain.pdf')
+    write_scb_pdf(pdf_path, generate_transactions(30, seed=4))
+    read_tables(pdf_path, None, use_cache=False, use_template=False, workers=1)
+    assert [call['path'] for call in tabula_calls] == [pdf_path]
+
+def test_copy_is_written_on_first_use_only(tmp_path):
+    pdf_path = str(tmp_path / 'locked.pdf')
+    write_scb_pdf(pdf_path, generate_transactions(50, seed=5), rows_per_page=40, password='secret')
+    with open_statement(pdf_path, 'secret') as statement:
+        assert statement['page_count'] == 2
+        assert statement['text_pages'] == [1, 2]
+        assert os.listdir(statement['tmp_dir']) == []
+        path = tabula_path(statement)
+        assert os.path.dirname(path) == statement['tmp_dir']
+        stamp = os.stat(path).st_mtime_ns
+        assert tabula_path(statement) == path
+        assert os.stat(path).st_mtime_ns == stamp
+    assert not os.path.exists(path)
+
+def test_wrong_password_fails_before_tabula(tmp_path, tabula_calls):
+    pdf_path = str(tmp_path / 'locked.pdf')
+    write_scb_pdf(pdf_path, generate_transactions(10, seed=6), password='secret')
+    with pytest.raises(ValueError, match='Incorrect password'):
+        read_tables(pdf_path, 'guess', use_cache=False, use_template=False, workers=1)
+    assert tabula_calls == []
@@ -0,0 +1,37 @@
+import pandas as pd
+import pytest
+
+docx = pytest.importorskip('docx')
+
+from expense_report import add_bulk_table, load_transactions, render_report
+
+def _transactions(tmp_path):
+    path = tmp_path / 'jan.csv'
+    pd.DataFrame({
+        'Value Date': ['2025-12-20', '2026-01-03', '2026-01-05', '2026-01-09', '2026-01-20'],
+        'Description': ['UPI/1/SWIGGY/swiggy@ybl/Lunch', 'UPI/2/SWIGGY/swiggy@ybl/Dinner',
+                        'NEFT CRED SALARY', 'POS DMART\x0bBLR\x00', 'ATM\x1f CASH <&>'],
+        'Deposit': [None, None, 50000.0, None, None],
+        'Withdrawal': [300.0, 450.0, None, 1200.5, 2000.0],
+        'Balance': [1000.0, 550.0, 50550.0, 49349.5, 47349.5],
+    }).to_csv(path, index=False)
+    return load_transactions([str(path)])
+
+def test_control_characters_are_dropped(tmp_path):
+    doc = docx.Document()
+    table = add_bulk_table(doc, ['Description', 'Amount'], [['POS\x00 DMART\x0b', '1.00'], ['A\tB & <C>', '2.00']],
+                           numeric={1})
+    assert [[cell.text for cell in row.cells] for row in table.rows] == \
+        [['Description', 'Amount'], ['POS DMART', '1.00'], ['A\tB & <C>', '2.00']]
+
+def test_monthly_report(tmp_path):
+    df = _transactions(tmp_path)
+    output = tmp_path / 'report.docx'
+    counts = render_report(df, output, 2026, 1)
+    assert counts == {'transactions': 4, 'categories': 4, 'merchants': 3, 'months': 1}
+    tables = docx.Document(output).tables
+    transactions = [[cell.text for cell in row.cells] for row in tables[-1].rows]
+    assert transactions[3][:2] == ['2026-01-09', 'POS DMARTBLR']
+    assert transactions[4][1] == 'ATM CASH <&>'
+    categories = {row.cells[0].text: row.cells[1].text for row in tables[0].rows[1:]}
+    assert categories['Restaurants'] == '450.00'
@@ -0,0 +1,72 @@
+import stat
+
+import pandas as pd
+import pytest
+from PyPDF2 import PdfWriter
+
+import extraction_cache
+import pdf_analyzer
+from extraction_cache import cached_read
+from pdf_analyzer import read_tables
+
+def _write_pdf(path, password=None):
+    writer = PdfWriter()
+    writer.add_blank_page(width=200, height=200)
+    if password is not None:
+        writer.encrypt(password)
+    with open(path, 'wb') as f:
+        writer.write(f)
+    return str(path)
+
+@pytest.fixture
+def reads(tmp_path, monkeypatch):
+    """Point the cache at tmp_path and count the tabula reads read_tables makes."""
+    monkeypatch.setattr(extraction_cache, 'CACHE_DIR', tmp_path / 'cache')
+    calls = []
+    def read_pages(statement, pages, workers, template):
+        calls.append(statement['page_count'])
+        return [pd.DataFrame({'Balance': ['1.00']})]
+    monkeypatch.setattr(pdf_analyzer, '_read_pages', read_pages)
+    return calls
+
+def test_plain_pdf_is_cached(tmp_path, reads):
+    pdf_path = _write_pdf(tmp_path / 'plain.pdf')
+    for _ in range(2):
+        assert len(read_tables(pdf_path, None, use_template=False)) == 1
+    assert reads == [1]
+    entries = list((tmp_path / 'cache').glob('*.pkl'))
+    assert len(entries) == 1
+    assert stat.S_IMODE(entries[0].stat().st_mode) == 0o600
+
+def test_encrypted_pdf_is_not_cached_by_default(tmp_path, reads):
+    pdf_path = _write_pdf(tmp_path / 'locked.pdf', 'secret')
+    for _ in range(2):
+        read_tables(pdf_path, 'secret', use_template=False)
+    assert reads == [1, 1]
+    assert not (tmp_path / 'cache').exists()
+
+def test_cached_encrypted_pdf_still_needs_its_password(tmp_path, reads, monkeypatch):
+    monkeypatch.setattr(extraction_cache, 'CACHE_ENCRYPTED', True)
+    pdf_path = _write_pdf(tmp_path / 'locked.pdf', 'secret')
+    read_tables(pdf_path, 'secret', use_template=False)
+    read_tables(pdf_path, 'secret', use_template=False)
+    assert reads == [1]
+    for password in ('wrong', None):
+        with pytest.raises(ValueError, match='Incorrect password'):
+            read_tables(pdf_path, password, use_template=False)
+    assert reads == [1]
+
+def test_refresh_and_no_cache(tmp_path):
+    pdf_path = _write_pdf(tmp_path / 'plain.pdf')
+    calls = []
+    def read():
+        calls.append(1)
+        return [len(calls)]
+    options = {'pages': 'all'}
+    cache_dir = tmp_path / 'cache'
+    assert cached_read(pdf_path, options, read, cache_dir=cache_dir) == [1]
+    assert cached_read(pdf_path, options, read, cache_dir=cache_dir) == [1]
+    assert cached_read(pdf_path, options, read, refresh=True, cache_dir=cache_dir) == [2]
+    assert cached_read(pdf_path, options, read, cache_dir=cache_dir) == [2]
+    assert cached_read(pdf_path, options, read, use_cache=False, cache_dir=cache_dir) == [3]
+    assert cached_read(pdf_path, {'pages': '1'}, read, cache_dir=cache_dir) == [4]
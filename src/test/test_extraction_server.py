@@ -0,0 +1,83 @@
+import os
+import json
+import threading
+import http.client
+
+import pytest
+
+from extraction_server import ExtractionServer, _is_loopback, _start_pool, serve
+from synthetic_statements import generate_transactions, write_sbi_csv
+
+@pytest.fixture
+def server(tmp_path):
+    # No JVM in the workers: the tests only extract CSV exports
+    server = ExtractionServer(('127.0.0.1', 0), 1, [tmp_path], initializer=None)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def _post(server, body, headers=None):
+    conn = http.client.HTTPConnection(*server.server_address, timeout=60)
+    try:
+        conn.request('POST', '/extract', json.dumps(body), headers or {'Content-Type': 'application/json'})
+        response = conn.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        conn.close()
+
+@pytest.mark.parametrize('body', [
+    {'path': ['a.pdf']},
+    {'path': 'a.pdf', 'password': 1234},
+    {'path': 'a.pdf', 'outputs': ['ledger.db']},
+    {'path': 'a.pdf', 'outputs': {'ledger_db': {'x': 1}}},
+    {'path': 'a.pdf', 'options': 'fast'},
+])
+def test_malformed_jobs_get_400(server, body):
+    status, reply = _post(server, body)
+    assert status == 400
+    assert 'must be' in reply['error']
+
+def test_server_survives_bad_jobs(server):
+    _post(server, {'path': ['a.pdf']})
+    status, reply = _post(server, {'path': '/no/such/statement.pdf'})
+    assert status == 404
+
+@pytest.mark.parametrize('headers', [
+    # What a cross-site form or fetch() without a preflight can send
+    {'Content-Type': 'text/plain'},
+    {'Content-Type': 'application/x-www-form-urlencoded'},
+    {'Content-Type': 'application/json', 'Origin': 'https://example.com'},
+    {'Content-Type': 'application/json', 'Origin': 'null'},
+])
+def test_browser_requests_are_rejected(server, tmp_path, headers):
+    status, _ = _post(server, {'path': str(tmp_path)}, headers)
+    assert status in (403, 415)
+
+def test_outputs_outside_the_roots_are_rejected(server, tmp_path):
+    status, reply = _post(server, {'path': str(tmp_path), 'outputs': {'ledger_db': '/tmp/../etc/ledger.db'}})
+    assert status == 403
+    assert 'ledger_db' in reply['error']
+
+def test_broken_pool_is_replaced(server, tmp_path):
+    export = tmp_path / 'statement.csv'
+    write_sbi_csv(export, generate_transactions(30, seed=1))
+    server.pool = _start_pool(1, None)
+    # A worker dying breaks the whole pool
+    with pytest.raises(Exception):
+        server.pool.submit(os._exit, 1).result()
+    status, reply = _post(server, {'path': str(export), 'outputs': {'ledger_db': str(tmp_path / 'ledger.db')}})
+    assert status == 500
+    assert 'restarted' in reply['error']
+    status, reply = _post(server, {'path': str(export), 'outputs': {'ledger_db': str(tmp_path / 'ledger.db')}})
+    assert status == 200
+    assert reply['transactions'] == 30
+
+def test_loopback_hosts():
+    assert all(map(_is_loopback, ['localhost', '127.0.0.1', '127.0.1.1', '::1']))
+    assert not any(map(_is_loopback, ['0.0.0.0', '192.168.1.10', '::', 'example.com']))
+
+def test_serve_refuses_other_interfaces():
+    with pytest.raises(ValueError, match='loopback'):
+        serve('0.0.0.0:8765', workers=1)
@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from layout_templates import json_to_tables
+
+def _cell(text, left):
+    return {'text': text, 'left': left, 'top': 100.0, 'width': 40.0, 'height': 10.0}
+
+def _table(rows, page=1):
+    return {'page_number': page, 'top': 90.0, 'left': 20.0, 'width': 500.0, 'height': 300.0,
+            'data': [[_cell(text, 20.0 + 60 * i) for i, text in enumerate(row)] for row in rows]}
+
+RAW_JSON = [
+    _table([['Date', 'Description', '', 'Amount', 'Amount', ''],
+            ['Jan 02', 'UPI/1/SWIGGY', '', '120.00', '', '9,880.00'],
+            ['', 'wrapped line', '', '', '', '']]),
+    {'page_number': 1, 'top': 0.0, 'left': 0.0, 'width': 0.0, 'height': 0.0, 'data': []},
+    _table([['Balance Brought Forward', '10,000.00']], page=2),
+]
+
+def test_matches_tabulas_own_conversion():
+    tabula_io = pytest.importorskip('tabula.io')
+    expected = tabula_io._extract_from(RAW_JSON, {'dtype': str})
+    tables = json_to_tables(RAW_JSON)
+    assert len(tables) == len(expected) == 2
+    for table, reference in zip(tables, expected):
+        pd.testing.assert_frame_equal(table, reference)
+
+def test_keeps_the_layout():
+    table = json_to_tables(RAW_JSON)[0]
+    assert list(table.columns) == ['Date', 'Description', 'Unnamed: 0', 'Amount', 'Amount.1', 'Unnamed: 1']
+    assert table.attrs['layout'] == {'page': 1, 'area': [90.0, 20.0, 390.0, 520.0],
+                                     'columns': [80.0, 140.0, 200.0, 260.0, 320.0]}
+    assert table.isna().to_numpy().sum() == 7
+    assert np.isnan(table.loc[1, 'Date'])
+
+def _raw_page(table, page):
+    """A synthetic page table as tabula-java JSON, header row first."""
+    rows = [list(table.columns)] + table.values.tolist()
+    return {'page_number': page, 'top': 90.0, 'left': 20.0, 'width': 500.0, 'height': 700.0,
+            'data': [[_cell('' if pd.isna(text) else str(text), 20.0 + 120 * i) for i, text in enumerate(row)]
+                     for row in rows]}
+
+@pytest.fixture
+def statement(tmp_path, monkeypatch):
+    """
+    A 4-page statement behind a stubbed tabula. Guess mode returns the pages
+    as JSON; template mode returns them the way fixed-area extraction does,
+    with the header as a data row, or tables of the wrong shape once
+    statement['layout_changed'] is set.
+    """
+    import pdf_analyzer
+    from layout_templates import load_template, page_numbers, save_template
+    from synthetic_statements import generate_transactions, scb_tables, write_scb_pdf
+    tables = scb_tables(generate_transactions(60, seed=9), rows_per_page=25, seed=9)
+    pdf_path = str(tmp_path / 'statement.pdf')
+    write_scb_pdf(pdf_path, generate_transactions(10 * len(tables), seed=10), rows_per_page=10)
+    state = {'path': pdf_path, 'calls': [], 'layout_changed': False, 'templates': tmp_path / 'templates'}
+
+    def read_pdf(path, password=None, pages=None, output_format=None, area=None, columns=None, **options):
+        numbers = page_numbers(pages, len(tables))
+        if area is None:
+            state['calls'].append('guess')
+            return [_raw_page(tables[n - 1], n) for n in numbers]
+        state['calls'].append('template')
+        if state['layout_changed']:
+            return [pd.DataFrame([['Jan 02 something', '1.00']]) for _ in numbers]
+        return [pd.DataFrame([list(tables[n - 1].columns)] + tables[n - 1].values.tolist()) for n in numbers]
+    monkeypatch.setattr(pdf_analyzer.tabula, 'read_pdf', read_pdf)
+    monkeypatch.setattr(pdf_analyzer, 'load_template', lambda bank: load_template(bank, state['templates']))
+    monkeypatch.setattr(pdf_analyzer, 'save_template',
+                        lambda bank, template: save_template(bank, template, state['templates']))
+    return state
+
+def _extract(statement):
+    from pdf_analyzer import extract_bank_statement
+    return extract_bank_statement(statement['path'], None, use_cache=False, page_workers=1)
+
+def test_template_recorded_then_used(statement):
+    guessed = _extract(statement)
+    assert statement['calls'] == ['guess']
+    assert (statement['templates'] / 'SCB.json').exists()
+    from_template = _extract(statement)
+    # One fixed-area call for the first page and one for the others
+    assert statement['calls'] == ['guess', 'template', 'template']
+    pd.testing.assert_frame_equal(from_template, guessed)
+
+def test_template_that_does_not_fit_falls_back_to_guess_mode(statement, capsys):
+    guessed = _extract(statement)
+    template_path = statement['templates'] / 'SCB.json'
+    recorded = template_path.read_text()
+    statement['layout_changed'] = True
+    fallback = _extract(statement)
+    assert statement['calls'] == ['guess', 'template', 'template', 'guess']
+    assert 'does not fit this statement; falling back to guess mode' in capsys.readouterr().out
+    pd.testing.assert_frame_equal(fallback, guessed)
+    # Guess mode found the same layout again, so the template is kept as it was
+    assert template_path.read_text() == recorded
+
+def test_template_fits():
+    from pdf_analyzer import template_fits
+    names = ['date_desc', 'deposit', 'withdrawal', 'balance']
+    template = {'first_page': {'names': names}, 'other_pages': {'names': names}}
+    table = pd.DataFrame([['Jan 02 UPI', None, '10.00', '990.00']], columns=names)
+    assert template_fits([table], template)
+    assert not template_fits([], template)
+    assert not template_fits([table.iloc[:, :3]], template)
+    assert not template_fits([table.assign(balance='Balance')], template)
@@ -0,0 +1,74 @@
+import json
+import pstats
+
+import batch_analyzer
+import metrics
+from batch_analyzer import run_batch
+from metrics import count, merge_reports, profiled, stage, start_metrics, stop_metrics, write_report
+from pdf_analyzer import extract_bank_export
+from synthetic_statements import generate_transactions, write_sbi_csv
+
+def test_hooks_do_nothing_when_collection_is_off():
+    assert stop_metrics() is None
+    assert stage('tabula') is metrics._OFF
+    with stage('tabula'):
+        count('rows', 5)
+    assert stop_metrics() is None
+
+def test_stages_and_counts_add_up():
+    start_metrics(trace_memory=False)
+    for _ in range(3):
+        with stage('tabula'):
+            count('tables')
+    count('rows', 40)
+    report = stop_metrics()
+    assert report['stages']['tabula']['calls'] == 3
+    assert report['stages']['tabula']['seconds'] >= 0
+    assert report['counts'] == {'tables': 3, 'rows': 40}
+    assert 'peak_memory_mb' not in report
+    assert not metrics.metrics_enabled()
+
+def test_profiled_export_read(tmp_path):
+    csv_path = tmp_path / 'jan.csv'
+    write_sbi_csv(csv_path, generate_transactions(30, seed=1))
+    dump_path = tmp_path / 'prof' / 'run.prof'
+    with profiled(str(dump_path)) as profile:
+        df = extract_bank_export(str(csv_path), categories='')
+    report = profile['report']
+    assert report['stages']['export_read']['calls'] == 1
+    assert report['counts']['transactions'] == len(df) == 30
+    assert report['peak_memory_mb'] > 0
+    assert profile['wall_seconds'] >= report['stages']['export_read']['seconds']
+    assert pstats.Stats(str(dump_path)).total_calls > 0
+
+    report_path = tmp_path / 'reports' / 'metrics.json'
+    write_report(report, report_path, input=str(csv_path), wall_seconds=profile['wall_seconds'])
+    written = json.loads(report_path.read_text())
+    assert written['input'] == str(csv_path)
+    assert written['stages'] == report['stages']
+    assert 'python' in written
+
+def test_merge_reports():
+    reports = [
+        {'stages': {'tabula': {'seconds': 1.5, 'calls': 2}}, 'counts': {'rows': 10}, 'peak_memory_mb': 30.0},
+        None,
+        {'stages': {'tabula': {'seconds': 0.5, 'calls': 1}, 'sort': {'seconds': 0.1, 'calls': 1}},
+         'counts': {'rows': 5, 'tables': 1}, 'peak_memory_mb': 45.5},
+    ]
+    assert merge_reports(reports) == {
+        'stages': {'tabula': {'seconds': 2.0, 'calls': 3}, 'sort': {'seconds': 0.1, 'calls': 1}},
+        'counts': {'rows': 15, 'tables': 1},
+        'workers': 2,
+        'peak_memory_mb': 45.5,
+    }
+
+def test_batch_workers_return_their_reports(tmp_path, monkeypatch):
+    # Exports never reach tabula; don't start a JVM in the workers
+    monkeypatch.setattr(batch_analyzer, 'warm_tabula', lambda: None)
+    write_sbi_csv(tmp_path / 'jan.csv', generate_transactions(40, seed=1))
+    write_sbi_csv(tmp_path / 'feb.csv', generate_transactions(25, seed=2))
+    results = run_batch(str(tmp_path), 'unused', workers=2, categories='', profile=True)
+    merged = merge_reports(r['metrics'] for r in results)
+    assert merged['workers'] == 2
+    assert merged['stages']['export_read']['calls'] == 2
+    assert merged['counts']['transactions'] == 65
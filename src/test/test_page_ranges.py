@@ -0,0 +1,54 @@
+import os
+from datetime import date
+
+import pandas as pd
+import pytest
+
+import pdf_analyzer
+from layout_templates import page_numbers
+from pdf_analyzer import extract_bank_statement, split_page_ranges
+from synthetic_statements import generate_transactions, scb_tables, write_scb_pdf
+
+def _raw_table(table, page):
+    """A synthetic page table as tabula-java JSON, header row first."""
+    def cell(text, i):
+        return {'text': '' if pd.isna(text) else str(text), 'left': 20.0 + 120 * i, 'top': 100.0,
+                'width': 100.0, 'height': 10.0}
+    rows = [list(table.columns)] + table.values.tolist()
+    return {'page_number': page, 'top': 90.0, 'left': 20.0, 'width': 500.0, 'height': 700.0,
+            'data': [[cell(text, i) for i, text in enumerate(row)] for row in rows]}
+
+@pytest.fixture
+def statement(tmp_path, monkeypatch):
+    """A 12-page PDF whose tabula output is one synthetic SCB table per page, across a year end."""
+    transactions = generate_transactions(200, start=date(2023, 10, 1), seed=7)
+    tables = scb_tables(transactions, rows_per_page=25, seed=7)
+    pdf_path = str(tmp_path / 'annual.pdf')
+    write_scb_pdf(pdf_path, generate_transactions(10 * len(tables), seed=8), rows_per_page=10)
+
+    # Worker processes are forked after this patch, so they see it too
+    def read_pdf(path, password=None, pages=None, output_format=None, **options):
+        return [_raw_table(tables[n - 1], n) for n in page_numbers(pages, len(tables))]
+    monkeypatch.setattr(pdf_analyzer.tabula, 'read_pdf', read_pdf)
+    monkeypatch.setattr(pdf_analyzer, 'warm_tabula', lambda: None)
+    return pdf_path, transactions, len(tables)
+
+def test_split_page_ranges():
+    assert split_page_ranges(list(range(1, 11)), 3) == ['1-4', '5-7', '8-10']
+    assert split_page_ranges([1, 2, 4, 5, 6], 2) == ['1-2,4', '5-6']
+    assert split_page_ranges([1, 2], 8) == ['1', '2']
+    assert split_page_ranges(list(range(1, 11)), None, min_pages=40) == ['1-10']
+    assert len(split_page_ranges(list(range(1, 41)), None, min_pages=40)) == min(os.cpu_count() or 1, 40)
+
+def test_parallel_ranges_match_serial_extraction(statement, capsys):
+    pdf_path, transactions, pages = statement
+    assert pages == 12
+    options = {'use_cache': False, 'use_template': False}
+    serial = extract_bank_statement(pdf_path, None, page_workers=1, **options)
+    assert 'page ranges' not in capsys.readouterr().out
+    parallel = extract_bank_statement(pdf_path, None, page_workers=4, **options)
+    assert 'in 4 page ranges' in capsys.readouterr().out
+    pd.testing.assert_frame_equal(parallel, serial)
+    # The year rollover is worked out after stitching, so dates stay right across range boundaries
+    assert parallel['Value Date'].iloc[0] == '2023-10-01'
+    assert parallel['Value Date'].tolist() == sorted(txn['date'].isoformat() for txn in transactions)
@@ -0,0 +1,50 @@
+import pytest
+
+from pdf_analyzer import finalize_transactions, new_year_state, save_transactions, tables_to_transactions
+from synthetic_statements import generate_transactions, scb_tables
+
+pytest.importorskip('pyarrow')
+from parquet_ledger import read_parquet_ledger, source_name
+
+def _extract(count, seed):
+    transactions = generate_transactions(count, seed=seed)
+    return finalize_transactions(tables_to_transactions(scb_tables(transactions, seed=seed), new_year_state()))
+
+def _statement(path, content):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    return path
+
+def test_rerunning_a_statement_replaces_its_rows(tmp_path):
+    ledger = tmp_path / 'ledger'
+    pdf = _statement(tmp_path / 'statement.pdf', b'%PDF-1.4 a')
+    df = _extract(120, seed=6)
+    save_transactions(df, pdf, parquet_dir=ledger, account='savings')
+    save_transactions(df, pdf, parquet_dir=ledger, account='savings')
+    assert len(read_parquet_ledger(ledger)) == len(df)
+
+def test_same_file_name_of_other_accounts_is_kept(tmp_path):
+    ledger = tmp_path / 'ledger'
+    savings = _statement(tmp_path / 'savings' / 'statement.pdf', b'%PDF-1.4 a')
+    salary = _statement(tmp_path / 'salary' / 'statement.pdf', b'%PDF-1.4 b')
+    first, second = _extract(120, seed=6), _extract(80, seed=7)
+    save_transactions(first, savings, parquet_dir=ledger, account='savings')
+    save_transactions(second, salary, parquet_dir=ledger, account='salary')
+    stored = read_parquet_ledger(ledger)
+    assert len(stored) == len(first) + len(second)
+    assert stored['Source'].nunique() == 2
+
+def test_changed_file_replaces_its_rows(tmp_path):
+    ledger = tmp_path / 'ledger'
+    pdf = _statement(tmp_path / 'Acct Statement.pdf', b'%PDF-1.4 a')
+    name = source_name(pdf, 'savings')
+    assert name.startswith('savings_Acct_Statement_')
+    assert source_name(pdf, 'salary') != name
+    first = _extract(100, seed=6)
+    save_transactions(first, pdf, parquet_dir=ledger, account='savings')
+    # Re-downloaded: other bytes, same statement
+    pdf.write_bytes(b'%PDF-1.4 b')
+    assert source_name(pdf, 'savings') == name
+    second = _extract(110, seed=6)
+    save_transactions(second, pdf, parquet_dir=ledger, account='savings')
+    assert len(read_parquet_ledger(ledger)) == len(second)
@@ -0,0 +1,17 @@
+from argparse import Namespace
+
+import pdf_analyzer
+
+def _args(path, **kwargs):
+    return Namespace(pdf_path=str(path), password=None, batch=False, pipeline=False, watch=False, stream=False,
+                     parquet=None, ledger_db=None, account=None, **kwargs)
+
+def test_failed_extraction_exits_non_zero(tmp_path, monkeypatch, capsys):
+    pdf = tmp_path / 'statement.pdf'
+    pdf.write_bytes(b'%PDF-1.4')
+    monkeypatch.setattr(pdf_analyzer, 'extract_statement', lambda path, password, **options: None)
+    assert pdf_analyzer.run(_args(pdf), {}) == 1
+    assert 'Failed to extract data from the PDF.' in capsys.readouterr().out
+
+def test_missing_file_exits_non_zero(tmp_path):
+    assert pdf_analyzer.run(_args(tmp_path / 'missing.pdf'), {}) == 1
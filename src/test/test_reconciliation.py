@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+
+from pdf_analyzer import finalize_transactions, new_year_state, reconcile_balances, tables_to_transactions
+from synthetic_statements import generate_transactions, scb_tables
+
+def _statement(deposit, withdrawal, balance):
+    return pd.DataFrame({'Value Date': [f'2024-01-{i + 1:02d}' for i in range(len(balance))],
+                         'Description': 'X', 'Deposit': deposit, 'Withdrawal': withdrawal,
+                         'Balance': balance}).astype({'Deposit': 'float64', 'Withdrawal': 'float64',
+                                                      'Balance': 'float64'})
+
+def test_synthetic_statement_reconciles():
+    transactions = generate_transactions(500, seed=3)
+    df = finalize_transactions(tables_to_transactions(scb_tables(transactions, seed=3), new_year_state()))
+    assert len(df) == len(transactions)
+    assert df.attrs['unreconciled'] == []
+
+def test_mismatch_is_flagged():
+    df = reconcile_balances(_statement([np.nan, 100.0, np.nan], [np.nan, np.nan, 50.0], [1000.0, 1100.0, 1060.0]))
+    assert df['Reconciled'].tolist() == [None, True, False]
+
+def test_missing_amount_is_filled_from_the_balance():
+    df = reconcile_balances(_statement([np.nan, np.nan, np.nan], [np.nan, np.nan, 50.0], [1000.0, 1250.0, 1200.0]))
+    assert df['Deposit'].iloc[1] == 250.0
+    assert np.isnan(df['Withdrawal'].iloc[1])
+    assert df['Reconciled'].tolist() == [None, True, True]
+
+def test_rows_without_balance_reconcile_as_a_span():
+    df = reconcile_balances(_statement([np.nan, 10.0, 20.0], [np.nan, np.nan, np.nan], [100.0, np.nan, 130.0]))
+    assert df['Reconciled'].tolist() == [None, True, True]
@@ -0,0 +1,81 @@
+import pandas as pd
+import pytest
+
+from recurring_payments import detect_recurring, load_transactions
+
+def _payments(description, dates, amounts, account='savings'):
+    if not isinstance(amounts, list):
+        amounts = [amounts] * len(dates)
+    return pd.DataFrame({'account': account, 'date': pd.to_datetime(dates),
+                         'description': [f"UPI/{100000 + i}/{description}/pay@ybl/Payment" for i in range(len(dates))],
+                         'amount': amounts})
+
+def _monthly(start, count, day=5):
+    return [pd.Timestamp(start) + pd.DateOffset(months=i, day=day) for i in range(count)]
+
+def _series(result, payee):
+    rows = result[result['payee'].str.contains(payee)]
+    assert len(rows) == 1, result
+    return rows.iloc[0]
+
+def test_cadences_are_detected():
+    df = pd.concat([
+        _payments('LANDLORD', _monthly('2024-01-01', 12), -25000.0),
+        _payments('GYM', pd.date_range('2024-01-03', periods=30, freq='7D'), -300.0),
+        _payments('INSURANCE', _monthly('2023-03-01', 24, day=20)[::3], -12000.0),
+        _payments('ACME CORP', _monthly('2024-01-01', 12, day=1), 90000.0),
+    ], ignore_index=True)
+    result = detect_recurring(df, as_of='2024-12-10')
+    assert _series(result, 'LANDLORD')['cadence'] == 'monthly'
+    assert _series(result, 'GYM')['cadence'] == 'weekly'
+    assert _series(result, 'INSURANCE')['cadence'] == 'quarterly'
+    assert _series(result, 'ACME CORP')['direction'] == 'credit'
+    rent = _series(result, 'LANDLORD')
+    assert (rent['payments'], rent['missed'], rent['status']) == (12, 0, 'active')
+    assert rent['next_date'] == pd.Timestamp('2025-01-05')
+
+def test_one_off_payments_are_not_recurring():
+    df = _payments('SHOP', ['2024-01-02', '2024-02-19', '2024-02-21', '2024-06-30'], -800.0)
+    assert detect_recurring(df).empty
+
+def test_missed_payment_inside_a_series():
+    dates = _monthly('2024-01-01', 12)
+    del dates[5]
+    rent = _series(detect_recurring(_payments('LANDLORD', dates, -25000.0), as_of='2024-12-10'), 'LANDLORD')
+    assert rent['cadence'] == 'monthly'
+    assert rent['missed'] == 1
+    assert rent['status'] == 'active'
+
+def test_payments_that_stop_are_flagged():
+    df = pd.concat([_payments('SIP', _monthly('2024-01-01', 6), -5000.0),
+                    _payments('LANDLORD', _monthly('2024-01-01', 12), -25000.0)], ignore_index=True)
+    result = detect_recurring(df)
+    # Counted up to the account's latest transaction, 2024-12-05
+    sip = _series(result, 'SIP')
+    assert sip['status'] == 'stopped'
+    assert sip['missed'] >= 3
+    assert _series(detect_recurring(df, as_of='2024-08-01'), 'SIP')['status'] == 'missed'
+
+def test_amount_change_on_a_subscription():
+    amounts = [-499.0] * 6 + [-549.0] * 6
+    netflix = _series(detect_recurring(_payments('NETFLIX', _monthly('2024-01-01', 12), amounts)), 'NETFLIX')
+    assert netflix['cadence'] == 'monthly'
+    assert not netflix['varying_amount']
+    assert netflix['amount_changes'] == 1
+    assert (netflix['previous_amount'], netflix['last_amount']) == (499.0, 549.0)
+    assert netflix['last_change'] == pd.Timestamp('2024-07-05')
+
+def test_bills_of_varying_amount():
+    amounts = [-800.0, -1900.0, -2600.0, -1200.0, -3100.0, -950.0]
+    bill = _series(detect_recurring(_payments('ELECTRICITY', _monthly('2024-01-01', 6), amounts)), 'ELECTRICITY')
+    assert bill['cadence'] == 'monthly'
+    assert bill['varying_amount']
+
+def test_load_transactions_signs_amounts(tmp_path):
+    csv = tmp_path / 'statement.csv'
+    pd.DataFrame({'Value Date': ['2024-01-05', '2024-01-06'], 'Description': ['SALARY', 'RENT'],
+                  'Deposit': [90000.0, None], 'Withdrawal': [None, 25000.0], 'Balance': [1.0, 2.0]}).to_csv(csv, index=False)
+    df = load_transactions([str(csv)], account='savings')
+    assert df['amount'].tolist() == [90000.0, -25000.0]
+    with pytest.raises(ValueError):
+        load_transactions()
@@ -0,0 +1,66 @@
+import os
+import json
+
+import pytest
+
+from spend_rollups import ALL, category_totals, empty_store, month_summary, save_rollups, sync_sheet
+
+HEADER = 'Date,Item,Expenditure,Cumulative - Monthly,Cumulative - Yearly,Comments,Category\n'
+ROWS = ['1-6-2025,Auto to office,125,,,,Auto\n', ',Groceries,900,,,,Food/Grocery\n',
+        '2-6-25,SIP,20000,,,,Investments\n', '3-7-2025,Dinner,1500,,,,Restaurants\n']
+
+def _write(path, rows):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(HEADER + ''.join(rows))
+    # Make sure the size/mtime stamp changes between quick successive writes
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    return path
+
+def test_inserted_row_changes_only_itself(tmp_path):
+    store = empty_store()
+    sheet = _write(tmp_path / 'sheet.csv', ROWS)
+    assert sync_sheet(store, sheet) == 4
+    _write(sheet, ROWS[:1] + ['1-6-2025,Coffee,80,,,,Restaurants\n'] + ROWS[1:])
+    assert sync_sheet(store, sheet) == 1
+    june = month_summary(store, '2025-06').set_index('Category')
+    assert june.loc[ALL, 'Total'] == 125 + 80 + 900 + 20000
+    assert june.loc['Restaurants', 'Count'] == 1
+    assert category_totals(store)['Restaurants'] == 80 + 1500
+
+def test_deleted_and_recategorized_rows(tmp_path):
+    store = empty_store()
+    sheet = _write(tmp_path / 'sheet.csv', ROWS)
+    sync_sheet(store, sheet)
+    _write(sheet, [ROWS[0], ',Groceries,900,,,,Household\n', ROWS[3]])
+    # Investments and Food/Grocery gone, Household new
+    assert sync_sheet(store, sheet) == 3
+    assert category_totals(store) == pytest.approx({'Auto': 125, 'Household': 900, 'Restaurants': 1500})
+    assert sync_sheet(store, sheet) == 0
+
+def test_same_file_name_in_two_folders(tmp_path):
+    store = empty_store()
+    sync_sheet(store, _write(tmp_path / 'a' / 'Expenditures.csv', ROWS[:2]))
+    sync_sheet(store, _write(tmp_path / 'b' / 'Expenditures.csv', ROWS[2:]))
+    assert len(store['sheets']) == 2
+    assert category_totals(store)['Investments'] == 20000
+    assert category_totals(store)['Auto'] == 125
+
+def test_cumulative_restarts_each_year(tmp_path):
+    store = empty_store()
+    sync_sheet(store, _write(tmp_path / 'sheet.csv', ['15-11-2025,Rent,1000,,,,Rent\n', '15-12-2025,Rent,1000,,,,Rent\n',
+                                                      ' 15-1-26,Rent,1200,,,,Rent\n', '15-2-2026,Rent,1200,,,,Rent\n']))
+    assert month_summary(store, '2025-12').set_index('Category').loc['Rent', 'Cumulative'] == 2000
+    february = month_summary(store, '2026-02').set_index('Category')
+    assert february.loc['Rent', 'Cumulative'] == 2400
+    assert february.loc[ALL, 'Cumulative'] == 2400
+    assert category_totals(store) == {'Rent': 4400}
+
+def test_store_keeps_only_aggregates(tmp_path):
+    store = empty_store()
+    sheet = _write(tmp_path / 'sheet.csv', ROWS * 50)
+    sync_sheet(store, sheet)
+    save_rollups(store, tmp_path / 'rollups.json')
+    saved = json.loads((tmp_path / 'rollups.json').read_text())
+    assert saved['sheets'][str(sheet.resolve())]['months']['2025-06']['Auto'] == [6250.0, 50]
+    assert 'Dinner' not in (tmp_path / 'rollups.json').read_text()
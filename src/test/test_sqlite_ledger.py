@@ -0,0 +1,37 @@
+import pandas as pd
+
+from pdf_analyzer import finalize_transactions, new_year_state, tables_to_transactions
+from sqlite_ledger import ingest_transactions, query_transactions
+from synthetic_statements import generate_transactions, scb_tables
+
+def _extract(transactions):
+    return finalize_transactions(tables_to_transactions(scb_tables(transactions), new_year_state()),
+                                 categories='')
+
+def test_reingest_adds_nothing(tmp_path):
+    db = tmp_path / 'ledger.db'
+    df = _extract(generate_transactions(200, seed=4))
+    assert ingest_transactions(db, df, 'savings', 'full.pdf') == len(df)
+    assert ingest_transactions(db, df, 'savings', 'again.pdf') == 0
+    assert len(query_transactions(db)) == len(df)
+
+def test_overlapping_statements_collapse(tmp_path):
+    db = tmp_path / 'ledger.db'
+    year = _extract(generate_transactions(200, seed=5))
+    # A monthly statement holds the same rows as that stretch of the yearly one
+    month = year.iloc[50:80].copy()
+    assert ingest_transactions(db, month, 'savings', 'month.pdf') == len(month)
+    assert ingest_transactions(db, year, 'savings', 'year.pdf') == len(year) - len(month)
+    stored = query_transactions(db)
+    assert len(stored) == len(year)
+    # The monthly statement came first, so its rows keep it as their source
+    assert (stored['source'] == 'month.pdf').sum() == len(month)
+
+def test_description_spacing_does_not_split_rows(tmp_path):
+    db = tmp_path / 'ledger.db'
+    df = pd.DataFrame({'Value Date': ['2024-01-05'], 'Description': ['POS  PURCHASE DMART'],
+                       'Deposit': [None], 'Withdrawal': [120.0], 'Balance': [880.0]})
+    assert ingest_transactions(db, df, 'savings') == 1
+    assert ingest_transactions(db, df.assign(Description='pos purchase, dmart'), 'savings') == 0
+    # The same row in another account is a separate transaction
+    assert ingest_transactions(db, df, 'credit card') == 1
@@ -0,0 +1,48 @@
+import pandas as pd
+import pytest
+
+from pdf_analyzer import clean_description, new_year_state, tables_to_transactions
+from statement_rules import BANK_RULES, bank_rules, clean_descriptions, compile_rules, contains
+
+DESCRIPTIONS = pd.Series([
+    'Jan 05 Jan 05 UPI/1/SWIGGY/swiggy@ybl/Lunch',
+    'Jan 06 Jan 06 NEFT CRED SALARY STATEMENT DATE : 31 Jan 2024 IFSC SCBL0036004 Phone No.: 9036002402 ACME',
+    'Balance Brought Forward   Jan 01',
+    'Date   Value Description Date Jan 07 ATM WDL',
+    '   ',
+    None,
+])
+
+def test_rules_compile_once_per_bank():
+    assert bank_rules('SCB') is bank_rules('SCB')
+    assert bank_rules('SBI') is not bank_rules('SCB')
+    with pytest.raises(ValueError, match="Known banks: SCB, SBI"):
+        bank_rules('HDFC')
+
+def test_column_cleaning_matches_the_single_value_cleaner():
+    for bank in BANK_RULES:
+        rules = bank_rules(bank)
+        cleaned = clean_descriptions(DESCRIPTIONS, rules)
+        assert cleaned.tolist() == [clean_description(desc, rules) for desc in DESCRIPTIONS]
+    cleaned = clean_descriptions(DESCRIPTIONS, bank_rules('SCB')).tolist()
+    assert cleaned[1] == 'Jan 06 Jan 06 NEFT CRED SALARY ACME'
+    assert cleaned[2:] == ['Jan 01', 'Jan 07 ATM WDL', None, None]
+
+def test_each_bank_brings_its_own_furniture():
+    text = pd.Series(['Whitefield Bengaluru 560066', 'Drawing Power 0.00', 'Jan 05 UPI PAYMENT'])
+    assert contains(text, bank_rules('SCB')['noise']).tolist() == [True, False, False]
+    assert contains(text, bank_rules('SBI')['noise']).tolist() == [False, True, False]
+    custom = compile_rules({**BANK_RULES['SBI'], 'branch_address': ['MG Road'], 'strip_phrases': []})
+    assert contains(pd.Series(['MG ROAD branch']), custom['noise']).tolist() == [True]
+    assert custom['cleanup'] is None
+
+def test_header_rows_are_not_transactions():
+    table = pd.DataFrame({
+        'Date   Value Description': ['STATEMENT DATE : 31 Jan 2024', 'ACCOUNT TYPE SAVINGS', 'Jan 05 Jan 05 UPI/1/ZOMATO',
+                                     'Balance Brought Forward Jan 01', 'Jan 09 Jan 09 ATM WDL'],
+        'Cheque Deposit': [None, None, None, None, None],
+        'Withdrawal': [None, None, '250.00', None, '1,000.00'],
+        'Balance': [None, None, '9,750.00', '10,000.00', '8,750.00'],
+    })
+    df = tables_to_transactions([table], new_year_state(), bank_rules('SCB'))
+    assert df['Value Date'].tolist() == ['2024-01-05', '2024-01-09']
@@ -0,0 +1,66 @@
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+import pdf_analyzer
+from pdf_analyzer import finalize_transactions, new_year_state, reconcile_balances, tables_to_transactions
+from synthetic_statements import SCB_COLUMNS, generate_transactions, scb_tables
+
+def _fake_pdf(monkeypatch, tables):
+    """Serve one synthetic table per page to iter_transactions; returns the recorded digests."""
+    calls = {'hashed': 0, 'digests': []}
+
+    @contextmanager
+    def open_statement(pdf_path, password):
+        yield {'text_pages': list(range(1, len(tables) + 1))}
+
+    def read_tables(pdf_path, password, pages, digest=None, **kwargs):
+        calls['digests'].append(digest)
+        first, _, last = pages.partition('-')
+        return tables[int(first) - 1:int(last or first)]
+
+    def file_digest(pdf_path):
+        calls['hashed'] += 1
+        return 'ab' * 32
+
+    monkeypatch.setattr(pdf_analyzer, 'warm_tabula', lambda: None)
+    monkeypatch.setattr(pdf_analyzer, 'open_statement', open_statement)
+    monkeypatch.setattr(pdf_analyzer, 'read_tables', read_tables)
+    monkeypatch.setattr(pdf_analyzer, 'file_digest', file_digest)
+    return calls
+
+def test_stream_hashes_the_file_once(monkeypatch):
+    tables = scb_tables(generate_transactions(200, seed=8), seed=8)
+    calls = _fake_pdf(monkeypatch, tables)
+    chunks = list(pdf_analyzer.iter_transactions('statement.pdf', None, pages_per_chunk=2))
+    assert len(chunks) > 1
+    assert calls['hashed'] == 1
+    assert calls['digests'] == ['ab' * 32] * len(calls['digests'])
+
+def test_stream_matches_whole_statement(monkeypatch):
+    transactions = generate_transactions(200, seed=9)
+    tables = scb_tables(transactions, seed=9)
+    # Each page's first transaction lost its amount; only the previous page's balance recovers it
+    _, deposit, withdrawal, balance = SCB_COLUMNS
+    for table in tables[1:]:
+        table.loc[table[balance].first_valid_index(), [deposit, withdrawal]] = np.nan
+    assert all(list(table.columns) == SCB_COLUMNS for table in tables)
+    _fake_pdf(monkeypatch, tables)
+    chunks = list(pdf_analyzer.iter_transactions('statement.pdf', None, pages_per_chunk=1))
+    whole = finalize_transactions(tables_to_transactions(tables, new_year_state()), sort=False)
+    assert all(chunk.attrs['unreconciled'] == [] for chunk in chunks)
+    # Both directions have to be carried over: some chunks start with a deposit, some with a withdrawal
+    assert any(chunk['Deposit'].iloc[0] > 0 for chunk in chunks[1:])
+    assert any(chunk['Withdrawal'].iloc[0] > 0 for chunk in chunks[1:])
+    streamed = pd.concat(chunks, ignore_index=True)
+    pd.testing.assert_frame_equal(streamed, whole.reset_index(drop=True))
+    assert streamed['Deposit'].fillna(0).sub(streamed['Withdrawal'].fillna(0)).round(2).tolist() == \
+        [round((t['deposit'] or 0) - (t['withdrawal'] or 0), 2) for t in transactions]
+
+def test_opening_balance_checks_the_first_row():
+    df = pd.DataFrame({'Deposit': [np.nan, 10.0], 'Withdrawal': [np.nan, np.nan], 'Balance': [90.0, 100.0]})
+    assert reconcile_balances(df)['Reconciled'].tolist() == [None, True]
+    result = reconcile_balances(df, opening_balance=100.0)
+    assert result['Withdrawal'].iloc[0] == 10.0
+    assert result['Reconciled'].tolist() == [True, True]
@@ -0,0 +1,101 @@
+import time
+from pathlib import Path
+
+import pytest
+
+import watch_folder
+from watch_folder import _record_failure, checkpoint_path, load_checkpoint, pending_statements, watch_folder as watch
+
+# Extractors run in the worker processes: they log each call to a file under
+# log_dir, which the tests read back in the parent
+def _log_call(path, log_dir):
+    with open(Path(log_dir) / Path(path).name, 'a') as f:
+        f.write('x')
+    return len((Path(log_dir) / Path(path).name).read_text())
+
+def _succeed(path, password, outputs, extract_options):
+    _log_call(path, extract_options['log_dir'])
+    return {'pdf': path, 'output': f"{path}.out", 'transactions': 3}
+
+def _fail_once(path, password, outputs, extract_options):
+    if _log_call(path, extract_options['log_dir']) == 1:
+        raise RuntimeError('tabula crashed')
+    return {'pdf': path, 'output': f"{path}.out", 'transactions': 3}
+
+def _always_fail(path, password, outputs, extract_options):
+    _log_call(path, extract_options['log_dir'])
+    return {'pdf': path, 'output': None, 'transactions': 0}
+
+@pytest.fixture
+def folder(tmp_path, monkeypatch):
+    monkeypatch.setattr(watch_folder, 'warm_tabula', lambda: None)
+    (tmp_path / 'calls').mkdir()
+    inbox = tmp_path / 'inbox'
+    inbox.mkdir()
+    return inbox
+
+def _run(folder, extractor, **options):
+    options = {'workers': 1, 'poll_interval': 0.01, 'retry_delay': 0, 'once': True, **options}
+    return watch(str(folder), 'secret', extractor=extractor, log_dir=str(folder.parent / 'calls'), **options)
+
+def _calls(folder, name):
+    path = folder.parent / 'calls' / name
+    return len(path.read_text()) if path.exists() else 0
+
+def test_file_still_being_written_waits(folder):
+    state = load_checkpoint(checkpoint_path(folder))
+    statement = folder / 'jan.pdf'
+    statement.write_bytes(b'%PDF-1.4 part')
+    last_seen = {}
+    # First sighting, then a size change: not stable yet
+    assert pending_statements(folder, state, last_seen, time.time()) == []
+    statement.write_bytes(b'%PDF-1.4 part and more')
+    assert pending_statements(folder, state, last_seen, time.time()) == []
+    # Same size and mtime on two polls in a row
+    assert pending_statements(folder, state, last_seen, time.time()) == [str(statement)]
+
+def test_transient_failure_is_retried(folder):
+    (folder / 'jan.pdf').write_bytes(b'%PDF-1.4 jan')
+    state = _run(folder, _fail_once)
+    entry = state['files']['jan.pdf']
+    assert entry['status'] == 'done'
+    assert entry['attempts'] == 1
+    assert _calls(folder, 'jan.pdf') == 2
+    assert (folder / 'jan.pdf').exists()
+
+def test_retries_back_off_exponentially(folder):
+    state = load_checkpoint(checkpoint_path(folder))
+    entry = state['files'].setdefault('jan.pdf', {})
+    delays = []
+    for _ in range(3):
+        before = time.time()
+        _record_failure(state, 'jan.pdf', entry, folder, max_attempts=5, retry_delay=10)
+        delays.append(round(entry['retry_at'] - before))
+    assert delays == [10, 20, 40]
+    assert entry['status'] == 'failed'
+
+def test_permanent_failure_is_quarantined(folder):
+    (folder / 'bad.pdf').write_bytes(b'%PDF-1.4 bad')
+    state = _run(folder, _always_fail, max_attempts=2)
+    entry = state['files']['bad.pdf']
+    assert entry['status'] == 'quarantined'
+    assert entry['attempts'] == 2
+    assert _calls(folder, 'bad.pdf') == 2
+    assert not (folder / 'bad.pdf').exists()
+    assert (folder / 'quarantine' / 'bad.pdf').exists()
+
+def test_checkpoint_skips_finished_statements(folder):
+    (folder / 'jan.pdf').write_bytes(b'%PDF-1.4 jan')
+    state = _run(folder, _succeed)
+    assert state['files']['jan.pdf']['status'] == 'done'
+    assert load_checkpoint(checkpoint_path(folder)) == state
+    # A restart neither re-extracts the finished file nor a renamed copy of it
+    (folder / 'jan copy.pdf').write_bytes(b'%PDF-1.4 jan')
+    (folder / 'feb.pdf').write_bytes(b'%PDF-1.4 feb')
+    state = _run(folder, _succeed)
+    assert _calls(folder, 'jan.pdf') == 1
+    assert _calls(folder, 'jan copy.pdf') == 0
+    assert _calls(folder, 'feb.pdf') == 1
+    assert state['files']['jan copy.pdf']['status'] == 'duplicate'
+    assert state['files']['jan copy.pdf']['duplicate_of'] == 'jan.pdf'
+    assert state['files']['feb.pdf']['status'] == 'done'